@@ -35,7 +35,6 @@ import itertools
 
 from collections import namedtuple
 from functools import partial
-from tempfile import SpooledTemporaryFile
 
 from plainbox.abc import IJobResult
 from plainbox.impl.result import MemoryJobResult
@@ -112,6 +111,77 @@ class SimpleUI(NormalUI, MainLoopStage):
         None
 
 
+class RemoteReportReader:
+    """
+    Read-only file-like view of a report cached by the agent.
+
+    The report is fetched in windows of ``window_size`` bytes so that the
+    transport can read it in any chunk size without a network round trip
+    per read, and without copying it to a local file first.
+
+    The ``size`` of the report is exposed through ``len()`` so that HTTP
+    transports can send a ``Content-Length`` header instead of falling
+    back to a chunked upload.
+    """
+
+    def __init__(self, remote_file, size, window_size, progress=None):
+        self._remote_file = remote_file
+        self._size = size
+        self._window_size = window_size
+        self._progress = progress
+        self._window = b""
+        self._offset = 0
+        self._eof = False
+        self.bytes_read = 0
+
+    def __len__(self):
+        return self._size
+
+    def readable(self):
+        return True
+
+    def _fetch(self):
+        if self._eof:
+            return b""
+        chunk = self._remote_file.read(self._window_size)
+        if not chunk:
+            self._eof = True
+            return b""
+        self.bytes_read += len(chunk)
+        if self._progress:
+            self._progress.update(len(chunk))
+        return chunk
+
+    def _take_window(self):
+        data = self._window[self._offset :] if self._offset else self._window
+        self._window = b""
+        self._offset = 0
+        return data
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            chunk_list = [self._take_window()]
+            chunk = self._fetch()
+            while chunk:
+                chunk_list.append(chunk)
+                chunk = self._fetch()
+            return b"".join(chunk_list)
+        available = len(self._window) - self._offset
+        if available < size:
+            chunk = self._take_window()
+            chunk_list = [chunk] if chunk else []
+            while available < size:
+                chunk = self._fetch()
+                if not chunk:
+                    break
+                chunk_list.append(chunk)
+                available += len(chunk)
+            self._window = b"".join(chunk_list)
+        data = self._window[self._offset : self._offset + size]
+        self._offset += len(data)
+        return data
+
+
 class RemoteController(ReportsStage, MainLoopStage):
     """
     Control remote agent instance
@@ -122,6 +192,23 @@ class RemoteController(ReportsStage, MainLoopStage):
 
     name = "remote-control"
 
+    # Number of seconds to wait for the output of a running job before
+    # checking stdin again
+    JOB_OUTPUT_TIMEOUT = 0.5
+    # Number of job records to fetch from the agent with each call
+    JOB_RECORDS_PAGE_SIZE = 500
+    # Size of the chunks of the exported reports fetched from the agent
+    REPORT_WINDOW_SIZE = 4 * 1024 * 1024
+    # Job record fields needed to run jobs
+    RUN_JOB_FIELDS = (
+        "id",
+        "num",
+        "name",
+        "category_name",
+        "command",
+        "certification_status",
+    )
+
     @property
     def is_interactive(self):
         return (
@@ -643,7 +730,7 @@ class RemoteController(ReportsStage, MainLoopStage):
                 self._save_manifest(interactive=False)
         else:
             _logger.info("controller: Selecting jobs.")
-            reprs = json.loads(self.sa.get_jobs_repr(all_jobs))
+            reprs = self._get_jobs_repr(all_jobs)
             wanted_set = CategoryBrowser(
                 "Choose tests to run on your system:", reprs
             ).run()
@@ -730,9 +817,7 @@ class RemoteController(ReportsStage, MainLoopStage):
     def _handle_last_job_after_resume(self, resumed_session_info):
         if self.launcher.get_value("ui", "type") != "silent":
             resume_dialog(10)
-        jobs_repr = json.loads(
-            self.sa.get_jobs_repr([resumed_session_info["last_job"]])
-        )
+        jobs_repr = self._get_jobs_repr((resumed_session_info["last_job"],))
         job = jobs_repr[-1]
         SimpleUI.header(job["name"])
         print(_("ID: {0}").format(job["id"]))
@@ -758,8 +843,8 @@ class RemoteController(ReportsStage, MainLoopStage):
         )
         total_num = len(jobs["done"]) + len(jobs["todo"])
 
-        jobs_repr = json.loads(
-            self.sa.get_jobs_repr(jobs["todo"], len(jobs["done"]))
+        jobs_repr = self._get_jobs_repr(
+            jobs["todo"], len(jobs["done"]), self.RUN_JOB_FIELDS
         )
 
         self._run_jobs(jobs_repr, total_num)
@@ -782,7 +867,11 @@ class RemoteController(ReportsStage, MainLoopStage):
     def wait_for_job(self, dont_finish=False):
         _logger.info("controller: Waiting for job to finish.")
         while True:
-            state, payload = self.sa.monitor_job()
+            # The agent answers as soon as the job prints something or
+            # finishes, the timeout only bounds how long stdin is left unread
+            state, payload = self.sa.wait_for_job_output(
+                self.JOB_OUTPUT_TIMEOUT
+            )
             if payload and not self._is_bootstrapping:
                 for line in payload.splitlines():
                     if line.startswith("stderr"):
@@ -792,7 +881,6 @@ class RemoteController(ReportsStage, MainLoopStage):
                     else:
                         SimpleUI.black_text(line[6:])
             if state == "running":
-                time.sleep(0.5)
                 while True:
                     res = select.select([sys.stdin], [], [], 0)
                     if not res[0]:
@@ -827,25 +915,28 @@ class RemoteController(ReportsStage, MainLoopStage):
     def local_export(self, exporter_id, transport, options=()):
         _logger.info("controller: Exporting locally'")
         rf = self.sa.cache_report(exporter_id, options)
-        exported_stream = SpooledTemporaryFile(max_size=102400, mode="w+b")
-        chunk_size = 16384
+        size = rf.tell()
+        start_time = time.time()
         with tqdm(
-            total=rf.tell(),
+            total=size,
             unit="B",
             unit_scale=True,
             unit_divisor=1024,
             disable=not self.is_interactive,
         ) as pbar:
+            pbar.set_postfix(file=transport.url, refresh=False)
             rf.seek(0)
-            while True:
-                buf = rf.read(chunk_size)
-                pbar.set_postfix(file=transport.url, refresh=False)
-                pbar.update(chunk_size)
-                if not buf:
-                    break
-                exported_stream.write(buf)
-        exported_stream.seek(0)
-        result = transport.send(exported_stream)
+            report = RemoteReportReader(
+                rf, size, self.REPORT_WINDOW_SIZE, pbar
+            )
+            result = transport.send(report)
+        duration = time.time() - start_time
+        _logger.info(
+            "controller: Exported %d bytes in %.2fs (%.1f KiB/s)",
+            report.bytes_read,
+            duration,
+            report.bytes_read / 1024 / max(duration, 1e-6),
+        )
         return result
 
     def _maybe_auto_rerun_jobs(self):
@@ -867,7 +958,8 @@ class RemoteController(ReportsStage, MainLoopStage):
 
         candidates = self.sa.prepare_rerun_candidates(rerun_candidates)
         self._run_jobs(
-            json.loads(self.sa.get_jobs_repr(candidates)), len(candidates)
+            self._get_jobs_repr(candidates, fields=self.RUN_JOB_FIELDS),
+            len(candidates),
         )
         return True
 
@@ -875,8 +967,8 @@ class RemoteController(ReportsStage, MainLoopStage):
         rerun_candidates = self.sa.get_rerun_candidates("manual")
         if not rerun_candidates:
             return False
-        test_info_list = json.loads(
-            self.sa.get_jobs_repr([j.id for j in rerun_candidates])
+        test_info_list = self._get_jobs_repr(
+            tuple(j.id for j in rerun_candidates)
         )
         wanted_set = ReRunBrowser(
             _("Select jobs to re-run"), test_info_list, rerun_candidates
@@ -887,14 +979,53 @@ class RemoteController(ReportsStage, MainLoopStage):
             [job for job in rerun_candidates if job.id in wanted_set]
         )
         self._run_jobs(
-            json.loads(self.sa.get_jobs_repr(candidates)), len(candidates)
+            self._get_jobs_repr(candidates, fields=self.RUN_JOB_FIELDS),
+            len(candidates),
         )
         return True
 
+    def _get_jobs_repr(self, job_ids, offset=0, fields=None):
+        """
+        Get the representation of jobs from the agent.
+
+        :param job_ids:
+            list of job ids to get the representation of
+        :param offset:
+            apply an offset to the job number if for instance the job list
+            is being requested part way through a session
+        :param fields:
+            names of the fields to get for each job, all of them if None
+        :returns:
+            list of dicts representing jobs
+
+        The jobs are fetched a page at a time with a single call per page.
+        """
+        jobs_repr = []
+        while True:
+            page = json.loads(
+                self.sa.get_jobs_records(
+                    job_ids,
+                    offset,
+                    fields,
+                    len(jobs_repr),
+                    self.JOB_RECORDS_PAGE_SIZE,
+                )
+            )
+            jobs_repr.extend(
+                dict(zip(page["fields"], record)) for record in page["records"]
+            )
+            if not page["records"] or len(jobs_repr) >= page["total"]:
+                return jobs_repr
+
     def _run_jobs(self, jobs_repr, total_num=0):
+        # The job state is only needed for its certification status which is
+        # part of the job representation already
+        JobStateAdapter = namedtuple(
+            "job_state_adapter", ["effective_certification_status"]
+        )
         for job in jobs_repr:
-            job_state = self.sa.get_job_state(job["id"])
-            self.sa.note_metadata_starting_job(job, job_state)
+            job_state = JobStateAdapter(job["certification_status"])
+            self.sa.note_metadata_starting_job(job, None)
             SimpleUI.header(
                 _("Running job {} / {}").format(
                     job["num"], total_num, fill="-"
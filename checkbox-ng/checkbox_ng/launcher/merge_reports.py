@@ -23,13 +23,13 @@
 import json
 import os
 import tarfile
-from tempfile import TemporaryDirectory
+from concurrent.futures import ProcessPoolExecutor
 
-from plainbox.impl.ctrl import gen_rfc822_records_from_io_log
 from plainbox.impl.providers.special import get_exporters
-from plainbox.impl.resource import Resource
 from plainbox.impl.result import IOLogRecord
 from plainbox.impl.result import MemoryJobResult
+from plainbox.impl.secure.origin import FileTextSource
+from plainbox.impl.secure.origin import Origin
 from plainbox.impl.session import SessionManager
 from plainbox.impl.unit.category import CategoryUnit
 from plainbox.impl.unit.job import JobDefinition
@@ -39,6 +39,36 @@ from plainbox.impl.unit.job import JobDefinition
 CERTIFICATION_NS = "com.canonical.certification::"
 
 
+def read_submission(submission, extract_dir=None):
+    """
+    Read the submission.json file of a submission tarball.
+
+    :param submission:
+        Path of the submission tarball
+    :param extract_dir:
+        Optional directory where all the files of the submission are
+        extracted. If omitted, the tarball is only read up to submission.json.
+    :returns:
+        The decoded content of submission.json
+    :raises OSError:
+        If the submission cannot be read or has no submission.json
+    """
+    if extract_dir is not None:
+        with tarfile.open(submission) as tar:
+            tar.extractall(extract_dir)
+        with open(os.path.join(extract_dir, "submission.json")) as f:
+            return json.load(f)
+    # Stream the (compressed) tarball, there is no need to decompress the
+    # other reports and the attachments that come after submission.json
+    with tarfile.open(submission, "r|*") as tar:
+        for member in tar:
+            if os.path.normpath(member.name) != "submission.json":
+                continue
+            with tar.extractfile(member) as f:
+                return json.loads(f.read().decode("utf-8"))
+    raise FileNotFoundError("{}: submission.json not found".format(submission))
+
+
 class MergeReports:
     def register_arguments(self, parser):
         parser.add_argument(
@@ -54,13 +84,21 @@ class MergeReports:
             required=True,
             help="save combined test results to the specified FILE",
         )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            metavar="N",
+            help="read up to N submissions in parallel (default: CPU count)",
+        )
 
-    def _parse_submission(self, submission, tmpdir, mode="list"):
+    def _parse_submission(self, submission, tmpdir, mode="list", data=None):
         try:
-            with tarfile.open(submission) as tar:
-                tar.extractall(tmpdir.name)
-                with open(os.path.join(tmpdir.name, "submission.json")) as f:
-                    data = json.load(f)
+            if data is None:
+                data = read_submission(submission, tmpdir and tmpdir.name)
+            # Units without an origin look it up in the call stack, which is
+            # slow enough to dominate the merge of large submissions
+            origin = Origin(FileTextSource(submission))
             for result in data["results"]:
                 result["plugin"] = "shell"  # Required so default to shell
                 result["summary"] = result["name"]
@@ -69,9 +107,11 @@ class MergeReports:
                 if "::" not in result["id"]:
                     result["id"] = CERTIFICATION_NS + result["id"]
                 if mode == "list":
-                    self.job_list.append(JobDefinition(result))
+                    self.job_list.append(JobDefinition(result, origin=origin))
                 elif mode == "dict":
-                    self.job_dict[result["id"]] = JobDefinition(result)
+                    self.job_dict[result["id"]] = JobDefinition(
+                        result, origin=origin
+                    )
             for result in data["resource-results"]:
                 result["plugin"] = "resource"
                 result["summary"] = result["name"]
@@ -80,9 +120,11 @@ class MergeReports:
                 if "::" not in result["id"]:
                     result["id"] = CERTIFICATION_NS + result["id"]
                 if mode == "list":
-                    self.job_list.append(JobDefinition(result))
+                    self.job_list.append(JobDefinition(result, origin=origin))
                 elif mode == "dict":
-                    self.job_dict[result["id"]] = JobDefinition(result)
+                    self.job_dict[result["id"]] = JobDefinition(
+                        result, origin=origin
+                    )
             for result in data["attachment-results"]:
                 result["plugin"] = "attachment"
                 result["summary"] = result["name"]
@@ -91,17 +133,21 @@ class MergeReports:
                 if "::" not in result["id"]:
                     result["id"] = CERTIFICATION_NS + result["id"]
                 if mode == "list":
-                    self.job_list.append(JobDefinition(result))
+                    self.job_list.append(JobDefinition(result, origin=origin))
                 elif mode == "dict":
-                    self.job_dict[result["id"]] = JobDefinition(result)
+                    self.job_dict[result["id"]] = JobDefinition(
+                        result, origin=origin
+                    )
             for cat_id, cat_name in data["category_map"].items():
                 if mode == "list":
                     self.category_list.append(
-                        CategoryUnit({"id": cat_id, "name": cat_name})
+                        CategoryUnit(
+                            {"id": cat_id, "name": cat_name}, origin=origin
+                        )
                     )
                 elif mode == "dict":
                     self.category_dict[cat_id] = CategoryUnit(
-                        {"id": cat_id, "name": cat_name}
+                        {"id": cat_id, "name": cat_name}, origin=origin
                     )
         except OSError as e:
             raise SystemExit(e)
@@ -110,39 +156,55 @@ class MergeReports:
             raise SystemExit(e)
         return data["title"]
 
-    def _populate_session_state(self, job, state):
-        io_log = [
-            IOLogRecord(count, "stdout", line.encode("utf-8"))
-            for count, line in enumerate(
-                job.get_record_value("io_log").splitlines(keepends=True)
+    def _read_submissions(self, submission_list, jobs):
+        """
+        Get the submission.json data of each submission, in order.
+
+        Decompressing and decoding the submissions is done in up to ``jobs``
+        processes.
+        """
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        jobs = min(jobs, len(submission_list))
+        if jobs <= 1:
+            return [read_submission(s) for s in submission_list]
+        try:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                return list(executor.map(read_submission, submission_list))
+        except OSError as e:
+            raise SystemExit(e)
+
+    def _populate_session_state(self, job_list, state):
+        job_result_list = []
+        for job in job_list:
+            io_log = [
+                IOLogRecord(count, "stdout", line.encode("utf-8"))
+                for count, line in enumerate(
+                    job.get_record_value("io_log").splitlines(keepends=True)
+                )
+            ]
+            result = MemoryJobResult(
+                {
+                    "outcome": job.get_record_value(
+                        "outcome", job.get_record_value("status")
+                    ),
+                    "comments": job.get_record_value("comments"),
+                    "execution_duration": job.get_record_value("duration"),
+                    "io_log": io_log,
+                }
+            )
+            job_result_list.append((job, result))
+        # The resources are parsed by the job controller when the results
+        # are stored and the readiness is only computed once for all jobs
+        state.update_job_result_list(job_result_list)
+        for job in job_list:
+            job_state = state.job_state_map[job.id]
+            job_state.effective_category_id = job.get_record_value(
+                "category_id", "com.canonical.plainbox::uncategorised"
+            )
+            job_state.effective_certification_status = job.get_record_value(
+                "certification_status", "unspecified"
             )
-        ]
-        result = MemoryJobResult(
-            {
-                "outcome": job.get_record_value(
-                    "outcome", job.get_record_value("status")
-                ),
-                "comments": job.get_record_value("comments"),
-                "execution_duration": job.get_record_value("duration"),
-                "io_log": io_log,
-            }
-        )
-        state.update_job_result(job, result)
-        if job.plugin == "resource":
-            new_resource_list = []
-            for record in gen_rfc822_records_from_io_log(job, result):
-                resource = Resource(record.data)
-                new_resource_list.append(resource)
-            if not new_resource_list:
-                new_resource_list = [Resource({})]
-            state.set_resource_list(job.id, new_resource_list)
-        job_state = state.job_state_map[job.id]
-        job_state.effective_category_id = job.get_record_value(
-            "category_id", "com.canonical.plainbox::uncategorised"
-        )
-        job_state.effective_certification_status = job.get_record_value(
-            "certification_status", "unspecified"
-        )
 
     def _create_exporter(self, exporter_id):
         exporter_map = {}
@@ -173,17 +235,16 @@ class MergeReports:
 
     def invoked(self, ctx):
         manager_list = []
-        for submission in ctx.args.submission:
-            tmpdir = TemporaryDirectory()
+        data_list = self._read_submissions(ctx.args.submission, ctx.args.jobs)
+        for submission, data in zip(ctx.args.submission, data_list):
             self.job_list = []
             self.category_list = []
-            session_title = self._parse_submission(submission, tmpdir)
+            session_title = self._parse_submission(submission, None, data=data)
             manager = SessionManager.create_with_unit_list(
                 self.job_list + self.category_list
             )
             manager.state.metadata.title = session_title
-            for job in self.job_list:
-                self._populate_session_state(job, manager.state)
+            self._populate_session_state(self.job_list, manager.state)
             manager_list.append(manager)
         exporter = self._create_exporter(
             "com.canonical.plainbox::html-multi-page"
@@ -63,8 +63,9 @@ class MergeSubmissions(MergeReports):
             list(self.job_dict.values()) + list(self.category_dict.values())
         )
         manager.state.metadata.title = ctx.args.title or session_title
-        for job in self.job_dict.values():
-            self._populate_session_state(job, manager.state)
+        self._populate_session_state(
+            list(self.job_dict.values()), manager.state
+        )
         exporter = self._create_exporter("com.canonical.plainbox::tar")
         with open(ctx.args.output_file, "wb") as stream:
             exporter.dump_from_session_manager(manager, stream)
@@ -22,6 +22,7 @@ associated with a particular stage of checkbox execution.
 import abc
 import datetime
 import gettext
+import itertools
 import json
 import logging
 import os
@@ -359,28 +360,83 @@ class MainLoopStage(CheckboxUiStage):
                 estimated_time += job.estimated_duration
             else:
                 had_unknown_time = True
+        max_workers = self.sa.config.get_value("execution", "parallel_workers")
+        if max_workers > 1:
+            # consecutive parallel-safe jobs are run concurrently
+            job_groups = itertools.groupby(
+                jobs_to_run,
+                lambda job_id: self.sa.get_job(job_id).parallel_safe,
+            )
+        else:
+            job_groups = [(False, jobs_to_run)]
         header = _("Running job {} / {}. Estimated time left{}: {}")
-        for job_no, job_id in enumerate(jobs_to_run, start=1):
-            print(
-                self.C.header(
-                    header.format(
-                        job_no,
-                        len(jobs_to_run),
-                        _(" (at least)") if had_unknown_time else "",
-                        seconds_to_human_duration(estimated_time),
+        parallel_header = _(
+            "Running jobs {} - {} / {} using {} workers. "
+            "Estimated time left{}: {}"
+        )
+        job_no = 0
+        for parallel_safe, job_group in job_groups:
+            job_group = list(job_group)
+            if parallel_safe and len(job_group) > 1:
+                print(
+                    self.C.header(
+                        parallel_header.format(
+                            job_no + 1,
+                            job_no + len(job_group),
+                            len(jobs_to_run),
+                            max_workers,
+                            _(" (at least)") if had_unknown_time else "",
+                            seconds_to_human_duration(estimated_time),
+                        ),
                         fill="-",
                     )
                 )
-            )
-            job = self.sa.get_job(job_id)
-            builder = self._run_single_job_with_ui_loop(
-                job, self._get_ui_for_job(job)
-            )
-            result = builder.get_result()
-            self.sa.use_job_result(job_id, result)
-            estimated_time -= job.estimated_duration or 0
+                self.sa.run_jobs_in_parallel(
+                    job_group,
+                    max_workers,
+                    NormalUI(self.C.c, show_cmd_output=False),
+                )
+                job_no += len(job_group)
+                for job_id in job_group:
+                    job = self.sa.get_job(job_id)
+                    estimated_time -= job.estimated_duration or 0
+                continue
+            for job_id in job_group:
+                job_no += 1
+                print(
+                    self.C.header(
+                        header.format(
+                            job_no,
+                            len(jobs_to_run),
+                            _(" (at least)") if had_unknown_time else "",
+                            seconds_to_human_duration(estimated_time),
+                            fill="-",
+                        )
+                    )
+                )
+                job = self.sa.get_job(job_id)
+                builder = self._run_single_job_with_ui_loop(
+                    job, self._get_ui_for_job(job)
+                )
+                result = builder.get_result()
+                self.sa.use_job_result(job_id, result)
+                estimated_time -= job.estimated_duration or 0
 
     def _run_bootstrap_jobs(self, jobs_to_run):
+        max_workers = self.sa.config.get_value(
+            "execution", "bootstrap_workers"
+        )
+        if max_workers > 1:
+            print(
+                self.C.header(
+                    _("Bootstrap {} jobs using {} workers").format(
+                        len(jobs_to_run), max_workers
+                    ),
+                    fill="-",
+                )
+            )
+            self.sa.run_bootstrap_jobs_in_parallel(jobs_to_run, max_workers)
+            return
         for job_no, job_id in enumerate(jobs_to_run, start=1):
             print(
                 self.C.header(
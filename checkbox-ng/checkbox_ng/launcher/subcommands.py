@@ -616,6 +616,13 @@ class Launcher(MainLoopStage, ReportsStage):
             "password_provider": sudo_password_provider.get_sudo_password,
             "stdin": None,
         }
+        forced_tp_id = self.configuration.get_value("test plan", "unit")
+        if (
+            self.configuration.get_value("test plan", "forced")
+            and forced_tp_id
+        ):
+            # no other test plan can be picked, only load what it needs
+            self.ctx.sa.select_providers_for_test_plan(forced_tp_id)
         self.ctx.sa.start_new_session(title, UnifiedRunner, runner_kwargs)
         if self.configuration.get_value("test plan", "forced"):
             tp_id = self.configuration.get_value("test plan", "unit")
@@ -1327,6 +1334,7 @@ class Expand:
     def invoked(self, ctx):
         self.ctx = ctx
         session_title = "checkbox-expand-{}".format(ctx.args.TEST_PLAN)
+        self.sa.select_providers_for_test_plan(ctx.args.TEST_PLAN)
         self.sa.start_new_session(session_title)
         tps = self.sa.get_test_plans()
         if ctx.args.TEST_PLAN not in tps:
@@ -1403,6 +1411,7 @@ class ListBootstrapped:
 
     def invoked(self, ctx):
         self.ctx = ctx
+        self.sa.select_providers_for_test_plan(ctx.args.TEST_PLAN)
         self.sa.start_new_session("checkbox-listing-ephemeral")
         tps = self.sa.get_test_plans()
         if ctx.args.TEST_PLAN not in tps:
@@ -1458,6 +1467,7 @@ class TestPlanExport:
 
     def invoked(self, ctx):
         self.ctx = ctx
+        self.sa.select_providers_for_test_plan(ctx.args.TEST_PLAN)
         if ctx.args.nofake:
             self.sa.start_new_session("tp-export-ephemeral")
         else:
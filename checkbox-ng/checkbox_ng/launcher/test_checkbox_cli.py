@@ -16,6 +16,10 @@
 # You should have received a copy of the GNU General Public License
 # along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
 
+import json
+import subprocess
+import sys
+import textwrap
 from collections import namedtuple
 from unittest import TestCase, mock
 
@@ -47,3 +51,21 @@ class CheckboxCliTests(TestCase):
 
         self.assertTrue(launcher_mock.called)
         self.assertTrue(launcher_mock.invoked.called)
+
+
+class CheckboxCliImportTests(TestCase):
+    def _import_in_subprocess(self):
+        # A fresh interpreter, the test runner has loaded a lot already
+        script = textwrap.dedent(
+            """
+            import json, sys
+            import checkbox_ng.launcher.checkbox_cli
+            print(json.dumps(sorted(sys.modules)))
+            """
+        )
+        output = subprocess.check_output([sys.executable, "-c", script])
+        return json.loads(output.decode("UTF-8").splitlines()[-1])
+
+    def test_import_does_not_load_pkg_resources(self):
+        module_list = self._import_in_subprocess()
+        self.assertNotIn("pkg_resources", module_list)
@@ -17,13 +17,18 @@
 # along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import io
+import json
 import socket
 
 from unittest import TestCase, mock
 from functools import partial
 
+import requests
+
 from checkbox_ng.urwid_ui import ResumeInstead
 from checkbox_ng.launcher.controller import RemoteController
+from checkbox_ng.launcher.controller import RemoteReportReader
 from checkbox_ng.launcher.controller import is_hostname_a_loopback
 
 
@@ -203,7 +208,7 @@ class ControllerTests(TestCase):
         self_mock = mock.MagicMock()
         self_mock.launcher = mock.MagicMock()
         self_mock.launcher.get_value.return_value = "silent"
-        self_mock.sa.get_jobs_repr.return_value = [
+        self_mock._get_jobs_repr.return_value = [
             {"name": "job", "category_name": "category", "id": "job_id"}
         ]
         with mock.patch("json.loads") as _:
@@ -222,7 +227,7 @@ class ControllerTests(TestCase):
         self_mock = mock.MagicMock()
         self_mock.launcher = mock.MagicMock()
         self_mock.launcher.get_value.return_value = "loud"
-        self_mock.sa.get_jobs_repr.return_value = [
+        self_mock._get_jobs_repr.return_value = [
             {"name": "job", "category_name": "category", "id": "job_id"}
         ]
         with mock.patch("json.loads") as _:
@@ -287,6 +292,7 @@ class ControllerTests(TestCase):
             "num": 0,
             "name": "name",
             "category_name": "category",
+            "certification_status": "unspecified",
         }
         simple_ui_mock().wait_for_interaction_prompt.return_value = "skip"
 
@@ -305,6 +311,7 @@ class ControllerTests(TestCase):
             "num": 0,
             "name": "name",
             "category_name": "category",
+            "certification_status": "unspecified",
         }
         simple_ui_mock().wait_for_interaction_prompt.return_value = "skip"
 
@@ -323,6 +330,7 @@ class ControllerTests(TestCase):
             "num": 0,
             "name": "name",
             "category_name": "category",
+            "certification_status": "unspecified",
         }
         simple_ui_mock().wait_for_interaction_prompt.return_value = ""
 
@@ -341,6 +349,7 @@ class ControllerTests(TestCase):
             "num": 0,
             "name": "name",
             "category_name": "category",
+            "certification_status": "unspecified",
         }
         simple_ui_mock().wait_for_interaction_prompt.return_value = "quit"
 
@@ -360,6 +369,7 @@ class ControllerTests(TestCase):
             "num": 0,
             "name": "name",
             "category_name": "category",
+            "certification_status": "unspecified",
         }
 
         RemoteController._run_jobs(self_mock, [jobs_repr_mock])
@@ -377,6 +387,7 @@ class ControllerTests(TestCase):
             "num": 0,
             "name": "name",
             "category_name": "category",
+            "certification_status": "unspecified",
         }
         simple_ui_mock().wait_for_interaction_prompt.return_value = ""
 
@@ -395,6 +406,7 @@ class ControllerTests(TestCase):
             "num": 0,
             "name": "name",
             "category_name": "category",
+            "certification_status": "unspecified",
         }
         simple_ui_mock().wait_for_interaction_prompt.return_value = "skip"
 
@@ -413,6 +425,7 @@ class ControllerTests(TestCase):
             "num": 0,
             "name": "name",
             "category_name": "category",
+            "certification_status": "unspecified",
         }
         simple_ui_mock().wait_for_interaction_prompt.return_value = "quit"
 
@@ -1035,6 +1048,130 @@ class ControllerTests(TestCase):
         with self.assertRaises(SystemExit) as _:
             RemoteController.start_session(self_mock)
 
+    def test__get_jobs_repr_pages(self):
+        self_mock = mock.MagicMock()
+        self_mock.JOB_RECORDS_PAGE_SIZE = 2
+        pages = [
+            {
+                "version": 1,
+                "fields": ["id", "num"],
+                "records": [["a", 3], ["b", 4]],
+                "total": 3,
+            },
+            {
+                "version": 1,
+                "fields": ["id", "num"],
+                "records": [["c", 5]],
+                "total": 3,
+            },
+        ]
+        self_mock.sa.get_jobs_records.side_effect = [
+            json.dumps(page) for page in pages
+        ]
+
+        jobs_repr = RemoteController._get_jobs_repr(
+            self_mock, ("a", "b", "c"), 2, ("id", "num")
+        )
+
+        self.assertEqual(
+            jobs_repr,
+            [
+                {"id": "a", "num": 3},
+                {"id": "b", "num": 4},
+                {"id": "c", "num": 5},
+            ],
+        )
+        self_mock.sa.get_jobs_records.assert_has_calls(
+            [
+                mock.call(("a", "b", "c"), 2, ("id", "num"), 0, 2),
+                mock.call(("a", "b", "c"), 2, ("id", "num"), 2, 2),
+            ]
+        )
+
+    @mock.patch("checkbox_ng.launcher.controller.select.select")
+    @mock.patch("checkbox_ng.launcher.controller.SimpleUI")
+    def test_wait_for_job(self, simple_ui_mock, select_mock):
+        self_mock = mock.MagicMock()
+        self_mock._is_bootstrapping = False
+        self_mock.sa.wait_for_job_output.side_effect = [
+            ("running", "stdoutsome output\n"),
+            ("done", "stderrsome error\n"),
+        ]
+        select_mock.return_value = ([], [], [])
+
+        RemoteController.wait_for_job(self_mock)
+
+        self_mock.sa.wait_for_job_output.assert_called_with(
+            self_mock.JOB_OUTPUT_TIMEOUT
+        )
+        self.assertEqual(self_mock.sa.wait_for_job_output.call_count, 2)
+        simple_ui_mock.green_text.assert_called_once_with("some output")
+        simple_ui_mock.red_text.assert_called_once_with("some error")
+        self_mock.finish_job.assert_called_once_with()
+
+    @mock.patch("checkbox_ng.launcher.controller.select.select")
+    @mock.patch("checkbox_ng.launcher.controller.SimpleUI")
+    def test_wait_for_job_dont_finish(self, simple_ui_mock, select_mock):
+        self_mock = mock.MagicMock()
+        self_mock.sa.wait_for_job_output.return_value = ("done", "")
+
+        RemoteController.wait_for_job(self_mock, dont_finish=True)
+
+        self.assertFalse(self_mock.finish_job.called)
+
+    @mock.patch("checkbox_ng.launcher.controller.tqdm")
+    def test_local_export(self, tqdm_mock):
+        self_mock = mock.MagicMock()
+        self_mock.REPORT_WINDOW_SIZE = 4
+        remote_file = io.BytesIO(b"0123456789")
+        remote_file.seek(0, io.SEEK_END)
+        self_mock.sa.cache_report.return_value = remote_file
+        transport = mock.MagicMock()
+        transport.send.side_effect = lambda data: {"data": data.read()}
+
+        result = RemoteController.local_export(
+            self_mock, "exporter", transport
+        )
+
+        self.assertEqual(result, {"data": b"0123456789"})
+        pbar = tqdm_mock.return_value.__enter__.return_value
+        pbar.update.assert_has_calls(
+            [mock.call(4), mock.call(4), mock.call(2)]
+        )
+
+
+class RemoteReportReaderTests(TestCase):
+    def setUp(self):
+        self.remote_file = mock.MagicMock(wraps=io.BytesIO(b"0123456789"))
+        self.reader = RemoteReportReader(self.remote_file, 10, 4)
+
+    def test_read_small_chunks(self):
+        chunks = [self.reader.read(3) for _ in range(5)]
+        self.assertEqual(chunks, [b"012", b"345", b"678", b"9", b""])
+        # Only one remote read per window, plus the one that hits the end
+        self.assertEqual(self.remote_file.read.call_count, 4)
+        self.assertEqual(self.reader.bytes_read, 10)
+
+    def test_read_large_chunks(self):
+        self.assertEqual(self.reader.read(6), b"012345")
+        self.assertEqual(self.reader.read(6), b"6789")
+        self.assertEqual(self.reader.read(6), b"")
+
+    def test_read_all(self):
+        self.assertEqual(self.reader.read(1), b"0")
+        self.assertEqual(self.reader.read(), b"123456789")
+        self.assertEqual(self.reader.read(), b"")
+
+    def test_len(self):
+        self.assertEqual(len(self.reader), 10)
+
+    def test_upload_has_content_length(self):
+        request = requests.Request(
+            "POST", "https://example.com/submit", data=self.reader
+        ).prepare()
+        self.assertEqual(request.headers["Content-Length"], "10")
+        self.assertNotIn("Transfer-Encoding", request.headers)
+
 
 class IsHostnameALoopbackTests(TestCase):
     @mock.patch("socket.gethostbyname")
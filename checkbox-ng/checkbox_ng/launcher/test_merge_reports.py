@@ -16,41 +16,45 @@
 # You should have received a copy of the GNU General Public License
 # along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
 
+import io
+import json
+import os
+import tarfile
+from tempfile import TemporaryDirectory
 from unittest import TestCase, mock
 from functools import partial
 
 from checkbox_ng.launcher.merge_reports import MergeReports
+from checkbox_ng.launcher.merge_reports import read_submission
 
 
 class MergeReportsTests(TestCase):
-    @mock.patch("checkbox_ng.launcher.merge_reports.TemporaryDirectory")
+    @mock.patch("checkbox_ng.launcher.merge_reports.read_submission")
     @mock.patch("checkbox_ng.launcher.merge_reports.SessionManager")
     @mock.patch("checkbox_ng.launcher.merge_reports.JobDefinition")
     @mock.patch("checkbox_ng.launcher.merge_reports.CategoryUnit")
     @mock.patch("builtins.print")
-    @mock.patch("os.path.join")
-    @mock.patch("tarfile.open")
-    @mock.patch("json.load")
     # used to load an empty launcher with no error
     def test_invoked_ok(
         self,
-        json_mock,
-        tarfile_mock,
-        path_join_mock,
         print_mock,
         category_mock,
         job_definition_mock,
         session_manager_mock,
-        temp_dir_mock,
+        read_submission_mock,
     ):
         ctx_mock = mock.MagicMock()
         ctx_mock.args.submission = ["submission"]
         ctx_mock.args.output_file = "file_location"
+        ctx_mock.args.jobs = None
 
         self_mock = mock.MagicMock()
         self_mock._parse_submission = partial(
             MergeReports._parse_submission, self_mock
         )
+        self_mock._read_submissions = partial(
+            MergeReports._read_submissions, self_mock
+        )
 
         basic_job_info = {
             "name": "test_name",
@@ -63,13 +67,85 @@ class MergeReportsTests(TestCase):
             "attachment-results": [basic_job_info],
             "category_map": {"test_category": "test_name"},
         }
-        json_mock.return_value = sub_to_read
+        read_submission_mock.return_value = sub_to_read
 
         with mock.patch("builtins.open"):
             MergeReports.invoked(self_mock, ctx_mock)
 
+        read_submission_mock.assert_called_once_with("submission")
+        self.assertEqual(job_definition_mock.call_count, 3)
+        manager = session_manager_mock.create_with_unit_list.return_value
+        self.assertEqual(manager.state.metadata.title, "report title")
+        self_mock._populate_session_state.assert_called_once_with(
+            self_mock.job_list, manager.state
+        )
         # output path was printed
         print_mock.assert_any_call(ctx_mock.args.output_file)
         exporter = self_mock._create_exporter.return_value
         # exporter was created and dumped
         self.assertTrue(exporter.dump_from_session_manager_list.called)
+
+    @mock.patch("checkbox_ng.launcher.merge_reports.ProcessPoolExecutor")
+    def test_read_submissions_parallel(self, executor_mock):
+        executor = executor_mock.return_value.__enter__.return_value
+        executor.map.return_value = iter(["data1", "data2"])
+        data_list = MergeReports()._read_submissions(["sub1", "sub2"], 4)
+        self.assertEqual(data_list, ["data1", "data2"])
+        # There is no point in more processes than submissions
+        executor_mock.assert_called_once_with(max_workers=2)
+
+    @mock.patch("checkbox_ng.launcher.merge_reports.ProcessPoolExecutor")
+    @mock.patch("checkbox_ng.launcher.merge_reports.read_submission")
+    def test_read_submissions_serial(
+        self, read_submission_mock, executor_mock
+    ):
+        read_submission_mock.side_effect = lambda s: s.upper()
+        data_list = MergeReports()._read_submissions(["sub1", "sub2"], 1)
+        self.assertEqual(data_list, ["SUB1", "SUB2"])
+        executor_mock.assert_not_called()
+
+
+class ReadSubmissionTests(TestCase):
+    def setUp(self):
+        tmpdir = TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+        self.submission = os.path.join(self.tmpdir, "submission.tar.xz")
+
+    def _make_submission(self, member_map):
+        with tarfile.open(self.submission, "w:xz") as tar:
+            for name, content in member_map.items():
+                tarinfo = tarfile.TarInfo(name)
+                tarinfo.size = len(content)
+                tar.addfile(tarinfo, io.BytesIO(content))
+
+    def test_read_submission(self):
+        self._make_submission(
+            {
+                "submission.json": json.dumps({"title": "t"}).encode(),
+                "submission.html": b"<html/>",
+            }
+        )
+        with mock.patch.object(tarfile.TarFile, "extractall") as extract:
+            self.assertEqual(read_submission(self.submission), {"title": "t"})
+        extract.assert_not_called()
+
+    def test_read_submission_extract_dir(self):
+        self._make_submission(
+            {
+                "submission.html": b"<html/>",
+                "submission.json": json.dumps({"title": "t"}).encode(),
+            }
+        )
+        extract_dir = os.path.join(self.tmpdir, "extract")
+        self.assertEqual(
+            read_submission(self.submission, extract_dir), {"title": "t"}
+        )
+        self.assertTrue(
+            os.path.exists(os.path.join(extract_dir, "submission.html"))
+        )
+
+    def test_read_submission_missing_json(self):
+        self._make_submission({"submission.html": b"<html/>"})
+        with self.assertRaises(OSError):
+            read_submission(self.submission)
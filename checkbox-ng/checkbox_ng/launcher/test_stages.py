@@ -63,3 +63,39 @@ class TestMainLoopStage(TestCase):
             )
 
         self.assertEqual(result_builder.outcome, "skip")
+
+    @mock.patch("checkbox_ng.launcher.stages.NormalUI")
+    def test__run_jobs_parallel_safe_groups(self, normal_ui_mock):
+        self_mock = mock.MagicMock()
+        job_map = {
+            "p1": mock.MagicMock(parallel_safe=True, estimated_duration=1),
+            "p2": mock.MagicMock(parallel_safe=True, estimated_duration=1),
+            "s1": mock.MagicMock(parallel_safe=False, estimated_duration=1),
+            "p3": mock.MagicMock(parallel_safe=True, estimated_duration=1),
+        }
+        self_mock.sa.get_job.side_effect = job_map.get
+        self_mock.sa.config.get_value.return_value = 4
+
+        with mock.patch("builtins.print"):
+            MainLoopStage._run_jobs(self_mock, ["p1", "p2", "s1", "p3"])
+
+        self_mock.sa.run_jobs_in_parallel.assert_called_once_with(
+            ["p1", "p2"], 4, normal_ui_mock.return_value
+        )
+        run_single_job_calls = [
+            call[0][0]
+            for call in self_mock._run_single_job_with_ui_loop.call_args_list
+        ]
+        self.assertEqual(run_single_job_calls, [job_map["s1"], job_map["p3"]])
+
+    def test__run_jobs_no_parallel_workers(self):
+        self_mock = mock.MagicMock()
+        self_mock.sa.get_job.return_value.parallel_safe = True
+        self_mock.sa.get_job.return_value.estimated_duration = 1
+        self_mock.sa.config.get_value.return_value = 1
+
+        with mock.patch("builtins.print"):
+            MainLoopStage._run_jobs(self_mock, ["p1", "p2"])
+
+        self.assertFalse(self_mock.sa.run_jobs_in_parallel.called)
+        self.assertEqual(self_mock._run_single_job_with_ui_loop.call_count, 2)
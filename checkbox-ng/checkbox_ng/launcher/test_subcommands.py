@@ -687,6 +687,7 @@ class TestLauncherReturnCodes(TestCase):
         self.ctx.sa = Mock(
             get_resumable_sessions=Mock(return_value=[]),
             get_dynamic_todo_list=Mock(return_value=[]),
+            config=Mock(get_value=Mock(return_value=1)),
         )
 
     def test_invoke_returns_0_on_no_fails(self):
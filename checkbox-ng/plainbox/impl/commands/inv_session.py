@@ -71,9 +71,8 @@ class SessionInvocation:
             if self.ns.only_ids:
                 print(storage.id)
                 continue
-            data = storage.load_checkpoint()
-            if len(data) > 0:
-                metadata = SessionPeekHelper().peek(data)
+            metadata = SessionPeekHelper().peek_storage(storage)
+            if metadata is not None:
                 print(
                     _("session {0} app:{1}, flags:{2!r}, title:{3!r}").format(
                         storage.id,
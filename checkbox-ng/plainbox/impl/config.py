@@ -435,6 +435,54 @@ CONFIG_SPEC = [
             "strategy": VarSpec(str, "", "Use alternative restart strategy."),
         },
     ),
+    (
+        "execution",
+        {
+            "bootstrap_workers": VarSpec(
+                int,
+                1,
+                (
+                    "Number of independent resource jobs to run concurrently "
+                    "while bootstrapping. 1 disables parallel bootstrap."
+                ),
+            ),
+            "parallel_workers": VarSpec(
+                int,
+                1,
+                (
+                    "Number of jobs flagged as parallel-safe to run "
+                    "concurrently. 1 disables parallel execution."
+                ),
+            ),
+            "checkpoint_journal": VarSpec(
+                bool,
+                False,
+                (
+                    "Append the changes to a session journal instead of "
+                    "saving the whole session on each checkpoint."
+                ),
+            ),
+            "resource_cache_invalidation_keys": VarSpec(
+                list,
+                ["kernel", "packages", "dmi"],
+                (
+                    "Parts of the system (boot_id, kernel, packages, dmi) "
+                    "that must not change for a cached resource job result "
+                    "to be used."
+                ),
+            ),
+            "resource_cache_max_size": VarSpec(
+                int,
+                64,
+                "Size (in MiB) past which resource cache entries are evicted.",
+            ),
+            "resource_cache_max_age": VarSpec(
+                int,
+                30,
+                "Age (in days) after which a cached resource is not used.",
+            ),
+        },
+    ),
     (
         "report",
         ParametricSection(
@@ -41,7 +41,6 @@ try:
 except ImportError:
     grp = None
 import itertools
-import json
 import logging
 import os
 import tempfile
@@ -65,10 +64,11 @@ from plainbox.impl.secure.origin import JobOutputTextSource
 from plainbox.impl.secure.providers.v1 import Provider1
 from plainbox.impl.secure.rfc822 import RFC822SyntaxError
 from plainbox.impl.secure.rfc822 import gen_rfc822_records
+from plainbox.impl.session.graph import JobGraph
+from plainbox.impl.session.graph import is_job_impacting_suspend
 from plainbox.impl.session.jobs import InhibitionCause
 from plainbox.impl.session.jobs import JobReadinessInhibitor
 from plainbox.impl.unit.job import JobDefinition
-from plainbox.impl.unit.template import TemplateUnit
 from plainbox.impl.unit.unit import MissingParam
 from plainbox.impl.validation import Severity
 from plainbox.suspend_consts import Suspend
@@ -103,7 +103,9 @@ class CheckBoxSessionStateController(ISessionStateController):
           of resource definitions.
     """
 
-    def get_dependency_set(self, job, job_list=None):
+    def get_dependency_set(
+        self, job, job_list=None, job_graph=None, job_id_set=None
+    ):
         """
         Get the set of direct dependencies of a particular job.
 
@@ -111,6 +113,12 @@ class CheckBoxSessionStateController(ISessionStateController):
             A IJobDefinition instance that is to be visited
         :param job_list:
             List of jobs to check dependencies from
+        :param job_graph:
+            (optional) JobGraph of the jobs, the jobs to run before a suspend
+            job are then taken from its suspend edges
+        :param job_id_set:
+            (optional) Set of the ids of the jobs of job_list, used along
+            with job_graph
         :returns:
             set of pairs (dep_type, job_id)
 
@@ -132,7 +140,14 @@ class CheckBoxSessionStateController(ISessionStateController):
             Suspend.AUTO_JOB_ID,
             Suspend.MANUAL_JOB_ID,
         ]
-        if job.id in suspend_job_id_list:
+        if job.id in suspend_job_id_list and job_graph is not None:
+            if job_id_set is None:
+                job_id_set = {other_job.id for other_job in job_list}
+            suspend_deps = (
+                job_graph.get_dependencies(job.id, job_graph.DEP_TYPE_SUSPEND)
+                & job_id_set
+            )
+        elif job.id in suspend_job_id_list:
             suspend_deps = self._get_before_suspend_dependency_set(
                 job.id, job_list
             )
@@ -180,17 +195,7 @@ class CheckBoxSessionStateController(ISessionStateController):
         flag, or if it defines a sibling that has a dependency on the suspend
         job.
         """
-        expected_flag = {
-            Suspend.AUTO_JOB_ID: Suspend.AUTO_FLAG,
-            Suspend.MANUAL_JOB_ID: Suspend.MANUAL_FLAG,
-        }.get(suspend_job_id)
-        if job.flags and expected_flag in job.flags:
-            return True
-        if job.siblings:
-            for sibling_data in json.loads(job.tr_siblings()):
-                if suspend_job_id in sibling_data.get("depends", []):
-                    return True
-        return False
+        return is_job_impacting_suspend(suspend_job_id, job)
 
     def get_inhibitor_list(self, session_state, job):
         """
@@ -325,24 +330,21 @@ class CheckBoxSessionStateController(ISessionStateController):
         undesired_inhibitor = JobReadinessInhibitor(
             cause=InhibitionCause.UNDESIRED
         )
-        # We are only interested in jobs that are actually going to run
-        run_list = [
-            state.job
-            for state in session_state.job_state_map.values()
-            if undesired_inhibitor not in state.readiness_inhibitor_list
-        ]
-        p_suspend_job_id = partial(
-            self._is_job_impacting_suspend, suspend_job.id
-        )
-        suspend_inhibitors_jobs = filter(p_suspend_job_id, run_list)
-        for job in suspend_inhibitors_jobs:
-            if (
-                session_state.job_state_map[job.id].result.outcome
-                == IJobResult.OUTCOME_NONE
-            ):
+        # The session job graph already knows which jobs impact the suspend
+        # job, we are only interested in the ones that are actually going to
+        # run
+        for job_id in sorted(
+            session_state.job_graph.get_dependencies(
+                suspend_job.id, JobGraph.DEP_TYPE_SUSPEND
+            )
+        ):
+            job_state = session_state.job_state_map[job_id]
+            if undesired_inhibitor in job_state.readiness_inhibitor_list:
+                continue
+            if job_state.result.outcome == IJobResult.OUTCOME_NONE:
                 inhibitor = JobReadinessInhibitor(
                     cause=InhibitionCause.PENDING_DEP,
-                    related_job=job,
+                    related_job=job_state.job,
                 )
                 suspend_inhibitors.append(inhibitor)
         return suspend_inhibitors
@@ -432,36 +434,33 @@ class CheckBoxSessionStateController(ISessionStateController):
         # before it was suspended, so don't
         if result.outcome is IJobResult.OUTCOME_NONE:
             return
-        for unit in session_state.unit_list:
-            if isinstance(unit, TemplateUnit) and unit.resource_id == job.id:
-                logger.info(_("Instantiating unit: %s"), unit)
-                for new_unit in unit.instantiate_all(
-                    session_state.resource_map[job.id], fake_resources
-                ):
-                    try:
-                        check_result = new_unit.check()
-                    except MissingParam as m:
-                        logger.debug(
-                            _(
-                                "Ignoring %s with missing "
-                                "template parameter %s"
-                            ),
-                            new_unit._raw_data.get("id"),
-                            m.parameter,
-                        )
-                        continue
-                    # Only ignore jobs for which check() returns an error
-                    if [
-                        c for c in check_result if c.severity == Severity.error
-                    ]:
-                        logger.error(
-                            _("Ignoring invalid generated job %s"), new_unit.id
-                        )
-                    else:
-                        session_state.add_unit(
-                            new_unit, via=job, recompute=False
-                        )
-        session_state._recompute_job_readiness()
+        new_unit_list = []
+        for unit in session_state.get_template_list(job.id):
+            logger.info(_("Instantiating unit: %s"), unit)
+            for new_unit in unit.instantiate_all(
+                session_state.resource_map[job.id], fake_resources
+            ):
+                try:
+                    # Only the checks that depend on the template parameters
+                    # run for each generated unit
+                    check_result = unit.check_instance(new_unit)
+                except MissingParam as m:
+                    logger.debug(
+                        _("Ignoring %s with missing template parameter %s"),
+                        new_unit._raw_data.get("id"),
+                        m.parameter,
+                    )
+                    continue
+                # Only ignore jobs for which check() returns an error
+                if [c for c in check_result if c.severity == Severity.error]:
+                    logger.error(
+                        _("Ignoring invalid generated job %s"), new_unit.id
+                    )
+                else:
+                    new_unit_list.append(new_unit)
+        # Generated units are not on the run list so this only re-evaluates
+        # jobs that already refer to them, once for the whole batch
+        session_state.add_units(new_unit_list, via=job)
 
 
 def gen_rfc822_records_from_io_log(job, result):
@@ -281,7 +281,9 @@ class DependencySolver:
     Dependency solver for Jobs.
 
     Uses a simple depth-first search to discover the sequence of jobs that can
-    run. Use the resolve_dependencies() class method to get the solution.
+    run. Use the resolve_dependencies() class method to get the solution or
+    the resolve_dependencies_and_problems() class method to also learn about
+    all the jobs that had to be discarded to find it.
     """
 
     COLOR_WHITE = Color.WHITE
@@ -289,12 +291,13 @@ class DependencySolver:
     COLOR_BLACK = Color.BLACK
 
     @classmethod
-    def resolve_dependencies(cls, job_list, visit_list=None):
+    def resolve_dependencies(cls, job_list, visit_list=None, job_graph=None):
         """
         Solve the dependency graph expressed as a list of job definitions.
 
         :param list job_list: list of known jobs
         :param list visit_list: (optional) list of jobs to solve
+        :param job_graph: (optional) JobGraph of the known jobs
 
         The visit_list, if specified, allows to consider only a part of the
         graph while still having access and knowledge of all jobs.
@@ -307,17 +310,92 @@ class DependencySolver:
         :raises DependencyMissingErorr:
             if a required job does not exist.
         """
-        return cls(job_list)._solve(visit_list)
+        return cls(job_list, job_graph)._solve(visit_list)
 
-    def __init__(self, job_list):
+    @classmethod
+    def resolve_dependencies_and_problems(
+        cls, job_list, visit_list=None, job_graph=None
+    ):
+        """
+        Solve the dependency graph, discarding jobs that cannot be solved.
+
+        :param list job_list: list of known jobs
+        :param list visit_list: (optional) list of jobs to solve
+        :param job_graph: (optional) JobGraph of the known jobs
+
+        This method never raises DependencyError. Each time a problem is found
+        the affected job is discarded from both lists and the search goes on,
+        which may in turn cause jobs that depend on the discarded job to be
+        discarded as well. All the problems are found in a single pass over
+        the graph. The outcome is the same as calling resolve_dependencies()
+        again and again, discarding the affected job of each error that it
+        raises, until the graph can be solved.
+
+        :returns:
+            tuple (solution, visit_list, problems) where visit_list is what is
+            left of the list of jobs to solve and problems is the list of
+            DependencyError instances in the order they were found.
+        """
+        job_list = list(job_list)
+        if visit_list is None:
+            visit_list = job_list
+        visit_list = list(visit_list)
+        problems = []
+        # Duplicates are found before the search starts, there can be any
+        # number of them so keep discarding jobs until there are none left.
+        while True:
+            if not visit_list:
+                return [], visit_list, problems
+            try:
+                solver = cls(job_list, job_graph)
+            except DependencyDuplicateError as exc:
+                problems.append(exc)
+                cls._discard_from(visit_list, exc.affected_job)
+                cls._discard_from(job_list, exc.affected_job)
+            else:
+                break
+        num_problems = len(problems)
+        solution = solver._solve(visit_list, problems)
+        if len(problems) == num_problems:
+            return solution, visit_list, problems
+        # Jobs were discarded along the way so part of the solution may have
+        # been found under jobs that are now gone. Solve what is left again,
+        # this can no longer fail.
+        job_list = [job for job in job_list if job.id in solver._job_map]
+        return (
+            cls(job_list, job_graph)._solve(visit_list),
+            visit_list,
+            problems,
+        )
+
+    @staticmethod
+    def _discard_from(job_list, job):
+        """
+        Internal method of DependencySolver.
+
+        Removes the first occurrence of a job from a list, if present.
+        """
+        try:
+            job_list.remove(job)
+        except ValueError:
+            pass
+
+    def __init__(self, job_list, job_graph=None):
         """
         Instantiate a new dependency solver with the specified list of jobs.
 
+        :param job_graph:
+            (optional) JobGraph of the jobs, lets the controllers look up
+            the dependencies that are not declared by the jobs themselves
+            (like the jobs to run before a suspend job) at O(degree) cost.
         :raises DependencyDuplicateError:
             if the initial job_list has any duplicate jobs
         """
         # Remember the jobs that were passed
         self._job_list = job_list
+        self._job_graph = job_graph
+        # Ids of the jobs of the visit list, see _solve()
+        self._visit_id_set = set()
         # Build a map of jobs (by id)
         self._job_map = self._get_job_map(job_list)
         # Job colors, maps from job.id to COLOR_xxx
@@ -326,14 +404,19 @@ class DependencySolver:
         # necessarily the only solution but the algorithm computes the same
         # value each time, given the same input.
         self._solution = []
+        # Stack of jobs that are being visited (colored GRAY). Each frame is a
+        # list [job, dependency list, index of the next dependency to visit]
+        self._stack = []
 
-    def _solve(self, visit_list=None):
+    def _solve(self, visit_list=None, problems=None):
         """
         Internal method of DependencySolver.
 
         Solves the dependency graph and returns the solution.
 
-        Calls _visit() on each of the initial nodes/jobs
+        Calls _visit() on each of the initial nodes/jobs. If problems is None
+        the first problem found is raised. Otherwise problems are appended to
+        it and the affected jobs are discarded from the visit_list.
         """
         # Visit the visit list
         logger.debug(_("Starting solve"))
@@ -341,72 +424,175 @@ class DependencySolver:
         logger.debug(_("Solver visit list: %r"), visit_list)
         if visit_list is None:
             visit_list = self._job_list
-        for job in visit_list:
-            self._visit(job=job, visit_list=visit_list)
+        self._visit_id_set = {job.id for job in visit_list}
+        index = 0
+        while index < len(visit_list):
+            job = visit_list[index]
+            self._visit(job, visit_list, problems)
+            # The job is either solved or it got discarded from the visit
+            # list, in which case the next job is at the same index now.
+            if self._job_color_map.get(job.id) == self.COLOR_BLACK:
+                index += 1
         logger.debug(_("Done solving"))
         # Return the solution
         return self._solution
 
-    def _visit(self, job, visit_list, trail=None):
+    def _visit(self, job, visit_list, problems=None):
         """
         Internal method of DependencySolver.
 
-        Called each time a node is visited. Nodes already seen in _visited are
-        skipped. Attempts to enumerate all dependencies (both direct and
-        resource) and resolve them. Missing jobs cause DependencyMissingError
-        to be raised. Calls _visit recursively on all dependencies.
+        Called each time a node of the visit list is visited. Nodes already
+        seen are skipped. Attempts to enumerate all dependencies (both direct
+        and resource) and resolve them. Missing jobs cause
+        DependencyMissingError to be raised. Visits all of the dependencies
+        depth-first, using an explicit stack rather than recursion so that
+        long dependency chains are not a problem.
         """
-        try:
-            color = self._job_color_map[job.id]
-        except KeyError:
+        color = self._job_color_map.get(job.id)
+        if color is None:
             logger.debug(_("Visiting job that's not on the job_list: %r"), job)
-            raise DependencyUnknownError(job)
+            self._report(DependencyUnknownError(job), 0, visit_list, problems)
+            return
         logger.debug(_("Visiting job %s (color %s)"), job.id, color)
-        if color == self.COLOR_WHITE:
-            # This node has not been visited yet. Let's mark it as GRAY (being
-            # visited) and iterate through the list of dependencies
-            self._job_color_map[job.id] = self.COLOR_GRAY
-            # If the trail was not specified start a trail for this node
-            if trail is None:
-                trail = [job]
-            for dep_type, job_id in job.controller.get_dependency_set(
-                job, visit_list
-            ):
-                # Dependency is just an id, we need to resolve it
-                # to a job instance. This can fail (missing dependencies)
-                # so let's guard against that.
-                try:
-                    next_job = self._job_map[job_id]
-                except KeyError:
-                    logger.debug(
-                        _("Found missing dependency: %r from %r"), job_id, job
-                    )
-                    raise DependencyMissingError(job, job_id, dep_type)
-                else:
-                    # For each dependency that we visit let's reuse the trail
-                    # to give proper error messages if a dependency loop exists
-                    logger.debug(_("Visiting dependency: %r"), next_job)
-                    # Update the trail as we visit that node
-                    trail.append(next_job)
-                    self._visit(next_job, visit_list, trail)
-                    trail.pop()
-            # We've visited (recursively) all dependencies of this node,
-            # let's color it black and append it to the solution list.
-            logger.debug(_("Appending %r to solution"), job)
-            self._job_color_map[job.id] = self.COLOR_BLACK
-            self._solution.append(job)
-        elif color == self.COLOR_GRAY:
-            # This node is not fully traced yet but has been visited already
-            # so we've found a dependency loop. We need to cut the initial
-            # part of the trail so that we only report the part that actually
-            # forms a loop
-            trail = trail[trail.index(job) :]
-            logger.debug(_("Found dependency cycle: %r"), trail)
-            raise DependencyCycleError(trail)
-        else:
-            assert color == self.COLOR_BLACK
+        if color == self.COLOR_BLACK:
             # This node has been visited and is fully traced.
             # We can just skip it and go back
+            return
+        assert color == self.COLOR_WHITE
+        stack = self._stack
+        self._push(job, visit_list)
+        while stack:
+            frame = stack[-1]
+            job, dep_list, dep_index = frame
+            if dep_index == len(dep_list):
+                # We've visited all dependencies of this node, let's color it
+                # black and append it to the solution list.
+                logger.debug(_("Appending %r to solution"), job)
+                stack.pop()
+                self._job_color_map[job.id] = self.COLOR_BLACK
+                self._solution.append(job)
+                continue
+            # Dependency is just an id, we need to resolve it to a job
+            # instance. This can fail (missing dependencies) so let's guard
+            # against that.
+            dep_type, job_id = dep_list[dep_index]
+            try:
+                next_job = self._job_map[job_id]
+            except KeyError:
+                logger.debug(
+                    _("Found missing dependency: %r from %r"), job_id, job
+                )
+                self._report(
+                    DependencyMissingError(job, job_id, dep_type),
+                    len(stack) - 1,
+                    visit_list,
+                    problems,
+                )
+                continue
+            color = self._job_color_map[job_id]
+            if color == self.COLOR_GRAY:
+                # This node is not fully traced yet but has been visited
+                # already so we've found a dependency loop. We need to cut
+                # the initial part of the trail so that we only report the
+                # part that actually forms a loop
+                depth = next(
+                    depth
+                    for depth, frame in enumerate(stack)
+                    if frame[0] == next_job
+                )
+                trail = [frame[0] for frame in stack[depth:]] + [next_job]
+                logger.debug(_("Found dependency cycle: %r"), trail)
+                self._report(
+                    DependencyCycleError(trail), depth, visit_list, problems
+                )
+                continue
+            frame[2] += 1
+            if color == self.COLOR_WHITE:
+                logger.debug(_("Visiting dependency: %r"), next_job)
+                self._push(next_job, visit_list)
+
+    def _push(self, job, visit_list):
+        """
+        Internal method of DependencySolver.
+
+        Marks a job as being visited and puts it on top of the stack.
+        """
+        self._job_color_map[job.id] = self.COLOR_GRAY
+        self._stack.append([job, self._get_dep_list(job, visit_list), 0])
+
+    def _get_dep_list(self, job, visit_list):
+        """
+        Internal method of DependencySolver.
+
+        Computes the list of (dep_type, job_id) pairs to visit for a job.
+        """
+        if self._job_graph is None:
+            return list(job.controller.get_dependency_set(job, visit_list))
+        return list(
+            job.controller.get_dependency_set(
+                job,
+                visit_list,
+                job_graph=self._job_graph,
+                job_id_set=self._visit_id_set,
+            )
+        )
+
+    def _report(self, exc, depth, visit_list, problems):
+        """
+        Internal method of DependencySolver.
+
+        Raises a problem found at the given depth of the stack or, if problems
+        is a list, records it and recovers from it.
+
+        Recovering means discarding the affected job, which is on the stack at
+        the given depth (unless it is an unknown job from the visit list), and
+        continuing from where a fresh search, one that doesn't know about the
+        discarded job at all, would find the next problem. Such a search would
+        follow the same path down the stack until it reaches the discarded job
+        and finds that the job depending on it is now missing a dependency, so
+        that job is discarded next. This is repeated up the stack unless the
+        list of dependencies of one of the jobs on the stack depends on the
+        visit list and is now different, the search is resumed from there.
+        """
+        if problems is None:
+            raise exc
+        stack = self._stack
+        while True:
+            problems.append(exc)
+            job = exc.affected_job
+            self._discard_from(visit_list, job)
+            self._visit_id_set.discard(job.id)
+            self._job_map.pop(job.id, None)
+            self._job_color_map.pop(job.id, None)
+            self._unwind(depth)
+            for depth, frame in enumerate(stack):
+                dep_list = self._get_dep_list(frame[0], visit_list)
+                if dep_list != frame[1]:
+                    frame[1] = dep_list
+                    frame[2] = 0
+                    self._unwind(depth + 1)
+                    return
+            if not stack:
+                return
+            job, dep_list, dep_index = stack[-1]
+            dep_type, job_id = dep_list[dep_index - 1]
+            logger.debug(
+                _("Found missing dependency: %r from %r"), job_id, job
+            )
+            exc = DependencyMissingError(job, job_id, dep_type)
+            depth = len(stack) - 1
+
+    def _unwind(self, depth):
+        """
+        Internal method of DependencySolver.
+
+        Removes frames from the stack, down to the given depth. Jobs that are
+        still known are marked as not visited.
+        """
+        for job, dep_list, dep_index in self._stack[depth:]:
+            if job.id in self._job_color_map:
+                self._job_color_map[job.id] = self.COLOR_WHITE
+        del self._stack[depth:]
 
     @staticmethod
     def _get_job_map(job_list):
@@ -26,19 +26,22 @@ import gzip
 import io
 import logging
 import os
-import select
+import selectors
+import shutil
+import stat
 import subprocess
 import sys
 import tempfile
 import threading
 import time
+import weakref
 
 from plainbox.abc import IJobResult, IJobRunner
 from plainbox.i18n import gettext as _
 from plainbox.impl.color import Colorizer
 from plainbox.impl.unit.job import supported_plugins
 from plainbox.impl.unit.unit import on_ubuntucore
-from plainbox.impl.result import IOLogRecordWriter
+from plainbox.impl.result import BinaryIOLogRecordWriter
 from plainbox.impl.result import JobResultBuilder
 from plainbox.impl.runner import CommandOutputWriter
 from plainbox.impl.runner import IOLogRecordGenerator
@@ -52,6 +55,126 @@ from plainbox.vendor import extcmd
 logger = logging.getLogger("plainbox.unified")
 
 
+class IOPump:
+    """
+    Single loop moving the data between running jobs and their delegates.
+
+    The output pipes are read in large chunks, as soon as the data is
+    available, and each complete line is passed to the ``on_line()`` method
+    of the delegate of the pipe. The data read from an input source is
+    forwarded to the input pipe of the job as-is.
+
+    Several jobs can share the same pump, :meth:`run()` returns when all of
+    the output pipes have been closed by the jobs.
+    """
+
+    CHUNK_SIZE = 65536
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        # Map from output file descriptor to the chunks of an incomplete line
+        self._pending_map = {}
+        self._output_count = 0
+        # Input file descriptors still owned by the pump
+        self._input_fd_set = set()
+
+    def add_output(self, stream, stream_name, delegate):
+        """Read the output of a job from ``stream``."""
+        fd = stream.fileno()
+        self._pending_map[fd] = []
+        self._selector.register(
+            fd, selectors.EVENT_READ, (self._on_output, stream_name, delegate)
+        )
+        self._output_count += 1
+
+    def add_input(self, source, target_fd):
+        """
+        Forward the data from the ``source`` file to ``target_fd``.
+
+        The pump takes the ownership of ``target_fd`` and closes it once the
+        ``source`` reaches its end, or when the pump is closed. Sources that
+        are not backed by a file descriptor are not forwarded. Sources that
+        cannot be watched, such as regular files and ``/dev/null``, are
+        treated as if they already reached their end.
+        """
+        self._input_fd_set.add(target_fd)
+        try:
+            source_fd = source.fileno()
+        except (AttributeError, ValueError, io.UnsupportedOperation):
+            return
+        try:
+            self._selector.register(
+                source_fd,
+                selectors.EVENT_READ,
+                (self._on_input, target_fd, None),
+            )
+        except (OSError, ValueError) as exc:
+            logger.debug(_("Not forwarding the input of the job: %s"), exc)
+            self._close_input(target_fd)
+
+    def run(self):
+        """
+        Pump the data until all of the outputs are closed.
+
+        The loop can be resumed by calling this method again, for instance
+        after it was interrupted by a KeyboardInterrupt.
+        """
+        while self._output_count:
+            for key, _events in self._selector.select():
+                callback, arg, delegate = key.data
+                callback(key.fd, arg, delegate)
+
+    def close(self):
+        """Stop forwarding the input and release the selector."""
+        self._selector.close()
+        for fd in self._input_fd_set:
+            os.close(fd)
+        self._input_fd_set.clear()
+
+    def _on_output(self, fd, stream_name, delegate):
+        try:
+            chunk = os.read(fd, self.CHUNK_SIZE)
+        except OSError:
+            chunk = b""
+        pending = self._pending_map[fd]
+        if not chunk:
+            if pending:
+                delegate.on_line(stream_name, b"".join(pending))
+            del self._pending_map[fd]
+            self._selector.unregister(fd)
+            self._output_count -= 1
+            return
+        start = 0
+        end = chunk.find(b"\n")
+        while end != -1:
+            if pending:
+                pending.append(chunk[start : end + 1])
+                line = b"".join(pending)
+                pending.clear()
+            else:
+                line = chunk[start : end + 1]
+            delegate.on_line(stream_name, line)
+            start = end + 1
+            end = chunk.find(b"\n", start)
+        if start < len(chunk):
+            pending.append(chunk[start:])
+
+    def _on_input(self, fd, target_fd, delegate):
+        try:
+            data = os.read(fd, self.CHUNK_SIZE)
+            if data:
+                os.write(target_fd, data)
+                return
+        except BrokenPipeError:
+            pass
+        self._selector.unregister(fd)
+        self._close_input(target_fd)
+
+    def _close_input(self, target_fd):
+        self._input_fd_set.discard(target_fd)
+        os.close(target_fd)
+
+
 class UnifiedRunner(IJobRunner):
     """
     Class for handling running of jobs.
@@ -72,24 +195,35 @@ class UnifiedRunner(IJobRunner):
         normal_user_provider=lambda: None,
         password_provider=sudo_password_provider.get_sudo_password,
         extra_env=None,
+        resource_cache=None,
     ):
         self._session_id = session_id
         self._provider_list = provider_list
         if execution_ctrl_list is not None:
             logger.info("Using custom execution controllers is deprecated")
         self._jobs_io_log_dir = jobs_io_log_dir
-        self._job_runner_ui_delegate = JobRunnerUIDelegate()
         self._command_io_delegate = command_io_delegate
         self._dry_run = dry_run
-        self._resource_cache = ResourceJobCache()
+        if resource_cache is None:
+            resource_cache = ResourceJobCache()
+        self._resource_cache = resource_cache
         self._resource_cache.load()
         self._user_provider = normal_user_provider
         self._password_provider = password_provider
         self._stdin = stdin
-        self._running_jobs_pid = None
+        # jobs flagged as parallel-safe can be run concurrently, keep track of
+        # all the processes that are running
+        self._running_jobs_pid_set = set()
         self._extra_env = extra_env
-
-    def run_job(self, job, job_state, environ=None, ui=None):
+        # Map from provider namespace to a tuple with the providers of the
+        # namespace, the directory of their symlink nest and its finalizer
+        self._nest_map = {}
+        self._nest_lock = threading.Lock()
+
+    def run_job(self, job, job_state, environ=None, ui=None, concurrent=False):
+        # Jobs run with concurrent set may run at the same time as other
+        # jobs on other threads, so they don't use the state of the runner
+        # that can't be shared, like the command I/O delegate and stdin.
         logger.info(_("Running %r"), job)
         if job.plugin not in supported_plugins:
             print(
@@ -108,22 +242,25 @@ class UnifiedRunner(IJobRunner):
                 outcome=IJobResult.OUTCOME_SKIP,
                 comments=_("Job skipped in dry-run mode"),
             ).get_result()
-        self._job_runner_ui_delegate.ui = ui
+        ui_delegate = JobRunnerUIDelegate(ui)
 
         # for cached resource jobs we get the result using cache
         # if it's not in the cache, ordinary "_run_command" will be run
         if job.plugin == "resource" and "cachable" in job.get_flag_set():
             from_cache, result = self._resource_cache.get(
                 job.checksum,
-                lambda: self._run_command(job, environ).get_result(),
+                lambda: self._run_command(
+                    job, environ, ui_delegate, concurrent
+                ).get_result(),
             )
             if from_cache:
                 print(Colorizer().header(_("Using cached data!")))
-                jrud = self._job_runner_ui_delegate
-                jrud.on_begin("", dict())
+                ui_delegate.on_begin("", dict())
                 for io_log_entry in result.io_log:
-                    jrud.on_chunk(io_log_entry.stream_name, io_log_entry.data)
-                jrud.on_end(result.return_code)
+                    ui_delegate.on_chunk(
+                        io_log_entry.stream_name, io_log_entry.data
+                    )
+                ui_delegate.on_end(result.return_code)
             return result
 
         # manual jobs don't require running anything so we just return
@@ -140,7 +277,9 @@ class UnifiedRunner(IJobRunner):
                 outcome=IJobResult.OUTCOME_FAIL,
                 comments=_("No command to run!"),
             ).get_result()
-        result_builder = self._run_command(job, environ)
+        result_builder = self._run_command(
+            job, environ, ui_delegate, concurrent
+        )
 
         # for user-interact-verify and user-verify jobs the operator chooses
         # the final outcome, so we need to reset the outcome to undecided
@@ -157,7 +296,7 @@ class UnifiedRunner(IJobRunner):
         # this is left here to conform to the interface
         return []
 
-    def _run_command(self, job, environ):
+    def _run_command(self, job, environ, ui_delegate, concurrent=False):
         start_time = time.time()
         slug = slugify(job.id)
         output_writer = CommandOutputWriter(
@@ -170,21 +309,20 @@ class UnifiedRunner(IJobRunner):
         )
         io_log_gen = IOLogRecordGenerator()
         log = os.path.join(self._jobs_io_log_dir, "{}.record.gz".format(slug))
-        with gzip.open(log, mode="wb") as gzip_stream, io.TextIOWrapper(
-            gzip_stream, encoding="UTF-8"
-        ) as record_stream:
-            writer = IOLogRecordWriter(record_stream)
+        with gzip.open(log, mode="wb") as gzip_stream:
+            writer = BinaryIOLogRecordWriter(gzip_stream)
             io_log_gen.on_new_record.connect(writer.write_record)
-            delegate = extcmd.Chain(
-                [
-                    self._job_runner_ui_delegate,
-                    io_log_gen,
-                    self._command_io_delegate,
-                    output_writer,
-                ]
-            )
+            delegate_list = [ui_delegate, io_log_gen, output_writer]
+            if not concurrent:
+                delegate_list.insert(2, self._command_io_delegate)
+            delegate = extcmd.Chain(delegate_list)
             ecmd = extcmd.ExternalCommandWithDelegate(delegate)
-            return_code = self.execute_job(job, environ, ecmd, self._stdin)
+            if concurrent:
+                # Jobs running at the same time can't share the terminal
+                with open(os.devnull, "rb") as stdin:
+                    return_code = self.execute_job(job, environ, ecmd, stdin)
+            else:
+                return_code = self.execute_job(job, environ, ecmd, self._stdin)
             io_log_gen.on_new_record.disconnect(writer.write_record)
         if return_code == 0:
             outcome = IJobResult.OUTCOME_PASS
@@ -207,7 +345,6 @@ class UnifiedRunner(IJobRunner):
 
         def call(extcmd_popen, *args, **kwargs):
             """Handle low-level subprocess stuff."""
-            is_alive = True
             # Notify that the process is about to start
             extcmd_popen._delegate.on_begin(args, kwargs)
             # Setup stdout/stderr redirection
@@ -225,70 +362,44 @@ class UnifiedRunner(IJobRunner):
                 if password:
                     os.write(in_w, password + b"\n")
 
-            def stdin_forwarder(stdin):
-                """Forward data from one pipe to the other."""
-                # use systems stdin if the stdin pipe wasn't provided
-                stdin = stdin or sys.stdin
-                try:
-                    while is_alive:
-                        if stdin in select.select([stdin], [], [], 0)[0]:
-                            buf = stdin.readline()
-                            if buf == "":
-                                break
-                            os.write(in_w, buf.encode(stdin.encoding))
-                        else:
-                            time.sleep(0.1)
-                except BrokenPipeError:
-                    pass
-                os.close(in_w)
-
-            forwarder_thread = threading.Thread(
-                target=stdin_forwarder, args=(stdin,)
-            )
-            forwarder_thread.start()
             kwargs["stdin"] = in_r
 
-            # Start the process
-            proc = extcmd_popen._popen(*args, **kwargs)
-            self._running_jobs_pid = proc.pid
-            # Setup all worker threads. By now the pipes have been created and
-            # proc.stdout/proc.stderr point to open pipe objects.
-            stdout_reader = threading.Thread(
-                target=extcmd_popen._read_stream, args=(proc.stdout, "stdout")
-            )
-            stderr_reader = threading.Thread(
-                target=extcmd_popen._read_stream, args=(proc.stderr, "stderr")
-            )
-            queue_worker = threading.Thread(target=extcmd_popen._drain_queue)
-            # Start all workers
-            queue_worker.start()
-            stdout_reader.start()
-            stderr_reader.start()
+            # The pump owns in_w from now on. Use the system stdin if the
+            # stdin pipe wasn't provided.
+            pump = IOPump()
+            try:
+                pump.add_input(stdin or sys.stdin, in_w)
+                # Start the process
+                proc = extcmd_popen._popen(*args, **kwargs)
+            except BaseException:
+                pump.close()
+                os.close(in_r)
+                raise
+            self._running_jobs_pid_set.add(proc.pid)
             try:
+                # By now the pipes have been created and
+                # proc.stdout/proc.stderr point to open pipe objects.
+                pump.add_output(proc.stdout, "stdout", extcmd_popen._delegate)
+                pump.add_output(proc.stderr, "stderr", extcmd_popen._delegate)
                 while True:
                     try:
+                        pump.run()
                         proc.wait()
                         break
                     except KeyboardInterrupt:
-                        is_alive = False
                         import signal
 
-                        self.send_signal(signal.SIGKILL, target_user)
+                        self._send_signal_to_pid(
+                            signal.SIGKILL, target_user, proc.pid
+                        )
                         # And send a notification about this
                         extcmd_popen._delegate.on_interrupt()
             finally:
-                self._running_jobs_pid = None
-                # Wait until all worker threads shut down
-                stdout_reader.join()
+                self._running_jobs_pid_set.discard(proc.pid)
+                pump.close()
                 proc.stdout.close()
-                stderr_reader.join()
                 proc.stderr.close()
-                # Tell the queue worker to shut down
-                extcmd_popen._queue.put(None)
-                queue_worker.join()
                 os.close(in_r)
-                is_alive = False
-                forwarder_thread.join()
             # Notify that the process has finished
             extcmd_popen._delegate.on_end(proc.returncode)
             return proc.returncode
@@ -347,20 +458,54 @@ class UnifiedRunner(IJobRunner):
         :returns:
             Pathname of the executable symlink nest directory.
         """
-        # Create a nest for all the private executables needed for execution
-        prefix = "nest-"
-        suffix = ".{}".format(job.checksum)
-        with tempfile.TemporaryDirectory(suffix, prefix) as nest_dir:
-            os.chmod(nest_dir, 0o777)
-            logger.debug(_("Symlink nest for executables: %s"), nest_dir)
-            from plainbox.impl.ctrl import SymLinkNest
-
-            nest = SymLinkNest(nest_dir)
-            # Add all providers sharing namespace with the current job to PATH
-            for provider in self._provider_list:
-                if job.provider.namespace == provider.namespace:
-                    nest.add_provider(provider)
-            yield nest_dir
+        yield self._get_nest_dir(job.provider.namespace)
+
+    def _get_nest_dir(self, namespace):
+        """
+        Get the executable symlink nest directory of a provider namespace.
+
+        The nest is created the first time a job of the namespace runs and is
+        reused by all the other jobs of the namespace. It is rebuilt only if
+        the providers of the namespace change or if the directory vanished or
+        can be written to by anyone else than the user of the runner, as the
+        nest is put on the PATH of jobs running as root.
+        The directory is removed when the runner goes away.
+        """
+        provider_list = tuple(
+            provider
+            for provider in self._provider_list
+            if provider.namespace == namespace
+        )
+        with self._nest_lock:
+            try:
+                nest_providers, nest_dir, finalizer = self._nest_map[namespace]
+            except KeyError:
+                pass
+            else:
+                if nest_providers == provider_list and _is_private_dir(
+                    nest_dir
+                ):
+                    return nest_dir
+                finalizer()
+            nest_dir = self._create_nest_dir(namespace, provider_list)
+            finalizer = weakref.finalize(self, shutil.rmtree, nest_dir, True)
+            self._nest_map[namespace] = (provider_list, nest_dir, finalizer)
+            return nest_dir
+
+    def _create_nest_dir(self, namespace, provider_list):
+        # Create a nest for all the private executables needed for execution.
+        # Jobs running as another user must be able to use it, but only the
+        # user of the runner may change it.
+        nest_dir = tempfile.mkdtemp(".{}".format(namespace), "nest-")
+        os.chmod(nest_dir, 0o755)
+        logger.debug(_("Symlink nest for executables: %s"), nest_dir)
+        from plainbox.impl.ctrl import SymLinkNest
+
+        nest = SymLinkNest(nest_dir)
+        # Add all providers sharing namespace with the current job to PATH
+        for provider in provider_list:
+            nest.add_provider(provider)
+        return nest_dir
 
     @contextlib.contextmanager
     def temporary_cwd(self, job):
@@ -427,13 +572,30 @@ class UnifiedRunner(IJobRunner):
         )
 
     def send_signal(self, signal, target_user):
-        if not self._running_jobs_pid:
+        if not self._running_jobs_pid_set:
             # this can happen because the kill command is issued
             # just as the job finishes
             logger.error("No job is currently running")
             return
+        for pid in list(self._running_jobs_pid_set):
+            self._send_signal_to_pid(signal, target_user, pid)
+
+    def kill_running_jobs(self):
+        """Kill the process groups of all the jobs that are still running."""
+        import signal
+
+        for pid in list(self._running_jobs_pid_set):
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            except PermissionError:
+                # the job runs as another user, sudo is needed to kill it
+                self._send_signal_to_pid(signal.SIGKILL, True, pid)
+
+    def _send_signal_to_pid(self, signal, target_user, pid):
         if not target_user:
-            os.kill(self._running_jobs_pid, signal)
+            os.kill(pid, signal)
         else:
             # process used sudo, so sudo is needed to kill it
             in_r, in_w = os.pipe()
@@ -449,7 +611,7 @@ class UnifiedRunner(IJobRunner):
                 "kill",
                 "-s",
                 str(signal),
-                "-{}".format(self._running_jobs_pid),
+                "-{}".format(pid),
             ]
             try:
                 subprocess.check_call(cmd, stdin=in_r)
@@ -464,14 +626,14 @@ class FakeJobRunner(UnifiedRunner):
     Special runner that creates fake resource objects.
     """
 
-    def run_job(self, job, job_state, environ=None, ui=None):
+    def run_job(self, job, job_state, environ=None, ui=None, concurrent=False):
         """
         Only one resouce object is created from this runner.
         Exception: 'graphics_card' resource job creates two objects to
         simulate hybrid graphics.
         """
         if job.plugin != "resource":
-            return super().run_job(job, job_state, environ, ui)
+            return super().run_job(job, job_state, environ, ui, concurrent)
         builder = JobResultBuilder()
         if job.partial_id == "graphics_card":
             builder.io_log = [
@@ -486,6 +648,19 @@ class FakeJobRunner(UnifiedRunner):
         return builder.get_result()
 
 
+def _is_private_dir(path):
+    """Check that path is a directory only the current user can write to."""
+    try:
+        stat_result = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(stat_result.st_mode)
+        and stat_result.st_uid == os.getuid()
+        and not stat_result.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    )
+
+
 def get_execution_environment(job, environ, session_id, nest_dir):
     """
     Get the environment required to execute the specified job:
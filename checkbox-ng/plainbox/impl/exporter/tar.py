@@ -33,6 +33,7 @@ from tempfile import SpooledTemporaryFile
 from plainbox.impl.exporter import SessionStateExporterBase
 from plainbox.impl.exporter.jinja2 import Jinja2SessionStateExporter
 from plainbox.impl.providers import get_providers
+from plainbox.impl.result import io_log_text_cache
 from plainbox.impl.unit.exporter import ExporterUnitSupport
 
 
@@ -64,11 +65,16 @@ class TARSessionStateExporter(SessionStateExporterBase):
             preset = 0
 
         job_state_map = manager.default_device_context.state.job_state_map
-        with tarfile.TarFile.open(None, "w:xz", stream, preset=preset) as tar:
-            for fmt in ("html", "json", "junit"):
-                unit = self._get_all_exporter_units()[
-                    "com.canonical.plainbox::{}".format(fmt)
-                ]
+        exporter_map = self._get_exporter_units(manager)
+        # All the reports show the same I/O logs, avoid decoding them again
+        # (the cache is bounded, see io_log_text_cache())
+        with io_log_text_cache(), tarfile.TarFile.open(
+            None, "w:xz", stream, preset=preset
+        ) as tar:
+            # submission.json comes first so that it can be read without
+            # decompressing the other reports (see merge-reports)
+            for fmt in ("json", "html", "junit"):
+                unit = exporter_map["com.canonical.plainbox::{}".format(fmt)]
                 exporter = Jinja2SessionStateExporter(exporter_unit=unit)
                 with SpooledTemporaryFile(max_size=102400, mode="w+b") as _s:
                     exporter.dump_from_session_manager(manager, _s)
@@ -77,30 +83,46 @@ class TARSessionStateExporter(SessionStateExporterBase):
                     tarinfo.mtime = time.time()
                     _s.seek(0)  # Need to rewind the file, puagh
                     tar.addfile(tarinfo, _s)
-            for job_id in manager.default_device_context.state.job_state_map:
-                job_state = job_state_map[job_id]
+            for job_id, job_state in job_state_map.items():
                 try:
                     recordname = job_state.result.io_log_filename
                 except AttributeError:
                     continue
+                if not recordname:
+                    continue
+                folder = "test_output"
+                if job_state.job.plugin == "attachment":
+                    folder = "attachment_files"
                 for stdstream in ("stdout", "stderr"):
                     filename = recordname.replace("record.gz", stdstream)
-                    folder = "test_output"
-                    if job_state.job.plugin == "attachment":
-                        folder = "attachment_files"
-                    if os.path.exists(filename) and os.path.getsize(filename):
-                        arcname = os.path.basename(filename)
-                        if stdstream == "stdout":
-                            arcname = os.path.splitext(arcname)[0]
-                        tar.add(
-                            filename,
-                            os.path.join(folder, arcname),
-                            recursive=False,
-                        )
+                    try:
+                        if not os.path.getsize(filename):
+                            continue
+                    except OSError:
+                        continue
+                    arcname = os.path.basename(filename)
+                    if stdstream == "stdout":
+                        arcname = os.path.splitext(arcname)[0]
+                    tar.add(
+                        filename,
+                        os.path.join(folder, arcname),
+                        recursive=False,
+                    )
 
     def dump(self, session, stream):
         pass
 
+    def _get_exporter_units(self, manager):
+        # The exporter units are normally loaded in the session already,
+        # looking for them in all the providers is a last resort.
+        exporter_map = manager.exporter_map
+        if all(
+            "com.canonical.plainbox::{}".format(fmt) in exporter_map
+            for fmt in ("html", "json", "junit")
+        ):
+            return exporter_map
+        return self._get_all_exporter_units()
+
     def _get_all_exporter_units(self):
         exporter_map = {}
         for provider in get_providers():
@@ -0,0 +1,88 @@
+# This file is part of Checkbox.
+#
+# Copyright 2024 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+plainbox.impl.exporter.test_tar
+===============================
+
+Test definitions for plainbox.impl.exporter.tar module
+"""
+
+from io import BytesIO
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+import os
+import tarfile
+
+from plainbox.impl.exporter.tar import TARSessionStateExporter
+from plainbox.impl.result import DiskJobResult
+from plainbox.impl.result import _io_log_text_cache
+from plainbox.vendor import mock
+
+
+class TARSessionStateExporterTests(TestCase):
+    def setUp(self):
+        self.scratch_dir = TemporaryDirectory()
+        record_path = os.path.join(self.scratch_dir.name, "job.record.gz")
+        with open(record_path.replace("record.gz", "stdout"), "wb") as f:
+            f.write(b"output")
+        job_state = mock.Mock(
+            result=DiskJobResult({"io_log_filename": record_path})
+        )
+        job_state.job.plugin = "shell"
+        self.manager = mock.Mock()
+        self.manager.default_device_context.state.job_state_map = {
+            "job": job_state
+        }
+        self.manager.exporter_map = {
+            "com.canonical.plainbox::{}".format(fmt): mock.Mock(name=fmt)
+            for fmt in ("html", "json", "junit")
+        }
+
+    def tearDown(self):
+        self.scratch_dir.cleanup()
+
+    def _dump(self, manager, stream):
+        # The io-log text cache must be active while the reports are rendered
+        self.assertIsNotNone(_io_log_text_cache.cache)
+        stream.write(b"report")
+
+    @mock.patch("plainbox.impl.exporter.tar.get_providers")
+    @mock.patch("plainbox.impl.exporter.tar.Jinja2SessionStateExporter")
+    def test_dump_from_session_manager(self, mock_exporter, mock_providers):
+        mock_exporter().dump_from_session_manager.side_effect = self._dump
+        stream = BytesIO()
+        TARSessionStateExporter().dump_from_session_manager(
+            self.manager, stream
+        )
+        mock_providers.assert_not_called()
+        stream.seek(0)
+        with tarfile.open(fileobj=stream, mode="r:xz") as tar:
+            self.assertEqual(
+                tar.getnames(),
+                [
+                    "submission.json",
+                    "submission.html",
+                    "submission.junit",
+                    "test_output/job",
+                ],
+            )
+            self.assertEqual(
+                tar.extractfile("submission.json").read(), b"report"
+            )
+            self.assertEqual(
+                tar.extractfile("test_output/job").read(), b"output"
+            )
@@ -23,40 +23,172 @@ This module should reduce the time needed to bootstrap a session
 by reusing previously obtained results.
 """
 
+import contextlib
+import hashlib
 import json
 import logging
 import os
+import platform
 import shutil
+import tempfile
+import threading
+import time
 from plainbox.impl.result import DiskJobResult
 from plainbox.i18n import gettext as _
 
 logger = logging.getLogger("plainbox.jobcache")
 
 
+def _read_first_line(path):
+    try:
+        with open(path, "rt", encoding="UTF-8", errors="replace") as stream:
+            return stream.readline().strip()
+    except OSError:
+        return None
+
+
+def _get_boot_id():
+    return _read_first_line("/proc/sys/kernel/random/boot_id")
+
+
+def _get_kernel():
+    return " ".join((platform.release(), platform.version()))
+
+
+def _get_packages():
+    # Cheap summary of the installed packages: the debian packages database
+    # is rewritten on each change and each snap revision has its own file
+    state = []
+    try:
+        dpkg_status = os.stat("/var/lib/dpkg/status")
+        state.append([dpkg_status.st_mtime_ns, dpkg_status.st_size])
+    except OSError:
+        state.append(None)
+    try:
+        state.append(sorted(os.listdir("/var/lib/snapd/snaps")))
+    except OSError:
+        state.append(None)
+    return state
+
+
+def _get_dmi():
+    return [
+        _read_first_line(os.path.join("/sys/class/dmi/id", name))
+        for name in (
+            "sys_vendor",
+            "product_name",
+            "product_version",
+            "board_vendor",
+            "board_name",
+            "bios_version",
+            "bios_date",
+        )
+    ]
+
+
 class ResourceJobCache:
     """
     Cache storing results of previously run resource jobs
+
+    The cache keeps an index of its entries so that only the entries that are
+    actually used are loaded. Each entry records the fingerprint of the
+    system it was computed on (see ``INVALIDATION_KEY_MAP``), entries from a
+    different fingerprint or older than ``max_age`` seconds are never used.
+    The least recently used entries are evicted once the cache grows past
+    ``max_size`` bytes.
     """
 
-    def __init__(self):
+    INDEX_VERSION = 1
+    INDEX_FILENAME = "index.json"
+
+    # Functions computing the parts of the fingerprint of the system
+    INVALIDATION_KEY_MAP = {
+        "boot_id": _get_boot_id,
+        "kernel": _get_kernel,
+        "packages": _get_packages,
+        "dmi": _get_dmi,
+    }
+    DEFAULT_INVALIDATION_KEYS = ("kernel", "packages", "dmi")
+    DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+    DEFAULT_MAX_AGE = 30 * 24 * 3600
+
+    def __init__(
+        self,
+        invalidation_keys=DEFAULT_INVALIDATION_KEYS,
+        max_size=DEFAULT_MAX_SIZE,
+        max_age=DEFAULT_MAX_AGE,
+    ):
         """
-        Load existing entries from the filesystem
+        Initialize an empty cache, use :meth:`load()` to read its index.
+
+        :param invalidation_keys:
+            Names of the INVALIDATION_KEY_MAP entries that must not change
+            for a cached result to be used
+        :param max_size:
+            Size of the cache in bytes past which entries are evicted
+        :param max_age:
+            Age in seconds after which an entry is not used anymore
         """
-        self._cache = {}
+        for key in invalidation_keys:
+            if key not in self.INVALIDATION_KEY_MAP:
+                raise ValueError(
+                    _("Unknown cache invalidation key: {}").format(key)
+                )
+        self._invalidation_keys = tuple(sorted(invalidation_keys))
+        self._max_size = max_size
+        self._max_age = max_age
+        self._fingerprint = None
+        # Map from job checksum to the index entry of its cached result
+        self._index = {}
+        # Jobs running concurrently share the cache, the lock guards the
+        # index and the entries but it is not held while computing results
+        self._lock = threading.Lock()
+
+    @property
+    def fingerprint(self):
+        """Fingerprint of the system according to the invalidation keys."""
+        if self._fingerprint is None:
+            state = {
+                key: self.INVALIDATION_KEY_MAP[key]()
+                for key in self._invalidation_keys
+            }
+            self._fingerprint = hashlib.sha256(
+                json.dumps(state, sort_keys=True).encode("UTF-8")
+            ).hexdigest()
+        return self._fingerprint
 
     def clear(self):
         logger.debug("Clearing cache")
-        for root, subdirs, files in os.walk(self._get_cache_path()):
-            for subdir in subdirs:
-                try:
-                    shutil.rmtree(os.path.join(root, subdir))
-                except Exception as exc:
-                    logger.warning("Failed to clear the cache. %s" % exc)
+        with self._lock:
+            for root, subdirs, files in os.walk(self._get_cache_path()):
+                for subdir in subdirs:
+                    try:
+                        shutil.rmtree(os.path.join(root, subdir))
+                    except Exception as exc:
+                        logger.warning("Failed to clear the cache. %s" % exc)
+                break
+            self._index = {}
+            self._remove_index()
 
     def load(self):
-        for root, subdirs, files in os.walk(self._get_cache_path()):
-            for subdir in subdirs:
-                self._try_load_cache_entry(os.path.join(root, subdir))
+        """
+        Load the index of the cache.
+
+        Caches written without an index can't tell the system their entries
+        were computed on, so they are cleared.
+        """
+        try:
+            with open(self._get_index_path(), "rt", encoding="UTF-8") as f:
+                index = json.load(f)
+            if index["version"] != self.INDEX_VERSION:
+                raise ValueError(index["version"])
+            self._index = index["entries"]
+        except FileNotFoundError:
+            if os.path.isdir(self._get_cache_path()):
+                self.clear()
+        except Exception as exc:
+            logger.warning(_("Error loading the cache index. %s"), exc)
+            self.clear()
 
     def get(self, job_checksum, compute_fn):
         """
@@ -65,15 +197,34 @@ class ResourceJobCache:
             - a bool signifying whether the result was found in cache
             - a DiskJobResult object with the result
         """
-        in_cache = job_checksum in self._cache.keys()
-        if not in_cache:
-            logger.debug(_("%s not found in cache"), job_checksum)
-            result = compute_fn().get_builder().as_dict()
+        with self._lock:
+            result = self._lookup(job_checksum)
+            if result is not None:
+                logger.info(_("%s found in cache"), job_checksum)
+                self._index[job_checksum]["used"] = time.time()
+                self._save_index()
+                return True, DiskJobResult(result)
+        logger.debug(_("%s not found in cache"), job_checksum)
+        result = compute_fn().get_builder().as_dict()
+        with self._lock:
             self._store(job_checksum, result.copy())
-        else:
-            logger.info(_("%s found in cache"), job_checksum)
-            result = self._cache[job_checksum]
-        return in_cache, DiskJobResult(result)
+            self._evict()
+            self._save_index()
+        return False, DiskJobResult(result)
+
+    def _lookup(self, job_checksum):
+        entry = self._index.get(job_checksum)
+        if entry is None:
+            return None
+        if entry["fingerprint"] != self.fingerprint:
+            logger.debug(_("Cache entry %s is stale"), job_checksum)
+            return None
+        if time.time() - entry["created"] > self._max_age:
+            logger.debug(_("Cache entry %s expired"), job_checksum)
+            return None
+        return self._try_load_cache_entry(
+            os.path.join(self._get_cache_path(), job_checksum)
+        )
 
     def _try_load_cache_entry(self, job_cache_path):
         job_checksum = os.path.basename(job_cache_path)
@@ -89,11 +240,12 @@ class ResourceJobCache:
                         _("Error loading cache entry. Missing %s"),
                         cache_entry["io_log_filename"],
                     )
-                    return
+                    return None
                 logger.debug(_("Cache entry %s loaded"), job_checksum)
-                self._cache[job_checksum] = cache_entry
+                return cache_entry
         except Exception as exc:
-            logger.warrning(_("Error loading cache entry. %s"), exc)
+            logger.warning(_("Error loading cache entry. %s"), exc)
+            return None
 
     def _get_cache_path(self):
         suc = os.environ.get("SNAP_USER_COMMON")
@@ -106,21 +258,79 @@ class ResourceJobCache:
             xdg_cache_home = os.path.join(os.path.expanduser("~"), ".cache")
         return os.path.join(xdg_cache_home, "plainbox", "resource_job_cache")
 
+    def _get_index_path(self):
+        return os.path.join(self._get_cache_path(), self.INDEX_FILENAME)
+
+    def _save_index(self):
+        tmp_path = None
+        try:
+            os.makedirs(self._get_cache_path(), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                ".tmp", self.INDEX_FILENAME + ".", self._get_cache_path()
+            )
+            with open(fd, "wt", encoding="UTF-8") as index_file:
+                json.dump(
+                    {"version": self.INDEX_VERSION, "entries": self._index},
+                    index_file,
+                    sort_keys=True,
+                    separators=(",", ":"),
+                )
+            os.replace(tmp_path, self._get_index_path())
+        except OSError as exc:
+            logger.warning(_("Failed to write the cache index. %s"), exc)
+            if tmp_path is not None:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+
+    def _remove_index(self):
+        try:
+            os.remove(self._get_index_path())
+        except FileNotFoundError:
+            pass
+
+    def _remove_entry(self, job_checksum):
+        self._index.pop(job_checksum, None)
+        job_cache_path = os.path.join(self._get_cache_path(), job_checksum)
+        try:
+            shutil.rmtree(job_cache_path)
+        except FileNotFoundError:
+            pass
+        except Exception as exc:
+            logger.warning(
+                _("Failed to remove path in Resource Cache: %s %s"),
+                job_cache_path,
+                exc,
+            )
+
+    def _evict(self):
+        """Remove the expired and the least recently used entries."""
+        now = time.time()
+        for job_checksum, entry in list(self._index.items()):
+            if now - entry["created"] > self._max_age:
+                logger.debug(
+                    _("Evicting expired cache entry %s"), job_checksum
+                )
+                self._remove_entry(job_checksum)
+        lru_list = sorted(self._index, key=lambda c: self._index[c]["used"])
+        size = sum(entry["size"] for entry in self._index.values())
+        # The most recently used entry is always kept
+        for job_checksum in lru_list[:-1]:
+            if size <= self._max_size:
+                break
+            logger.debug(_("Evicting cache entry %s"), job_checksum)
+            size -= self._index[job_checksum]["size"]
+            self._remove_entry(job_checksum)
+
     def _store(self, job_checksum, result):
         logger.info(
             _("Caching job result for job with checksum %s"), job_checksum
         )
         job_cache_path = os.path.join(self._get_cache_path(), job_checksum)
         if os.path.exists(job_cache_path):
-            # this can happen if the loading failed, so let's clear the path
-            try:
-                shutil.rmtree(job_cache_path)
-            except Exception as exc:
-                logger.warning(
-                    _("Failed to remove path in Resource Cache: %s %s"),
-                    job_cache_path,
-                    exc,
-                )
+            # this can happen if the entry is stale or the loading failed,
+            # so let's clear the path
+            self._remove_entry(job_checksum)
+            if os.path.exists(job_cache_path):
                 return
         os.makedirs(job_cache_path)
         cached_io_log_path = os.path.join(
@@ -144,4 +354,10 @@ class ResourceJobCache:
             data,
             os.path.join(job_cache_path, "result.json"),
         )
-        self._cache[job_checksum] = result
+        now = time.time()
+        self._index[job_checksum] = {
+            "fingerprint": self.fingerprint,
+            "size": len(data) + os.path.getsize(cached_io_log_path),
+            "created": now,
+            "used": now,
+        }
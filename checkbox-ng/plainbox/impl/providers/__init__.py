@@ -44,6 +44,7 @@ this is also described by :class:`IProvider1`::
 
 import logging
 import os
+import re
 
 from plainbox.impl.providers.embedded_providers import (
     EmbeddedProvider1PlugInCollection,
@@ -115,3 +116,157 @@ def get_providers(*, only_secure: bool = False) -> "List[Provider1]":
         )
         raise SystemExit(message)
     return loaded_provs
+
+
+# Fields of the units (jobs, templates and test plans) that may reference
+# other namespaces, either by qualified identifiers (or patterns) like
+# "namespace::id" or by imports like "from namespace import id"
+_NAMESPACE_REF_FIELDS = (
+    "include",
+    "mandatory_include",
+    "bootstrap_include",
+    "exclude",
+    "nested_part",
+    "depends",
+    "after",
+    "salvages",
+    "requires",
+    "imports",
+    "category_id",
+    "template-resource",
+    "template-filter",
+    "template-imports",
+)
+
+_NAMESPACE_IMPORT_RE = re.compile(r"\bfrom\s+(\S+)\s+import\b")
+
+# Trailing part of a qualified identifier in a resource expression
+# like "(com.canonical.certification::package.name == 'foo')"
+_NAMESPACE_TAIL_RE = re.compile(r"[\w.\-]+$")
+
+
+def _resolve_namespace_ref(ref, namespaces):
+    """
+    Find the namespaces matching a namespace reference
+
+    :param ref:
+        The part of a qualified identifier (or pattern) before "::"
+    :param namespaces:
+        Collection of all the known namespaces
+    :returns:
+        A set of namespaces (from namespaces) matching the reference, empty
+        if the reference cannot be resolved.
+    """
+    if ref in namespaces:
+        return {ref}
+    try:
+        # Test plan patterns are regular expressions
+        ref_re = re.compile(ref)
+    except re.error:
+        pass
+    else:
+        matching = {
+            namespace
+            for namespace in namespaces
+            if ref_re.fullmatch(namespace)
+        }
+        if matching:
+            return matching
+    match = _NAMESPACE_TAIL_RE.search(ref)
+    if match and match.group(0) in namespaces:
+        return {match.group(0)}
+    return set()
+
+
+def _get_referenced_namespaces(unit, namespaces):
+    """
+    Compute the set of namespaces referenced by a unit
+
+    :param unit:
+        The unit to inspect
+    :param namespaces:
+        Collection of all the known namespaces
+    :returns:
+        A set of namespaces (from namespaces) that are referenced by the
+        unit or None if some reference cannot be resolved to a known
+        namespace. Patterns (as found in test plans) are matched against all
+        the known namespaces.
+    """
+    referenced = set()
+    for field in _NAMESPACE_REF_FIELDS:
+        try:
+            value = unit.get_record_value(field)
+        except Exception as exc:
+            logger.debug("Cannot read %s of %s: %s", field, unit, exc)
+            return None
+        if not isinstance(value, str):
+            continue
+        for match in _NAMESPACE_IMPORT_RE.finditer(value):
+            if match.group(1) not in namespaces:
+                return None
+            referenced.add(match.group(1))
+        for token in value.split():
+            ref, sep, _ = token.partition("::")
+            if not sep:
+                continue
+            matching = _resolve_namespace_ref(ref, namespaces)
+            if not matching:
+                logger.debug("Cannot resolve namespace of %s", token)
+                return None
+            referenced.update(matching)
+    return referenced
+
+
+def get_test_plan_providers(
+    provider_list: "List[Provider1]", test_plan_id: str
+) -> "List[Provider1]":
+    """
+    Find the providers needed to run a test plan.
+
+    :param provider_list:
+        A list of all the available providers.
+    :param test_plan_id:
+        Identifier of the test plan.
+    :returns:
+        The sub-list of providers that belong to a namespace reachable from
+        the test plan. If the namespace of the test plan is not known (or
+        some reference cannot be resolved to a known namespace), all the
+        providers are returned.
+
+    Starting with the namespace of the test plan, the units of all the
+    providers sharing a namespace are loaded and inspected to find references
+    to other namespaces (through nested parts, qualified includes, job
+    dependencies, imports and so on) until no new namespace is found. Only
+    providers in the reached namespaces are ever loaded. Providers embedded
+    in plainbox (exporters, categories and manifest) are always kept.
+    """
+    from plainbox.impl.providers import special
+
+    namespace = test_plan_id.partition("::")[0]
+    namespace_map = {}
+    for provider in provider_list:
+        namespace_map.setdefault(provider.namespace, []).append(provider)
+    if namespace not in namespace_map:
+        return list(provider_list)
+    # The namespace of the providers embedded in plainbox
+    plainbox_namespace = special.get_categories_def().name.split(":", 1)[0]
+    reachable = set()
+    todo = [namespace, plainbox_namespace]
+    while todo:
+        namespace = todo.pop()
+        if namespace in reachable or namespace not in namespace_map:
+            continue
+        reachable.add(namespace)
+        for provider in namespace_map[namespace]:
+            for unit in provider.unit_list:
+                referenced = _get_referenced_namespaces(unit, namespace_map)
+                if referenced is None:
+                    # Better load too many providers than miss one
+                    return list(provider_list)
+                todo.extend(referenced - reachable)
+    logger.info("Namespaces reachable from %s: %s", test_plan_id, reachable)
+    return [
+        provider
+        for provider in provider_list
+        if provider.namespace in reachable
+    ]
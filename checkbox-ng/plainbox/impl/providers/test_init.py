@@ -0,0 +1,142 @@
+# This file is part of Checkbox.
+#
+# Copyright 2024 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest import TestCase, mock
+
+from plainbox.impl.providers import get_test_plan_providers
+
+
+class GetTestPlanProvidersTests(TestCase):
+    def _make_provider(self, namespace, *data_list):
+        provider = mock.Mock(namespace=namespace)
+        unit_list = mock.PropertyMock(
+            return_value=[
+                mock.Mock(get_record_value=data.get) for data in data_list
+            ]
+        )
+        type(provider).unit_list = unit_list
+        return provider, unit_list
+
+    def test_unreachable_providers_are_not_loaded(self):
+        plainbox, _ = self._make_provider("com.canonical.plainbox")
+        main, _ = self._make_provider(
+            "com.example.main",
+            {"unit": "test plan", "id": "tp", "include": "job-.*"},
+        )
+        other, other_unit_list = self._make_provider("com.example.other")
+        result = get_test_plan_providers(
+            [plainbox, main, other], "com.example.main::tp"
+        )
+        self.assertEqual(result, [plainbox, main])
+        other_unit_list.assert_not_called()
+
+    def test_references_are_followed(self):
+        plainbox, _ = self._make_provider("com.canonical.plainbox")
+        main, _ = self._make_provider(
+            "com.example.main",
+            {
+                "unit": "test plan",
+                "id": "tp",
+                "nested_part": "com.example.a::tp",
+            },
+        )
+        a, _ = self._make_provider(
+            "com.example.a",
+            {
+                "unit": "test plan",
+                "id": "tp",
+                "include": "com\\.example\\.b::.*",
+            },
+            {"id": "job", "imports": "from com.example.c import res"},
+        )
+        b, _ = self._make_provider(
+            "com.example.b", {"id": "job", "depends": "com.example.d::job"}
+        )
+        c, _ = self._make_provider("com.example.c")
+        d, _ = self._make_provider("com.example.d")
+        e, _ = self._make_provider("com.example.e")
+        provider_list = [plainbox, main, a, b, c, d, e]
+        result = get_test_plan_providers(provider_list, "com.example.main::tp")
+        self.assertEqual(result, [plainbox, main, a, b, c, d])
+
+    def test_namespace_patterns(self):
+        main, _ = self._make_provider(
+            "com.example.main",
+            {"unit": "test plan", "id": "tp", "include": ".*::job"},
+        )
+        other, _ = self._make_provider("com.example.other")
+        result = get_test_plan_providers([main, other], "com.example.main::tp")
+        self.assertEqual(result, [main, other])
+
+    def test_unknown_namespace(self):
+        main, main_unit_list = self._make_provider("com.example.main")
+        other, _ = self._make_provider("com.example.other")
+        result = get_test_plan_providers([main, other], "com.example.foo::tp")
+        self.assertEqual(result, [main, other])
+        main_unit_list.assert_not_called()
+
+    def test_namespace_alternatives(self):
+        main, _ = self._make_provider(
+            "com.example.main",
+            {
+                "unit": "test plan",
+                "id": "tp",
+                "include": "(com\\.example\\.a|com\\.example\\.b)::foo.*",
+            },
+        )
+        a, _ = self._make_provider("com.example.a")
+        b, _ = self._make_provider("com.example.b")
+        c, _ = self._make_provider("com.example.c")
+        result = get_test_plan_providers(
+            [main, a, b, c], "com.example.main::tp"
+        )
+        self.assertEqual(result, [main, a, b])
+
+    def test_namespace_character_classes(self):
+        main, _ = self._make_provider(
+            "com.example.main",
+            {
+                "unit": "test plan",
+                "id": "tp",
+                "include": "com\\.other\\.[a-z]+::foo",
+            },
+        )
+        a, _ = self._make_provider("com.other.a")
+        b, _ = self._make_provider("com.other.b2")
+        result = get_test_plan_providers([main, a, b], "com.example.main::tp")
+        self.assertEqual(result, [main, a])
+
+    def test_resource_expressions(self):
+        main, _ = self._make_provider(
+            "com.example.main",
+            {
+                "id": "job",
+                "requires": "(com.example.a::res.name == 'x')",
+            },
+        )
+        a, _ = self._make_provider("com.example.a")
+        b, _ = self._make_provider("com.example.b")
+        result = get_test_plan_providers([main, a, b], "com.example.main::tp")
+        self.assertEqual(result, [main, a])
+
+    def test_unresolved_reference(self):
+        main, _ = self._make_provider(
+            "com.example.main",
+            {"unit": "test plan", "id": "tp", "nested_part": "com.foo::tp"},
+        )
+        other, _ = self._make_provider("com.example.other")
+        result = get_test_plan_providers([main, other], "com.example.main::tp")
+        self.assertEqual(result, [main, other])
@@ -535,6 +535,9 @@ class ResourceExpression:
     evaluated against a single variable which references a Resource object.
     """
 
+    # Marker for the lazily computed split of compound expressions
+    _NOT_COMPUTED = object()
+
     def __init__(self, text, implicit_namespace=None, imports=None):
         """
         Analyze the text and prepare it for execution
@@ -558,6 +561,8 @@ class ResourceExpression:
             else:
                 self._resource_id_list.append(resource_alias)
         self._text = text
+        self._split = self._NOT_COMPUTED
+        self._prefilter = None
         self._lambda = eval(
             "lambda {}: {}".format(
                 ", ".join(self._resource_alias_list), self._text
@@ -634,27 +639,23 @@ class ResourceExpression:
         Each subsequent resource from the list will be bound to the resource
         id in the expression. The return value is True if any of the attempts
         return a true value, otherwise the result is False.
-        """
-        # in compound expressions 'and' takes precedence over 'or' so because
-        # we're recursively evaluating, we need to first evaluate the ors so
-        # ands become the leaves in the tree and are actually computed first
-
-        # operator by itself may be a part of some identifier so let's
-        # look for one surrounded by spaced
-
-        # if parenthesis are used in the expression then there's a high chance
-        # we'll break the syntax with a bruteforce split on operator. Let's
-        # not do a split on exprs with parenthesis
-        if not "(" in self._text:
-            or_pos = self._text.rfind(" or ")
-            if or_pos > 0:
-                lhs, rhs = self._split_and_evaluate(" or ", resource_map)
-                return lhs or rhs
-            and_pos = self._text.rfind(" and ")
-            if and_pos > 0:
-                lhs, rhs = self._split_and_evaluate(" and ", resource_map)
-                return lhs and rhs
 
+        Compound expressions (using top-level ``or`` and ``and`` operators)
+        are evaluated part by part, using resource_map to look up the
+        resources of each part, and stop as soon as the result is known.
+        """
+        split = self._get_split()
+        if split is not None:
+            operator, head_expr, tail_expr = split
+            head_result = head_expr._evaluate_with_map(resource_map)
+            if operator == " or ":
+                return head_result or tail_expr._evaluate_with_map(
+                    resource_map
+                )
+            else:
+                return head_result and tail_expr._evaluate_with_map(
+                    resource_map
+                )
         # there are no conjuctions, so let's do a simple evaluation
         for resource_list in resource_list_list:
             for resource in resource_list:
@@ -662,27 +663,43 @@ class ResourceExpression:
                     raise TypeError(
                         "Each resource must be a Resource instance"
                     )
+        filter_list, residual = self._get_prefilter()
+        if filter_list is not None:
+            # Narrow down each resource list with the parts of the expression
+            # that only look at that resource before building the product.
+            resource_list_list = [
+                self._filter_resource_list(resource_list, resource_filter)
+                for resource_list, resource_filter in zip(
+                    resource_list_list, filter_list
+                )
+            ]
+        else:
+            residual = self._lambda
         # Try each resource in sequence.
         for resource_pack in itertools.product(*resource_list_list):
-            # Attempt to evaluate the code with the current resource
-            try:
-                result = self._lambda(*resource_pack)
-            except Exception as exc:
-                # Treat any exception as a non-fatal error
-                #
-                # XXX: it would be interesting to see if we have exceptions and
-                # why they happen.  We could do deeper validation this way.
-                logger.debug(
-                    _(
-                        "Exception in requirement expression %r (with %s=%r):"
-                        " %r"
-                    ),
-                    self._text,
-                    self._resource_id_list,
-                    resource_pack,
-                    exc,
-                )
-                continue
+            if residual is None:
+                result = True
+            else:
+                # Attempt to evaluate the code with the current resource
+                try:
+                    result = residual(*resource_pack)
+                except Exception as exc:
+                    # Treat any exception as a non-fatal error
+                    #
+                    # XXX: it would be interesting to see if we have
+                    # exceptions and why they happen.  We could do deeper
+                    # validation this way.
+                    logger.debug(
+                        _(
+                            "Exception in requirement expression %r"
+                            " (with %s=%r): %r"
+                        ),
+                        self._text,
+                        self._resource_id_list,
+                        resource_pack,
+                        exc,
+                    )
+                    continue
             # Treat any true result as a success
             if result:
                 logger.debug(
@@ -697,28 +714,133 @@ class ResourceExpression:
         # documentation side.
         return False
 
-    def _split_and_evaluate(self, operator, resource_map):
-        head, tail = self._text.rsplit(operator, 1)
-        head_expr = ResourceExpression(
-            head, self._implicit_namespace, self._imports
-        )
-        new_res_list = [
-            resource_map[rid] for rid in head_expr.resource_id_list
-        ]
-        head_result = head_expr.evaluate(
-            *new_res_list, resource_map=resource_map
-        )
-        tail = tail.strip()
-        tail_expr = ResourceExpression(
-            tail, self._implicit_namespace, self._imports
-        )
-        new_res_list = [
-            resource_map[rid] for rid in tail_expr.resource_id_list
-        ]
-        tail_result = tail_expr.evaluate(
-            *new_res_list, resource_map=resource_map
+    def _evaluate_with_map(self, resource_map):
+        return self.evaluate(
+            *[resource_map[rid] for rid in self.resource_id_list],
+            resource_map=resource_map
         )
-        return (head_result, tail_result)
+
+    def _get_split(self):
+        """
+        Get the top-level operator of this expression.
+
+        :returns:
+            None for simple expressions or a tuple (operator, head_expr,
+            tail_expr) where both expressions are ResourceExpression
+            instances. The value is computed once and cached.
+        """
+        if self._split is not self._NOT_COMPUTED:
+            return self._split
+        split = None
+        # in compound expressions 'and' takes precedence over 'or' so because
+        # we're recursively evaluating, we need to first evaluate the ors so
+        # ands become the leaves in the tree and are actually computed first
+
+        # operator by itself may be a part of some identifier so let's
+        # look for one surrounded by spaced
+
+        # if parenthesis are used in the expression then there's a high chance
+        # we'll break the syntax with a bruteforce split on operator. Let's
+        # not do a split on exprs with parenthesis
+        if "(" not in self._text:
+            for operator in (" or ", " and "):
+                if self._text.rfind(operator) > 0:
+                    head, tail = self._text.rsplit(operator, 1)
+                    split = (
+                        operator,
+                        ResourceExpression(
+                            head, self._implicit_namespace, self._imports
+                        ),
+                        ResourceExpression(
+                            tail.strip(),
+                            self._implicit_namespace,
+                            self._imports,
+                        ),
+                    )
+                    break
+        self._split = split
+        return split
+
+    def _get_prefilter(self):
+        """
+        Get the per-resource filters of this expression.
+
+        When a simple expression references more than one resource and is a
+        conjunction, each part that only references one resource is compiled
+        to a separate filter. Those are used to shrink each resource list
+        before computing the cartesian product of all the lists.
+
+        :returns:
+            A tuple (filter_list, residual). The filter_list is None when
+            pre-filtering is not possible, otherwise it has one element per
+            resource alias: a list of single-argument callables. The residual
+            is a callable taking all the resources or None if there is nothing
+            left to check. The value is computed once and cached.
+        """
+        if self._prefilter is not None:
+            return self._prefilter
+        self._prefilter = (None, None)
+        alias_list = self._resource_alias_list
+        if len(alias_list) < 2:
+            return self._prefilter
+        args = ", ".join(alias_list)
+        body = ast.parse("lambda {}: {}".format(args, self._text), mode="eval")
+        body = body.body.body
+        if not isinstance(body, ast.BoolOp) or not isinstance(
+            body.op, ast.And
+        ):
+            return self._prefilter
+        filter_list = [[] for alias in alias_list]
+        residual_list = []
+        for value in body.values:
+            alias_set = {
+                node.id
+                for node in ast.walk(value)
+                if isinstance(node, ast.Name) and node.id in alias_list
+            }
+            if len(alias_set) == 1:
+                alias = alias_set.pop()
+                filter_list[alias_list.index(alias)].append(
+                    self._compile_lambda(alias, value)
+                )
+            else:
+                residual_list.append(value)
+        if not any(filter_list):
+            return self._prefilter
+        if not residual_list:
+            residual = None
+        elif len(residual_list) == 1:
+            residual = self._compile_lambda(args, residual_list[0])
+        else:
+            residual = self._compile_lambda(
+                args, ast.BoolOp(op=ast.And(), values=residual_list)
+            )
+        self._prefilter = (filter_list, residual)
+        return self._prefilter
+
+    @staticmethod
+    def _compile_lambda(args, body):
+        """Compile an expression node into a lambda taking args."""
+        tree = ast.parse("lambda {}: None".format(args), mode="eval")
+        tree.body.body = body
+        ast.fix_missing_locations(tree)
+        return eval(compile(tree, "<requirement>", "eval"))
+
+    def _filter_resource_list(self, resource_list, resource_filter):
+        """Get the resources that pass all the filters."""
+        filtered_list = []
+        for resource in resource_list:
+            try:
+                if all(func(resource) for func in resource_filter):
+                    filtered_list.append(resource)
+            except Exception as exc:
+                logger.debug(
+                    _("Exception in requirement expression %r (with %r): %r"),
+                    self._text,
+                    resource,
+                    exc,
+                )
+        return filtered_list
 
     @classmethod
     def _analyze(cls, text):
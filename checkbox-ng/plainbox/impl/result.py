@@ -29,6 +29,7 @@ This module has two basic implementation of :class:`IJobResult`:
 
 import base64
 import codecs
+import contextlib
 import gzip
 import imghdr
 import inspect
@@ -36,7 +37,9 @@ import io
 import json
 import logging
 import re
-from collections import namedtuple
+import struct
+import threading
+from collections import OrderedDict, namedtuple
 
 from plainbox.abc import IJobResult
 from plainbox.i18n import gettext as _
@@ -78,6 +81,60 @@ ANSI_ESCAPE_SEQ_RE_STR = re.compile(r"(\x9B|\x1B\[)[0-?]*[ -\/]*[@-~]")
 #   data - the actual IO seen (bytes)
 IOLogRecord = namedtuple("IOLogRecord", "delay stream_name data".split())
 
+# Per-thread storage of the cache used by io_log_text_cache()
+_io_log_text_cache = threading.local()
+
+
+class _IOLogTextCache:
+    """
+    Least recently used cache of decoded I/O logs, bounded by their length
+    """
+
+    def __init__(self, max_size):
+        self._max_size = max_size
+        self._size = 0
+        self._text_map = OrderedDict()
+
+    def get(self, key, decode_fn):
+        try:
+            text = self._text_map[key]
+        except KeyError:
+            pass
+        else:
+            self._text_map.move_to_end(key)
+            return text
+        text = decode_fn()
+        if len(text) > self._max_size:
+            return text
+        self._text_map[key] = text
+        self._size += len(text)
+        while self._size > self._max_size:
+            _, evicted_text = self._text_map.popitem(last=False)
+            self._size -= len(evicted_text)
+        return text
+
+
+@contextlib.contextmanager
+def io_log_text_cache(max_size=32 * 1024 * 1024):
+    """
+    Context manager sharing the decoded text of I/O logs between readers
+
+    While the context is active, :attr:`DiskJobResult.io_log_as_flat_text` and
+    :attr:`DiskJobResult.io_log_as_text_attachment` are remembered so that
+    each one is only decoded once. The least recently used texts are dropped
+    once they add up to more than ``max_size`` characters. This is meant for
+    exporters that render several reports of the same session. Nested
+    contexts share the same cache.
+    """
+    if getattr(_io_log_text_cache, "cache", None) is not None:
+        yield
+        return
+    _io_log_text_cache.cache = _IOLogTextCache(max_size)
+    try:
+        yield
+    finally:
+        _io_log_text_cache.cache = None
+
 
 # Tuple representing meta-data associated with each possible value of "outcome"
 #
@@ -428,14 +485,13 @@ class _JobResultBase(IJobResult):
         >>> result.io_log_as_flat_text
         '�'
         """
-        return "".join(
-            CONTROL_CODE_RE_STR.sub("", text_chunk)
-            for text_chunk in codecs.iterdecode(
-                (record.data for record in self.get_io_log()),
-                "UTF-8",
-                "replace",
+        cache = getattr(_io_log_text_cache, "cache", None)
+        if cache is not None and self._io_log_key is not None:
+            return cache.get(
+                (self._io_log_key, "flat"),
+                lambda: self._decode_io_log_text(attachment=False)[0],
             )
-        )
+        return self._decode_io_log_text(attachment=False)[0]
 
     @property
     def io_log_as_text_attachment(self):
@@ -454,20 +510,61 @@ class _JobResultBase(IJobResult):
             encoding) with Unicode control characters removed, if possible, or
             an empty string otherwise.
         """
-        try:
-            return "".join(
-                CONTROL_CODE_RE_STR.sub("", text_chunk)
-                for text_chunk in codecs.iterdecode(
-                    (
-                        record.data
-                        for record in self.get_io_log()
-                        if record[1] == "stdout"
-                    ),
-                    "UTF-8",
-                )
+        cache = getattr(_io_log_text_cache, "cache", None)
+        if cache is not None and self._io_log_key is not None:
+            return cache.get(
+                (self._io_log_key, "attachment"),
+                lambda: self._decode_io_log_text(flat=False)[1],
             )
-        except UnicodeDecodeError:
-            return ""
+        return self._decode_io_log_text(flat=False)[1]
+
+    @property
+    def _io_log_key(self):
+        """
+        Key identifying the I/O log in :func:`io_log_text_cache()`
+
+        None (the default) means that the I/O log is never cached.
+        """
+        return None
+
+    def _decode_io_log_text(self, flat=True, attachment=True):
+        """
+        Decode the flat text and/or the text attachment in a single pass
+
+        :returns:
+            A tuple (flat_text, text_attachment), either item is None if it
+            was not requested.
+        """
+        flat_decoder = codecs.getincrementaldecoder("UTF-8")("replace")
+        stdout_decoder = codecs.getincrementaldecoder("UTF-8")()
+        flat_chunks = [] if flat else None
+        stdout_chunks = [] if attachment else None
+        for record in self.get_io_log():
+            if flat_chunks is not None:
+                flat_chunks.append(flat_decoder.decode(record.data))
+            if stdout_chunks is not None and record.stream_name == "stdout":
+                try:
+                    stdout_chunks.append(stdout_decoder.decode(record.data))
+                except UnicodeDecodeError:
+                    stdout_chunks = None
+            if flat_chunks is None and stdout_chunks is None:
+                break
+        flat_text = text_attachment = None
+        if flat_chunks is not None:
+            flat_chunks.append(flat_decoder.decode(b"", True))
+            flat_text = CONTROL_CODE_RE_STR.sub("", "".join(flat_chunks))
+        if stdout_chunks is not None:
+            try:
+                stdout_chunks.append(stdout_decoder.decode(b"", True))
+            except UnicodeDecodeError:
+                text_attachment = ""
+            else:
+                text_attachment = CONTROL_CODE_RE_STR.sub(
+                    "", "".join(stdout_chunks)
+                )
+        elif attachment:
+            text_attachment = ""
+        return flat_text, text_attachment
 
     @property
     def img_type(self):
@@ -546,17 +643,21 @@ class DiskJobResult(_JobResultBase):
         """pathname of the file containing serialized IO log records."""
         return self._data.get("io_log_filename")
 
+    @property
+    def _io_log_key(self):
+        return self.io_log_filename
+
     def get_io_log(self):
         record_path = self.io_log_filename
         if record_path:
-            with gzip.GzipFile(
-                record_path, mode="rb"
-            ) as gzip_stream, io.TextIOWrapper(
-                gzip_stream, encoding="UTF-8"
-            ) as stream:
-                for record in IOLogRecordReader(stream):
-                    record = IOLogRecord(record[0], record[1], record.data)
-                    yield record
+            with gzip.GzipFile(record_path, mode="rb") as gzip_stream:
+                if BinaryIOLogRecordReader.is_binary_stream(gzip_stream):
+                    yield from BinaryIOLogRecordReader(gzip_stream)
+                    return
+                with io.TextIOWrapper(gzip_stream, encoding="UTF-8") as stream:
+                    for record in IOLogRecordReader(stream):
+                        record = IOLogRecord(record[0], record[1], record.data)
+                        yield record
 
     @property
     def io_log(self):
@@ -638,3 +739,112 @@ class IOLogRecordReader:
             if record is None:
                 break
             yield record
+
+
+class BinaryIOLogRecordWriter:
+    """
+    Class for writing :class:`IOLogRecord` instances to a binary stream.
+
+    The stream starts with :attr:`MAGIC` followed by the format version. Each
+    record is then stored as a frame made of a fixed header (delay as a
+    double, length of the stream name and length of the data) followed by the
+    stream name (ASCII) and the raw data. Unlike :class:`IOLogRecordWriter`
+    the data is neither base64 encoded nor wrapped in JSON.
+    """
+
+    MAGIC = b"\x00PBIOLOG"
+    VERSION = 1
+    FRAME_HEADER = struct.Struct("<dBI")
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.stream.write(self.MAGIC + bytes([self.VERSION]))
+
+    def close(self):
+        self.stream.close()
+
+    def write_record(self, record):
+        """Write an :class:`IOLogRecord` to the stream."""
+        stream_name = record[1].encode("ASCII")
+        self.stream.write(
+            self.FRAME_HEADER.pack(record[0], len(stream_name), len(record[2]))
+        )
+        self.stream.write(stream_name)
+        self.stream.write(record[2])
+
+
+class BinaryIOLogRecordReader:
+    """
+    Class for streaming :class:`IOLogRecord` instances from a binary stream.
+
+    See :class:`BinaryIOLogRecordWriter` for the description of the format.
+    """
+
+    MAGIC = BinaryIOLogRecordWriter.MAGIC
+    FRAME_HEADER = BinaryIOLogRecordWriter.FRAME_HEADER
+
+    def __init__(self, stream):
+        self.stream = stream
+        header = self._read_exactly(len(self.MAGIC) + 1)
+        if header is None or not header.startswith(self.MAGIC):
+            raise ValueError(_("Not a binary I/O log stream"))
+        self.version = header[-1]
+        if self.version != BinaryIOLogRecordWriter.VERSION:
+            raise ValueError(
+                _("Unsupported binary I/O log version: {}").format(
+                    self.version
+                )
+            )
+
+    @classmethod
+    def is_binary_stream(cls, stream):
+        """
+        Check if a buffered binary stream uses this format
+
+        The stream position is not changed as this relies on peek().
+        """
+        return stream.peek(len(cls.MAGIC))[: len(cls.MAGIC)] == cls.MAGIC
+
+    def close(self):
+        self.stream.close()
+
+    def _read_exactly(self, size):
+        # Logs of interrupted jobs may be truncated, treat that as the end of
+        # the stream just like IOLogRecordReader does.
+        try:
+            data = self.stream.read(size)
+        except (OSError, EOFError):
+            return
+        if len(data) != size:
+            return
+        return data
+
+    def read_record(self):
+        """
+        Read the next record from the stream.
+
+        :returns: None if the stream is empty
+        :returns: next :class:`IOLogRecord` as found in the stream.
+        """
+        header = self._read_exactly(self.FRAME_HEADER.size)
+        if header is None:
+            return
+        delay, name_size, data_size = self.FRAME_HEADER.unpack(header)
+        payload = self._read_exactly(name_size + data_size)
+        if payload is None:
+            return
+        return IOLogRecord(
+            delay, payload[:name_size].decode("ASCII"), payload[name_size:]
+        )
+
+    def __iter__(self):
+        """
+        Iterate over the entire stream generating subsequent records.
+
+        This method generates subsequent :class:`IOLogRecord` entries.
+        """
+        while True:
+            record = self.read_record()
+            if record is None:
+                break
+            yield record
@@ -20,9 +20,10 @@
 ===============================================================================
 
 This module contains plugin interface for plainbox. Plugins are based on
-pkg_resources entry points feature. Any python package can advertise the
-existence of entry points associated with a given namespace. Any other
-package can query a given namespace and enumerate a sequence of entry points.
+the entry points feature of python packages. Any python package can
+advertise the existence of entry points associated with a given namespace.
+Any other package can query a given namespace and enumerate a sequence of
+entry points.
 
 Each entry point has a name and importable identifier. The identifier can
 be imported using the load() method. A loaded entry point is exposed as an
@@ -43,11 +44,15 @@ testing in isolation from whatever entry points may exist in the system.
 import abc
 import collections
 import contextlib
+import functools
 import logging
 import os
 import time
 
-import pkg_resources
+try:
+    from importlib.metadata import distribution, entry_points
+except ImportError:
+    from importlib_metadata import distribution, entry_points
 
 from plainbox.i18n import gettext as _
 
@@ -55,6 +60,49 @@ from plainbox.i18n import gettext as _
 logger = logging.getLogger("plainbox.secure.plugins")
 
 
+@functools.lru_cache(maxsize=None)
+def get_entry_points(group):
+    """
+    Get all the entry points advertised in a given group
+
+    :param group:
+        Name of the entry point group (e.g. "plainbox.exporter")
+    :returns:
+        A tuple of entry point objects. The (rather expensive) scan of all the
+        installed distributions is done only once per group.
+
+    This uses importlib.metadata instead of pkg_resources as importing the
+    latter alone takes a noticeable fraction of the start-up time of
+    checkbox.
+    """
+    all_entry_points = entry_points()
+    if hasattr(all_entry_points, "select"):
+        return tuple(all_entry_points.select(group=group))
+    return tuple(all_entry_points.get(group, ()))
+
+
+def load_entry_point(dist_name, group, name):
+    """
+    Load an entry point advertised by a given distribution
+
+    :param dist_name:
+        Name of the distribution (e.g. "checkbox-ng")
+    :param group:
+        Name of the entry point group
+    :param name:
+        Name of the entry point
+    :returns:
+        The loaded object
+    :raises ImportError:
+        If the distribution or the entry point cannot be found or if the
+        entry point cannot be imported
+    """
+    for entry_point in distribution(dist_name).entry_points:
+        if entry_point.group == group and entry_point.name == name:
+            return entry_point.load()
+    raise ImportError(_("Entry point {!r} not found").format((group, name)))
+
+
 def now() -> float:
     """
     Get the current "time".
@@ -467,7 +515,7 @@ class PlugInCollectionBase(IPlugInCollection):
 
 class PkgResourcesPlugInCollection(PlugInCollectionBase):
     """
-    Collection of plug-ins based on pkg_resources
+    Collection of plug-ins based on entry points
 
     Instantiate with :attr:`namespace`, call :meth:`load()` and then access any
     of the loaded plug-ins using the API offered. All loaded objects are
@@ -487,7 +535,7 @@ class PkgResourcesPlugInCollection(PlugInCollectionBase):
         Initialize a collection of plug-ins from the specified name-space.
 
         :param namespace:
-            pkg_resources entry-point name-space of the plug-in collection
+            entry-point name-space (group) of the plug-in collection
         :param load:
             if true, load all of the plug-ins now
         :param wrapper:
@@ -509,7 +557,7 @@ class PkgResourcesPlugInCollection(PlugInCollectionBase):
         cache.
 
         .. note::
-            this method queries pkg-resources only once.
+            this method queries the entry points only once.
         """
         if self._loaded:
             return
@@ -532,11 +580,11 @@ class PkgResourcesPlugInCollection(PlugInCollectionBase):
 
     def _get_entry_points(self):
         """
-        Get entry points from pkg_resources.
+        Get entry points from the installed distributions.
 
         This is the method you want to mock if you are writing unit tests
         """
-        return pkg_resources.iter_entry_points(self._namespace)
+        return get_entry_points(self._namespace)
 
 
 class FsPlugInCollection(PlugInCollectionBase):
@@ -0,0 +1,216 @@
+# This file is part of Checkbox.
+#
+# Copyright 2024 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+:mod:`plainbox.impl.secure.providers.cache` -- provider content cache
+=====================================================================
+
+This module reduces the time needed to load providers by reusing the RFC822
+records parsed from unit files as long as those files don't change.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+from plainbox import __version__
+from plainbox.i18n import gettext as _
+from plainbox.impl.secure.origin import FileTextSource
+from plainbox.impl.secure.origin import Origin
+from plainbox.impl.secure.rfc822 import RFC822Record
+
+logger = logging.getLogger("plainbox.secure.providers.cache")
+
+
+class ProviderContentCache:
+    """
+    Cache storing RFC822 records parsed from the unit files of a provider
+
+    Each entry is keyed by the name of the file and is valid as long as the
+    modification time and the size of the file stay the same. Along with the
+    records, each entry remembers if the units defined there passed all the
+    checks. The whole cache is discarded if it was written by a different
+    version of plainbox.
+    """
+
+    FORMAT = 1
+
+    def __init__(self, provider_id, cache_dir=None):
+        """
+        Initialize a new cache
+
+        :param provider_id:
+            A string that uniquely identifies the provider (and its location)
+        :param cache_dir:
+            (optional) Directory where the cache is stored. The default is
+            derived from ``$XDG_CACHE_HOME``.
+        """
+        if cache_dir is None:
+            cache_dir = self._get_cache_path()
+        digest = hashlib.sha256(provider_id.encode("UTF-8")).hexdigest()
+        self._path = os.path.join(cache_dir, "{}.json".format(digest))
+        self._version = "{}:{}".format(self.FORMAT, __version__)
+        self._entries = {}
+        self._used_entries = {}
+        self._dirty = False
+
+    @property
+    def path(self):
+        """
+        Pathname of the file backing the cache
+        """
+        return self._path
+
+    def load(self):
+        """
+        Load the cache from the filesystem
+
+        A missing, corrupted or outdated cache is silently treated as empty.
+        """
+        try:
+            with open(self._path, "rt", encoding="UTF-8") as stream:
+                data = json.load(stream)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            logger.warning(
+                _("Cannot load provider cache %s: %s"), self._path, exc
+            )
+            return
+        if not isinstance(data, dict) or data.get("version") != self._version:
+            logger.debug(_("Ignoring outdated provider cache %s"), self._path)
+            return
+        self._entries = data.get("entries", {})
+
+    def get_records(self, filename, parse_fn):
+        """
+        Get records parsed from a file, calling parse_fn if they aren't cached
+
+        :param filename:
+            Full pathname of the parsed file
+        :param parse_fn:
+            Callable returning an iterable of RFC822Record parsed from the file
+        :returns:
+            A list of RFC822Record objects
+        """
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return list(parse_fn())
+        stamp = [stat.st_mtime_ns, stat.st_size]
+        entry = self._entries.get(filename)
+        if entry is not None and entry["stamp"] == stamp:
+            try:
+                record_list = self._decode_record_list(filename, entry)
+            except (KeyError, TypeError, ValueError) as exc:
+                logger.warning(
+                    _("Ignoring corrupted provider cache entry %s: %s"),
+                    filename,
+                    exc,
+                )
+            else:
+                self._used_entries[filename] = entry
+                return record_list
+        record_list = list(parse_fn())
+        self._used_entries[filename] = {
+            "stamp": stamp,
+            "records": [
+                [
+                    record.data,
+                    record.raw_data,
+                    record.origin.line_start,
+                    record.origin.line_end,
+                    record.field_offset_map,
+                ]
+                for record in record_list
+            ],
+        }
+        self._dirty = True
+        return record_list
+
+    def is_checked(self, filename):
+        """
+        Check if the units defined in a file were already checked
+
+        :param filename:
+            Full pathname of a file previously passed to :meth:`get_records()`
+        :returns:
+            True if :meth:`mark_checked()` was called for the same content of
+            the file (now or when the cache was saved)
+        """
+        entry = self._used_entries.get(filename)
+        return entry is not None and entry.get("checked", False)
+
+    def mark_checked(self, filename):
+        """
+        Remember that the units defined in a file passed all the checks
+
+        :param filename:
+            Full pathname of a file previously passed to :meth:`get_records()`
+        """
+        entry = self._used_entries.get(filename)
+        if entry is not None and not entry.get("checked", False):
+            entry["checked"] = True
+            self._dirty = True
+
+    def save(self):
+        """
+        Write the cache back to the filesystem if it was modified
+
+        Only the entries looked up since the cache was created are kept, so
+        entries for files that are gone are dropped.
+        """
+        if not self._dirty and len(self._used_entries) == len(self._entries):
+            return
+        data = {"version": self._version, "entries": self._used_entries}
+        tmp_path = "{}.{}.tmp".format(self._path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            with open(tmp_path, "wt", encoding="UTF-8") as stream:
+                json.dump(data, stream, ensure_ascii=False)
+            os.replace(tmp_path, self._path)
+        except OSError as exc:
+            logger.warning(
+                _("Cannot save provider cache %s: %s"), self._path, exc
+            )
+            return
+        self._entries = self._used_entries
+        self._used_entries = dict(self._entries)
+        self._dirty = False
+
+    @staticmethod
+    def _decode_record_list(filename, entry):
+        source = FileTextSource(filename)
+        return [
+            RFC822Record(
+                data,
+                Origin(source, line_start, line_end),
+                raw_data,
+                offset_map,
+            )
+            for data, raw_data, line_start, line_end, offset_map in entry[
+                "records"
+            ]
+        ]
+
+    def _get_cache_path(self):
+        suc = os.environ.get("SNAP_USER_COMMON")
+        if suc:
+            return os.path.join(suc, ".cache", "plainbox", "provider_cache")
+        xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+        if not xdg_cache_home:
+            xdg_cache_home = os.path.join(os.path.expanduser("~"), ".cache")
+        return os.path.join(xdg_cache_home, "plainbox", "provider_cache")
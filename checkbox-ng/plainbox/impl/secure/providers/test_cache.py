@@ -0,0 +1,139 @@
+# This file is part of Checkbox.
+#
+# Copyright 2024 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+plainbox.impl.secure.providers.test_cache
+=========================================
+
+Test definitions for plainbox.impl.secure.providers.cache module
+"""
+
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from plainbox.impl.secure.providers.cache import ProviderContentCache
+from plainbox.impl.secure.rfc822 import FileTextSource
+from plainbox.impl.secure.rfc822 import load_rfc822_records
+
+
+class ProviderContentCacheTests(TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self._tmp_dir.name, "cache")
+        self.filename = os.path.join(self._tmp_dir.name, "units.pxu")
+        self._write("id: foo\nplugin: shell\n\nid: bar\n_summary: Bar\n")
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _write(self, text):
+        with open(self.filename, "wt", encoding="UTF-8") as stream:
+            stream.write(text)
+        self.parse_fn = mock.Mock(side_effect=self._parse)
+
+    def _parse(self):
+        with open(self.filename, "rt", encoding="UTF-8") as stream:
+            return load_rfc822_records(
+                stream, source=FileTextSource(self.filename)
+            )
+
+    def _get_records(self, cache=None):
+        if cache is None:
+            cache = ProviderContentCache("provider", self.cache_dir)
+            cache.load()
+        record_list = cache.get_records(self.filename, self.parse_fn)
+        cache.save()
+        return record_list
+
+    def test_records_are_reused(self):
+        record_list = self._get_records()
+        self.assertEqual(self.parse_fn.call_count, 1)
+        cached_record_list = self._get_records()
+        self.assertEqual(self.parse_fn.call_count, 1)
+        self.assertEqual(cached_record_list, record_list)
+        self.assertEqual(
+            [record.raw_data for record in cached_record_list],
+            [record.raw_data for record in record_list],
+        )
+        self.assertEqual(
+            [record.field_offset_map for record in cached_record_list],
+            [record.field_offset_map for record in record_list],
+        )
+        self.assertEqual(cached_record_list[1].origin.line_start, 4)
+
+    def test_modified_file_is_parsed_again(self):
+        self._get_records()
+        self._write("id: foo\nplugin: manual\n")
+        record_list = self._get_records()
+        self.assertEqual(self.parse_fn.call_count, 1)
+        self.assertEqual(record_list[0].data["plugin"], "manual")
+
+    def test_other_version_is_ignored(self):
+        self._get_records()
+        with mock.patch.object(ProviderContentCache, "FORMAT", 0):
+            self._get_records()
+        self.assertEqual(self.parse_fn.call_count, 2)
+
+    def test_other_provider_is_not_shared(self):
+        self._get_records()
+        cache = ProviderContentCache("other-provider", self.cache_dir)
+        cache.load()
+        self._get_records(cache)
+        self.assertEqual(self.parse_fn.call_count, 2)
+
+    def test_corrupted_cache_is_ignored(self):
+        cache = ProviderContentCache("provider", self.cache_dir)
+        os.makedirs(self.cache_dir)
+        with open(cache.path, "wt") as stream:
+            stream.write("{not json")
+        cache.load()
+        self.assertEqual(len(self._get_records(cache)), 2)
+        self.assertEqual(len(self._get_records()), 2)
+        self.assertEqual(self.parse_fn.call_count, 1)
+
+    def test_unused_entries_are_dropped(self):
+        self._get_records()
+        other_filename = self.filename + ".new"
+        os.rename(self.filename, other_filename)
+        self.filename = other_filename
+        self._get_records()
+        self.assertEqual(self.parse_fn.call_count, 2)
+        cache = ProviderContentCache("provider", self.cache_dir)
+        with open(cache.path, "rt") as stream:
+            self.assertNotIn('units.pxu"', stream.read())
+
+    def test_checked_mark(self):
+        cache = ProviderContentCache("provider", self.cache_dir)
+        self._get_records(cache)
+        self.assertFalse(cache.is_checked(self.filename))
+        cache.mark_checked(self.filename)
+        cache.save()
+        cache = ProviderContentCache("provider", self.cache_dir)
+        cache.load()
+        self._get_records(cache)
+        self.assertTrue(cache.is_checked(self.filename))
+        self._write("id: foo\n")
+        cache = ProviderContentCache("provider", self.cache_dir)
+        cache.load()
+        self._get_records(cache)
+        self.assertFalse(cache.is_checked(self.filename))
+
+    def test_missing_file_is_not_cached(self):
+        self.parse_fn = mock.Mock(return_value=[])
+        cache = ProviderContentCache("provider", self.cache_dir)
+        cache.get_records("/does/not/exist.pxu", self.parse_fn)
+        cache.get_records("/does/not/exist.pxu", self.parse_fn)
+        self.assertEqual(self.parse_fn.call_count, 2)
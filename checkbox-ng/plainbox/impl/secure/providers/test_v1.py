@@ -642,6 +642,47 @@ class UnitPlugInTests(TestCase):
             ),
         )
 
+    def test_cache_skips_checked_units(self):
+        """
+        verify that units are not checked again if the cache knows they
+        passed the checks before
+        """
+        text = "id: test/job\nplugin: not-a-plugin\n"
+        cache = mock.Mock()
+        cache.get_records.side_effect = lambda filename, parse_fn: parse_fn()
+        cache.is_checked.return_value = False
+        with self.assertRaises(PlugInError):
+            UnitPlugIn(
+                "/path/to/jobs.txt",
+                text,
+                self.LOAD_TIME,
+                self.provider,
+                cache=cache,
+            )
+        cache.mark_checked.assert_not_called()
+        cache.is_checked.return_value = True
+        plugin = UnitPlugIn(
+            "/path/to/jobs.txt",
+            text,
+            self.LOAD_TIME,
+            self.provider,
+            cache=cache,
+        )
+        self.assertEqual(plugin.plugin_object[0].plugin, "not-a-plugin")
+
+    def test_cache_marks_checked_units(self):
+        cache = mock.Mock()
+        cache.get_records.side_effect = lambda filename, parse_fn: parse_fn()
+        cache.is_checked.return_value = False
+        UnitPlugIn(
+            "/path/to/jobs.txt",
+            "id: test/job\nplugin: shell\ncommand: true\n",
+            self.LOAD_TIME,
+            self.provider,
+            cache=cache,
+        )
+        cache.mark_checked.assert_called_once_with("/path/to/jobs.txt")
+
 
 class Provider1Tests(TestCase):
 
@@ -45,6 +45,7 @@ from plainbox.impl.secure.plugins import LazyFsPlugInCollection
 from plainbox.impl.secure.plugins import PlugIn
 from plainbox.impl.secure.plugins import PlugInError
 from plainbox.impl.secure.plugins import now
+from plainbox.impl.secure.providers.cache import ProviderContentCache
 from plainbox.impl.secure.rfc822 import FileTextSource
 from plainbox.impl.secure.rfc822 import RFC822SyntaxError
 from plainbox.impl.secure.rfc822 import load_rfc822_records
@@ -171,6 +172,13 @@ class UnitPlugIn(ProviderContentPlugIn):
     list of :class:`plainbox.impl.unit.Unit` instances from a file.
     """
 
+    def __init__(
+        self, filename, text, load_time, provider, *, cache=None, **kwargs
+    ):
+        # NOTE: the cache has to be known before inspect() is called
+        self._cache = cache
+        super().__init__(filename, text, load_time, provider, **kwargs)
+
     def inspect(
         self,
         filename: str,
@@ -208,15 +216,29 @@ class UnitPlugIn(ProviderContentPlugIn):
         """
         logger.debug(_("Loading units from %r..."), filename)
         try:
-            records = load_rfc822_records(
-                text, source=FileTextSource(filename)
-            )
+            if self._cache is not None:
+                records = self._cache.get_records(
+                    filename,
+                    lambda: load_rfc822_records(
+                        text, source=FileTextSource(filename)
+                    ),
+                )
+            else:
+                records = load_rfc822_records(
+                    text, source=FileTextSource(filename)
+                )
         except RFC822SyntaxError as exc:
             raise PlugInError(
                 _("Cannot load job definitions from {!r}: {}").format(
                     filename, exc
                 )
             )
+        # Units checked without a context only depend on the content of the
+        # file, no need to check them again if they passed before.
+        cache_check = check and context is None and self._cache is not None
+        if cache_check and self._cache.is_checked(filename):
+            check = False
+            cache_check = False
         unit_list = []
         for record in records:
             unit_name = record.data.get("unit", "job")
@@ -251,6 +273,8 @@ class UnitPlugIn(ProviderContentPlugIn):
                     )
             unit_list.append(unit)
             logger.debug(_("Loaded %r"), unit)
+        if cache_check:
+            self._cache.mark_checked(filename)
         return unit_list
 
     def discover_units(
@@ -652,13 +676,40 @@ class ProviderContentLoader:
     def load(self, plugin_kwargs):
         logger.info("Loading content for provider %s", self.provider)
         self.provider.content_collection.load()
+        cache = self._get_cache()
         for file_plugin in self.provider.content_collection.get_all_plugins():
             filename = file_plugin.plugin_name
             text = file_plugin.plugin_object
-            self._load_file(filename, text, plugin_kwargs)
+            self._load_file(filename, text, plugin_kwargs, cache)
+        if cache is not None:
+            cache.save()
         self.problem_list.extend(self.provider.content_collection.problem_list)
         self.is_loaded = True
 
+    def _get_cache(self):
+        """
+        Get the cache of parsed unit files of the provider
+
+        The cache can be disabled by setting the PLAINBOX_NO_PROVIDER_CACHE
+        environment variable.
+        """
+        if os.getenv("PLAINBOX_NO_PROVIDER_CACHE"):
+            return None
+        provider_id = "\0".join(
+            [self.provider.name, self.provider.namespace]
+            + [
+                str(path)
+                for path in (
+                    self.provider.base_dir,
+                    self.provider.units_dir,
+                    self.provider.jobs_dir,
+                )
+            ]
+        )
+        cache = ProviderContentCache(provider_id)
+        cache.load()
+        return cache
+
     def _warn_ignored_file(self, filename):
         """
         Print an warning message for each file that is skipped at loading
@@ -689,7 +740,7 @@ class ProviderContentLoader:
         ):
             logger.warning("Skipped file: %s", filename)
 
-    def _load_file(self, filename, text, plugin_kwargs):
+    def _load_file(self, filename, text, plugin_kwargs, cache=None):
         # NOTE: text is lazy, call str() or iter() to see the real content This
         # prevents us from trying to read binary blobs.
         classification = self.provider.classify(filename)
@@ -697,6 +748,8 @@ class ProviderContentLoader:
         if plugin_cls is None:
             self._warn_ignored_file(filename)
             return
+        if issubclass(plugin_cls, UnitPlugIn):
+            plugin_kwargs = dict(plugin_kwargs, cache=cache)
         try:
             plugin = plugin_cls(
                 filename, text, 0, self.provider, **plugin_kwargs
@@ -31,6 +31,8 @@ from plainbox.impl.secure.plugins import IPlugIn, PlugIn
 from plainbox.impl.secure.plugins import PkgResourcesPlugInCollection
 from plainbox.impl.secure.plugins import PlugInCollectionBase
 from plainbox.impl.secure.plugins import PlugInError
+from plainbox.impl.secure.plugins import get_entry_points
+from plainbox.impl.secure.plugins import load_entry_point
 from plainbox.vendor import mock
 
 
@@ -343,7 +345,7 @@ class PkgResourcesPlugInCollectionTests(TestCase):
         # Ensure that the wrapper is :class:`PlugIn`
         self.assertEqual(self.col._wrapper, PlugIn)
 
-    @mock.patch("pkg_resources.iter_entry_points")
+    @mock.patch("plainbox.impl.secure.plugins.get_entry_points")
     def test_load(self, mock_iter):
         # Create a mocked entry point
         mock_ep1 = mock.Mock()
@@ -357,14 +359,14 @@ class PkgResourcesPlugInCollectionTests(TestCase):
         mock_iter.return_value = [mock_ep1, mock_ep2]
         # Load plugins
         self.col.load()
-        # Ensure that pkg_resources were interrogated
+        # Ensure that entry points were interrogated
         mock_iter.assert_called_with(self._NAMESPACE)
         # Ensure that both entry points were loaded
         mock_ep1.load.assert_called_with()
         mock_ep2.load.assert_called_with()
 
     @mock.patch("plainbox.impl.secure.plugins.logger")
-    @mock.patch("pkg_resources.iter_entry_points")
+    @mock.patch("plainbox.impl.secure.plugins.get_entry_points")
     def test_load_failing(self, mock_iter, mock_logger):
         # Create a mocked entry point
         mock_ep1 = mock.Mock()
@@ -378,7 +380,7 @@ class PkgResourcesPlugInCollectionTests(TestCase):
         mock_iter.return_value = [mock_ep1, mock_ep2]
         # Load plugins
         self.col.load()
-        # Ensure that pkg_resources were interrogated
+        # Ensure that entry points were interrogated
         mock_iter.assert_called_with(self._NAMESPACE)
         # Ensure that both entry points were loaded
         mock_ep1.load.assert_called_with()
@@ -391,6 +393,27 @@ class PkgResourcesPlugInCollectionTests(TestCase):
         self.assertIsInstance(self.col.problem_list[0], ImportError)
 
 
+class EntryPointTests(TestCase):
+    def test_get_entry_points(self):
+        name_list = [ep.name for ep in get_entry_points("plainbox.exporter")]
+        self.assertIn("text", name_list)
+        self.assertEqual(get_entry_points("plainbox.does-not-exist"), ())
+
+    def test_load_entry_point(self):
+        from plainbox.impl.exporter.text import TextSessionStateExporter
+
+        self.assertIs(
+            load_entry_point("checkbox-ng", "plainbox.exporter", "text"),
+            TextSessionStateExporter,
+        )
+
+    def test_load_entry_point_missing(self):
+        with self.assertRaises(ImportError):
+            load_entry_point("checkbox-ng", "plainbox.exporter", "nope")
+        with self.assertRaises(ImportError):
+            load_entry_point("no-such-dist", "plainbox.exporter", "text")
+
+
 class FsPlugInCollectionTests(TestCase):
 
     _P1 = "/system/providers"
@@ -49,6 +49,12 @@ of each module and class for additional details though.
     by maintaining a set of "inhibitors" that prevent it from being runnable.
     The actual inhibitors are managed by :class:`SessionState`.
 
+:class:`JobGraph`
+
+    The dependency graph of all the jobs in a session. It is owned by
+    :class:`SessionState` and updated as jobs are added and removed so that
+    the dependencies and the dependents of a job can be looked up quickly.
+
 :class:`SessionStorage`
 
     This class knows how properly to save and load bytes and manages a
@@ -56,6 +62,7 @@ of each module and class for additional details though.
     session. It holds no references to a session though.
 """
 
+from plainbox.impl.session.graph import JobGraph
 from plainbox.impl.session.jobs import InhibitionCause
 from plainbox.impl.session.jobs import JobReadinessInhibitor
 from plainbox.impl.session.jobs import JobState
@@ -68,6 +75,7 @@ from plainbox.impl.session.state import SessionState
 from plainbox.impl.session.storage import SessionStorage
 
 __all__ = (
+    "JobGraph",
     "JobReadinessInhibitor",
     "JobState",
     "SessionManager",
@@ -32,6 +32,7 @@ import logging
 import os
 import shlex
 import time
+from concurrent.futures import ThreadPoolExecutor
 from tempfile import SpooledTemporaryFile
 
 
@@ -46,7 +47,9 @@ from plainbox.impl.decorators import raises
 from plainbox.impl.developer import UnexpectedMethodCall
 from plainbox.impl.developer import UsageExpectation
 from plainbox.impl.execution import UnifiedRunner
+from plainbox.impl.jobcache import ResourceJobCache
 from plainbox.impl.providers import get_providers
+from plainbox.impl.providers import get_test_plan_providers
 from plainbox.impl.result import JobResultBuilder
 from plainbox.impl.result import MemoryJobResult
 from plainbox.impl.runner import JobRunnerUIDelegate
@@ -66,6 +69,7 @@ from plainbox.impl.session.restart import detect_restart_strategy
 from plainbox.impl.session.restart import RemoteDebRestartStrategy
 from plainbox.impl.session.resume import IncompatibleJobError
 from plainbox.impl.session.storage import WellKnownDirsHelper
+from plainbox.impl.session.suspend import SessionJournalHelper
 from plainbox.impl.transport import OAuthTransport
 from plainbox.impl.transport import TransportError
 from plainbox.impl.unit.exporter import ExporterError
@@ -192,6 +196,9 @@ class SessionAssistant:
         self._load_providers()
         UsageExpectation.of(self).allowed_calls = {
             self.start_new_session: "create a new session from scratch",
+            self.select_providers_for_test_plan: (
+                "load only the providers needed by a test plan"
+            ),
             self.resume_session: "resume a resume candidate",
             self.get_resumable_sessions: "get resume candidates",
             self.use_alternate_configuration: (
@@ -385,6 +392,30 @@ class SessionAssistant:
     def get_selected_providers(self):
         return self._selected_providers
 
+    @raises(UnexpectedMethodCall)
+    def select_providers_for_test_plan(self, test_plan_id: str) -> None:
+        """
+        Restrict the selected providers to the ones needed by a test plan.
+
+        :param test_plan_id:
+            Identifier of the test plan that is going to be selected.
+        :raises UnexpectedMethodCall:
+            If the call is made at an unexpected time. Do not catch this error.
+            It is a bug in your program. The error message will indicate what
+            is the likely cause.
+
+        Providers are only loaded when their units are needed. This method
+        can be called before :meth:`start_new_session()` by applications that
+        know which test plan will be used, so that providers that the test plan
+        cannot reference (through its namespace, nested parts, imports, etc.)
+        are never loaded. Other test plans of the dropped providers are not
+        available in the session.
+        """
+        UsageExpectation.of(self).enforce()
+        self._selected_providers = get_test_plan_providers(
+            self._selected_providers, test_plan_id
+        )
+
     @morris.signal
     def provider_selected(self, provider, auto):
         """
@@ -430,11 +461,10 @@ class SessionAssistant:
         """
         UsageExpectation.of(self).enforce()
         for storage in WellKnownDirsHelper.get_storage_list():
-            data = storage.load_checkpoint()
-            if len(data) == 0:
-                continue
             try:
-                metadata = SessionPeekHelper().peek(data)
+                metadata = SessionPeekHelper().peek_storage(storage)
+                if metadata is None:
+                    continue
                 if metadata.app_id == self._app_id:
                     if (allow_not_flagged and not metadata.flags) or (
                         metadata.flags & flags
@@ -492,6 +522,7 @@ class SessionAssistant:
         """
         UsageExpectation.of(self).enforce()
         self._manager = SessionManager.create(prefix=title + "-")
+        self._use_checkpoint_journal()
         self._context = self._manager.add_local_device_context()
         for provider in self._selected_providers:
             if provider.problem_list:
@@ -526,6 +557,10 @@ class SessionAssistant:
             ),
         }
 
+    def _use_checkpoint_journal(self):
+        if self._config.get_value("execution", "checkpoint_journal"):
+            self._manager.journal = SessionJournalHelper()
+
     @raises(KeyError, UnexpectedMethodCall, IncompatibleJobError)
     def resume_session(
         self, session_id: str, runner_cls=UnifiedRunner, runner_kwargs=dict()
@@ -565,6 +600,7 @@ class SessionAssistant:
         self._manager = SessionManager.load_session(
             all_units, self._resume_candidates[session_id][0]
         )
+        self._use_checkpoint_journal()
         self._context = self._manager.default_device_context
         self._metadata = self._context.state.metadata
         self._command_io_delegate = JobRunnerUIDelegate(_SilentUI())
@@ -632,11 +668,8 @@ class SessionAssistant:
         # have been modified by some external source
         self._resume_candidates = {}
         for storage in WellKnownDirsHelper.get_storage_list():
-            data = storage.load_checkpoint()
-            if len(data) == 0:
-                continue
             try:
-                metadata = SessionPeekHelper().peek(data)
+                metadata = SessionPeekHelper().peek_storage(storage)
             except SessionResumeError:
                 _logger.info(
                     "Exception raised when trying to resume " "session: %s",
@@ -644,7 +677,8 @@ class SessionAssistant:
                 )
             else:
                 if (
-                    metadata.app_id == self._app_id
+                    metadata is not None
+                    and metadata.app_id == self._app_id
                     and SessionMetaData.FLAG_INCOMPLETE in metadata.flags
                 ):
                     self._resume_candidates[storage.id] = (
@@ -812,14 +846,7 @@ class SessionAssistant:
         self._context.state.update_desired_job_list(
             desired_job_list, include_mandatory=False
         )
-        for job in self._context.state.run_list:
-            if self._context.state.job_state_map[job.id].result_history:
-                continue
-            UsageExpectation.of(self).allowed_calls[
-                self.run_job
-            ] = "to run bootstrapping job"
-            rb = self.run_job(job.id, "silent", False)
-            self.use_job_result(job.id, rb.get_result())
+        self._run_bootstrap_jobs(self._context.state.run_list)
         # Perform initial selection -- we want to run everything that is
         # described by the test plan that was selected earlier.
         desired_job_list = select_units(
@@ -836,6 +863,206 @@ class SessionAssistant:
         self._metadata.flags = {SessionMetaData.FLAG_INCOMPLETE}
         self._manager.checkpoint()
 
+    def _run_bootstrap_jobs(self, job_list):
+        job_list = [
+            job
+            for job in job_list
+            if not self._context.state.job_state_map[job.id].result_history
+        ]
+        max_workers = self._config.get_value("execution", "bootstrap_workers")
+        if max_workers > 1:
+            UsageExpectation.of(self).allowed_calls[
+                self.run_bootstrap_jobs_in_parallel
+            ] = "to run bootstrapping jobs"
+            self.run_bootstrap_jobs_in_parallel(
+                [job.id for job in job_list], max_workers
+            )
+            return
+        for job in job_list:
+            UsageExpectation.of(self).allowed_calls[
+                self.run_job
+            ] = "to run bootstrapping job"
+            rb = self.run_job(job.id, "silent", False)
+            self.use_job_result(job.id, rb.get_result())
+
+    @raises(UnexpectedMethodCall)
+    def run_bootstrap_jobs_in_parallel(
+        self, job_id_list: "List[str]", max_workers: int
+    ) -> None:
+        """
+        Run bootstrapping jobs concurrently and use their results.
+
+        :param job_id_list:
+            Identifiers of the jobs to run, in the order of the run list (as
+            returned by :meth:`get_bootstrap_todo_list()`).
+        :param max_workers:
+            Maximum number of jobs running at the same time.
+        :raises UnexpectedMethodCall:
+            If the call is made at an unexpected time. Do not catch this error.
+            It is a bug in your program. The error message will indicate what
+            is the likely cause.
+
+        Each job is handed to a pool of worker threads as soon as it is ready
+        to run, that is, when all the jobs it depends on (directly, through
+        resources or ordering) have their results stored in the session.
+        Results are fed back with :meth:`use_job_result()` strictly in the
+        order of job_id_list, so the resulting session state does not depend
+        on the timing of the jobs. Jobs that cannot start are handled by
+        :meth:`run_job()` once their turn comes.
+
+        This method can be used instead of calling :meth:`run_job()` and
+        :meth:`use_job_result()` for each bootstrapping job.
+        """
+        UsageExpectation.of(self).enforce()
+        state = self._context.state
+        job_list = [state.job_state_map[job_id].job for job_id in job_id_list]
+        ui = _SilentUI()
+        allowed_calls = UsageExpectation.of(self).allowed_calls
+        for job, result in self._run_jobs_concurrently(
+            job_list, max_workers, lambda job: True
+        ):
+            if result is None:
+                allowed_calls[self.run_job] = "to run bootstrapping job"
+                result = self.run_job(job.id, ui, False).get_result()
+            allowed_calls[self.use_job_result] = "to use bootstrap result"
+            self.use_job_result(job.id, result)
+
+    def _run_jobs_concurrently(self, job_list, max_workers, is_eligible):
+        """
+        Run jobs on a pool of worker threads and yield their results in order.
+
+        :param job_list:
+            Jobs to run, in the order of the run list.
+        :param max_workers:
+            Maximum number of jobs running at the same time.
+        :param is_eligible:
+            Predicate telling if a job may run concurrently with other jobs.
+        :returns:
+            A generator of (job, result) pairs, one for each job of job_list
+            in the same order. The result is None for jobs that were not
+            started, they have to be run with :meth:`run_job()`.
+
+        A job is started as soon as it is ready to run, that is, when all the
+        jobs it depends on (directly, through resources or ordering) have
+        their result stored in the session. The caller is expected to use
+        each result before asking for the next one. Eligible jobs are only
+        started ahead of their turn up to the next job that is not eligible,
+        so that job never runs concurrently with any other job.
+        """
+        state = self._context.state
+        ui = _SilentUI()
+        future_map = {}
+        # Eligible jobs up to eligible_end that were not started yet, mapped
+        # to their position in job_list
+        pending_map = {}
+        eligible_end = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for index, job in enumerate(job_list):
+                    if index >= eligible_end:
+                        # Look at the next run of eligible jobs
+                        eligible_end = index
+                        while eligible_end < len(job_list) and is_eligible(
+                            job_list[eligible_end]
+                        ):
+                            eligible_end += 1
+                        position_list = range(index, eligible_end)
+                    else:
+                        # Only the jobs depending on the previous job may have
+                        # become ready to run after its result was used
+                        position_list = sorted(
+                            pending_map[job_id]
+                            for job_id in state.job_graph.get_dependents(
+                                job_list[index - 1].id
+                            )
+                            if job_id in pending_map
+                        )
+                    for position in position_list:
+                        ready_job = job_list[position]
+                        job_state = state.job_state_map[ready_job.id]
+                        if not job_state.can_start():
+                            pending_map[ready_job.id] = position
+                            continue
+                        pending_map.pop(ready_job.id, None)
+                        _logger.debug(_("Starting job %s"), ready_job.id)
+                        future_map[ready_job.id] = executor.submit(
+                            self._runner.run_job,
+                            ready_job,
+                            job_state,
+                            self._config.environment,
+                            ui,
+                            concurrent=True,
+                        )
+                    pending_map.pop(job.id, None)
+                    if job.id not in future_map:
+                        yield job, None
+                        continue
+                    self._metadata.running_job_name = job.id
+                    self._manager.checkpoint()
+                    result = future_map.pop(job.id).result()
+                    # The runner measured the execution time already
+                    self._job_start_time = None
+                    yield job, result
+            finally:
+                # Jobs are left behind only if the run was interrupted (for
+                # instance with Ctrl-C, which the jobs don't get as they run
+                # in their own session). Don't start the pending ones and
+                # kill the running ones, leaving the executor waits for them.
+                if future_map:
+                    for future in future_map.values():
+                        future.cancel()
+                    self._runner.kill_running_jobs()
+
+    @raises(UnexpectedMethodCall)
+    def run_jobs_in_parallel(
+        self,
+        job_id_list: "List[str]",
+        max_workers: int,
+        ui: "IJobRunnerUI",
+    ) -> None:
+        """
+        Run parallel-safe jobs concurrently and use their results.
+
+        :param job_id_list:
+            Identifiers of the jobs to run, in the order of the run list.
+        :param max_workers:
+            Maximum number of jobs running at the same time.
+        :param ui:
+            The user interface delegate to use.
+        :raises UnexpectedMethodCall:
+            If the call is made at an unexpected time. Do not catch this error.
+            It is a bug in your program. The error message will indicate what
+            is the likely cause.
+
+        Jobs that have the ``parallel-safe`` flag (see
+        :attr:`JobDefinition.parallel_safe`) are started on a pool of worker
+        threads as soon as they are ready to run. Their results are used with
+        :meth:`use_job_result()` strictly in the order of job_id_list and the
+        session is checkpointed after each one, just as if they were run one
+        after another. Other jobs are run with :meth:`run_job()` when their
+        turn comes, with no other job running at the same time.
+
+        The output of jobs running concurrently is not sent to the user
+        interface, it is only stored in their I/O logs. The user interface is
+        notified about each job (and its outcome) when its result is used.
+        """
+        UsageExpectation.of(self).enforce()
+        state = self._context.state
+        job_list = [state.job_state_map[job_id].job for job_id in job_id_list]
+        allowed_calls = UsageExpectation.of(self).allowed_calls
+        for job, result in self._run_jobs_concurrently(
+            job_list, max_workers, lambda job: job.parallel_safe
+        ):
+            if result is None:
+                allowed_calls[self.run_job] = "to run a given job"
+                result = self.run_job(job.id, ui, False).get_result()
+            else:
+                job_state = state.job_state_map[job.id]
+                ui.considering_job(job, job_state)
+                ui.finished(job, job_state, result)
+            allowed_calls[self.use_job_result] = "to use the job result"
+            self.use_job_result(job.id, result)
+
     @raises(UnexpectedMethodCall)
     def hand_pick_jobs(self, id_patterns: "Iterable[str]"):
         """
@@ -904,6 +1131,9 @@ class SessionAssistant:
         UsageExpectation.of(self).allowed_calls.update(
             self._get_allowed_calls_in_normal_state()
         )
+        UsageExpectation.of(self).allowed_calls[
+            self.run_bootstrap_jobs_in_parallel
+        ] = "to run bootstrapping jobs"
         return [job.id for job in self._context.state.run_list]
 
     @raises(UnexpectedMethodCall)
@@ -1678,7 +1908,10 @@ class SessionAssistant:
                 final_candidates.append(job)
         # reset outcome of jobs that are selected for re-running
         for job in final_candidates:
-            self.get_job_state(job.id).result = MemoryJobResult({})
+            result = MemoryJobResult({})
+            self.get_job_state(job.id).result = result
+            self._context.state.on_job_state_map_changed()
+            self._context.state.on_job_result_changed(job, result)
             candidates.append(job.id)
             _logger.info(
                 "{}: {} attempts".format(
@@ -1933,6 +2166,7 @@ class SessionAssistant:
             self.get_dynamic_todo_list: "to see what is yet to be executed",
             self.get_manifest_repr: ("to get participating manifest units"),
             self.run_job: "to run a given job",
+            self.run_jobs_in_parallel: "to run parallel-safe jobs",
             self.use_alternate_selection: "to change the selection",
             self.get_resumable_sessions: "get resume candidates",
             self.hand_pick_jobs: "to generate new selection and use it",
@@ -1947,6 +2181,24 @@ class SessionAssistant:
             self.finish_bootstrap: "to finish bootstrapping",
         }
 
+    def _get_resource_cache(self):
+        invalidation_keys = self._config.get_value(
+            "execution", "resource_cache_invalidation_keys"
+        )
+        max_size = self._config.get_value(
+            "execution", "resource_cache_max_size"
+        )
+        max_age = self._config.get_value("execution", "resource_cache_max_age")
+        try:
+            return ResourceJobCache(
+                invalidation_keys, max_size * 1024 * 1024, max_age * 24 * 3600
+            )
+        except ValueError as exc:
+            _logger.warning(
+                _("Using the default resource cache settings: %s"), exc
+            )
+            return ResourceJobCache()
+
     def _init_runner(self, runner_cls, runner_kwargs=dict()):
         self._execution_ctrl_list = []
         for ctrl_cls, args, kwargs in self._ctrl_setup_list:
@@ -1960,6 +2212,7 @@ class SessionAssistant:
         runner_kwargs["execution_ctrl_list"] = (
             self._execution_ctrl_list or None
         )
+        runner_kwargs["resource_cache"] = self._get_resource_cache()
 
         self._runner = runner_cls(
             self._manager.storage.id,
@@ -0,0 +1,149 @@
+# This file is part of Checkbox.
+#
+# Copyright 2024 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark of the per-job overhead between the remote agent and controller.
+
+A RemoteSessionAssistant is served over rpyc on localhost, like the agent
+does, and runs trivial jobs (a shell printing one line and sleeping for a
+while). The controller waits for each job either by polling monitor_job()
+every 0.5 s (as it used to) or with the wait_for_job_output() long-poll.
+
+Run it with::
+
+    python3 -m plainbox.impl.session.benchmark_remote_assistant
+"""
+
+import argparse
+import functools
+import subprocess
+import threading
+import time
+
+from plainbox.impl.session.remote_assistant import BackgroundExecutor
+from plainbox.impl.session.remote_assistant import RemoteSessionAssistant
+from plainbox.impl.session.remote_assistant import Running
+from plainbox.vendor import rpyc
+from plainbox.vendor.rpyc.utils.server import ThreadedServer
+
+# Same as RemoteController.JOB_OUTPUT_TIMEOUT (and the former poll period)
+TIMEOUT = 0.5
+
+
+def run_trivial_job(job_id, ui, native, duration):
+    """Run a job that prints one line, like a minimal shell job."""
+    output = subprocess.check_output(
+        ["sh", "-c", 'echo "$0"; sleep "$1"', job_id, str(duration)]
+    )
+    ui.got_program_output("stdout", output)
+
+
+class BenchmarkAgent(rpyc.Service):
+    session_assistant = None
+
+    def exposed_get_sa(self):
+        return BenchmarkAgent.session_assistant
+
+    def exposed_start_job(self, job_id, duration):
+        rsa = BenchmarkAgent.session_assistant
+        real_run = functools.partial(run_trivial_job, duration=duration)
+        rsa._be = BackgroundExecutor(rsa, job_id, real_run, rsa._ui)
+
+    def exposed_finish_job(self):
+        rsa = BenchmarkAgent.session_assistant
+        rsa._be.join()
+        rsa.session_change_lock.release()
+
+
+def wait_polling(sa):
+    """Wait for the job like the controller did before the long-poll."""
+    while True:
+        state, payload = sa.monitor_job()
+        if state != "running":
+            return
+        time.sleep(TIMEOUT)
+
+
+def wait_long_polling(sa):
+    """Wait for the job like the controller does now."""
+    while True:
+        state, payload = sa.wait_for_job_output(TIMEOUT)
+        if state != "running":
+            return
+
+
+def bench(conn, wait_fn, jobs, duration):
+    """Get the wall time of running ``jobs`` jobs one after the other."""
+    sa = conn.root.get_sa()
+    start = time.perf_counter()
+    for index in range(jobs):
+        conn.root.start_job("job-{}".format(index), duration)
+        wait_fn(sa)
+        conn.root.finish_job()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "-n", "--jobs", type=int, default=20, help="number of jobs"
+    )
+    parser.add_argument(
+        "-d",
+        "--duration",
+        type=float,
+        default=0.1,
+        help="number of seconds each job sleeps for",
+    )
+    args = parser.parse_args()
+
+    rsa = RemoteSessionAssistant(lambda x: None)
+    rsa._state = Running
+    BenchmarkAgent.session_assistant = rsa
+    server = ThreadedServer(
+        BenchmarkAgent,
+        hostname="localhost",
+        port=0,
+        protocol_config={
+            "allow_all_attrs": True,
+            "allow_setattr": True,
+            "sync_request_timeout": 1,
+        },
+    )
+    threading.Thread(target=server.start, daemon=True).start()
+    while not server.active:
+        time.sleep(0.01)
+    conn = rpyc.connect(
+        "localhost", server.port, config={"sync_request_timeout": 10}
+    )
+    try:
+        for name, wait_fn in (
+            ("monitor_job() polling", wait_polling),
+            ("wait_for_job_output()", wait_long_polling),
+        ):
+            duration = bench(conn, wait_fn, args.jobs, args.duration)
+            overhead = duration / args.jobs - args.duration
+            print(
+                "{:<22} {} jobs in {:.3f}s, {:.1f}ms overhead per job".format(
+                    name, args.jobs, duration, overhead * 1000
+                )
+            )
+    finally:
+        conn.close()
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# This file is part of Checkbox.
+#
+# Copyright 2024 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Job Graph.
+
+:mod:`plainbox.impl.session.graph` -- job dependency graph
+==========================================================
+
+This module contains the :class:`JobGraph` class that keeps track of the
+dependencies between all the jobs known to a session. The graph is updated
+as jobs come and go so that the dependencies and the dependents of a job can
+be looked up without scanning the whole job list.
+"""
+
+import functools
+import json
+
+from plainbox.impl.depmgr import DependencyMissingError
+from plainbox.impl.resource import ResourceProgramError
+from plainbox.suspend_consts import Suspend
+
+
+@functools.lru_cache(maxsize=None)
+def _get_sibling_depends(siblings):
+    """Get the depends field of each sibling defined in a siblings field."""
+    return tuple(
+        sibling_data.get("depends", [])
+        for sibling_data in json.loads(siblings)
+    )
+
+
+def is_job_impacting_suspend(suspend_job_id, job):
+    """
+    Check if the ``suspend_job_id`` job needs to be run after a given
+    ``job``. This is the case if the ``job`` has a "also after suspend"
+    flag, or if it defines a sibling that has a dependency on the suspend
+    job.
+    """
+    expected_flag = {
+        Suspend.AUTO_JOB_ID: Suspend.AUTO_FLAG,
+        Suspend.MANUAL_JOB_ID: Suspend.MANUAL_FLAG,
+    }.get(suspend_job_id)
+    if job.flags and expected_flag in job.flags:
+        return True
+    if job.siblings:
+        for depends in _get_sibling_depends(job.tr_siblings()):
+            if suspend_job_id in depends:
+                return True
+    return False
+
+
+class JobGraph:
+    """
+    Dependency graph of the jobs known to a session.
+
+    Each edge goes from a job to one of the jobs it depends on and has one of
+    the DEP_TYPE_xxx types. Edges to jobs that are not in the graph are kept,
+    they only describe missing dependencies. Both directions of each edge
+    are indexed so all queries are proportional to the degree of the job.
+
+    The suspend edges go from a suspend job to every job that has to run
+    before it (see :func:`is_job_impacting_suspend()`).
+    """
+
+    DEP_TYPE_DIRECT = DependencyMissingError.DEP_TYPE_DIRECT
+    DEP_TYPE_ORDERING = DependencyMissingError.DEP_TYPE_ORDERING
+    DEP_TYPE_RESOURCE = DependencyMissingError.DEP_TYPE_RESOURCE
+    DEP_TYPE_SALVAGE = "salvage"
+    DEP_TYPE_SUSPEND = "suspend"
+
+    def __init__(self, job_list=()):
+        # Map from job id to job
+        self._job_map = {}
+        # Map from job id to a map from edge type to a set of job ids
+        self._forward_map = {}
+        self._reverse_map = {}
+        # Map from job id to the list of edges that were added with that job
+        self._edge_map = {}
+        for job in job_list:
+            self.add_job(job)
+
+    def __contains__(self, job_id):
+        return job_id in self._job_map
+
+    def __len__(self):
+        return len(self._job_map)
+
+    def add_job(self, job):
+        """
+        Add a job and all of its edges to the graph.
+
+        A job with the same id that is already in the graph is replaced.
+        """
+        if job.id in self._job_map:
+            self.remove_job(self._job_map[job.id])
+        self._job_map[job.id] = job
+        edge_list = self._edge_map[job.id] = list(self._compute_edges(job))
+        for job_id, dep_type, dep_id in edge_list:
+            self._forward_map.setdefault(job_id, {}).setdefault(
+                dep_type, set()
+            ).add(dep_id)
+            self._reverse_map.setdefault(dep_id, {}).setdefault(
+                dep_type, set()
+            ).add(job_id)
+
+    def remove_job(self, job):
+        """
+        Remove a job and all of the edges it added from the graph.
+
+        Edges of other jobs that point to the removed job are kept.
+        """
+        del self._job_map[job.id]
+        for job_id, dep_type, dep_id in self._edge_map.pop(job.id):
+            self._discard(self._forward_map, job_id, dep_type, dep_id)
+            self._discard(self._reverse_map, dep_id, dep_type, job_id)
+
+    def get_dependencies(self, job_id, dep_type=None):
+        """
+        Get the ids of the jobs that a job depends on.
+
+        :param job_id:
+            Id of the job to look at
+        :param dep_type:
+            One of the DEP_TYPE_xxx constants or None for edges of all types
+        :returns:
+            A frozenset of job ids
+        """
+        return self._get_adjacent(self._forward_map, job_id, dep_type)
+
+    def get_dependents(self, job_id, dep_type=None):
+        """
+        Get the ids of the jobs that depend on a job.
+
+        :param job_id:
+            Id of the job to look at. The job does not have to be in the
+            graph.
+        :param dep_type:
+            One of the DEP_TYPE_xxx constants or None for edges of all types
+        :returns:
+            A frozenset of job ids
+        """
+        return self._get_adjacent(self._reverse_map, job_id, dep_type)
+
+    def _compute_edges(self, job):
+        for dep_id in job.get_direct_dependencies():
+            yield job.id, self.DEP_TYPE_DIRECT, dep_id
+        for dep_id in job.get_after_dependencies():
+            yield job.id, self.DEP_TYPE_ORDERING, dep_id
+        try:
+            resource_deps = job.get_resource_dependencies()
+        except ResourceProgramError:
+            resource_deps = ()
+        for dep_id in resource_deps:
+            yield job.id, self.DEP_TYPE_RESOURCE, dep_id
+        for dep_id in job.get_salvage_dependencies():
+            yield job.id, self.DEP_TYPE_SALVAGE, dep_id
+        for suspend_job_id in (Suspend.AUTO_JOB_ID, Suspend.MANUAL_JOB_ID):
+            if is_job_impacting_suspend(suspend_job_id, job):
+                yield suspend_job_id, self.DEP_TYPE_SUSPEND, job.id
+
+    @staticmethod
+    def _get_adjacent(adjacency_map, job_id, dep_type):
+        type_map = adjacency_map.get(job_id, {})
+        if dep_type is not None:
+            return frozenset(type_map.get(dep_type, ()))
+        return frozenset().union(*type_map.values())
+
+    @staticmethod
+    def _discard(adjacency_map, job_id, dep_type, dep_id):
+        type_map = adjacency_map[job_id]
+        type_map[dep_type].discard(dep_id)
+        if not type_map[dep_type]:
+            del type_map[dep_type]
+        if not type_map:
+            del adjacency_map[job_id]
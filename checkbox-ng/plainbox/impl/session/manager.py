@@ -43,6 +43,7 @@ from plainbox.impl.session.state import SessionDeviceContext
 from plainbox.impl.session.state import SessionState
 from plainbox.impl.session.storage import LockedStorageError
 from plainbox.impl.session.storage import SessionStorage
+from plainbox.impl.session.suspend import SessionJournalHelper
 from plainbox.impl.session.suspend import SessionSuspendHelper
 from plainbox.impl.unit.testplan import TestPlanUnit
 from plainbox.vendor import morris
@@ -102,6 +103,19 @@ class SessionManager(pod.POD):
         assign_filter_list=[pod.typed, pod.const],
     )
 
+    journal = pod.Field(
+        doc="""
+        Optional journal helper used to create checkpoints
+
+        When set to a
+        :class:`~plainbox.impl.session.suspend.SessionJournalHelper` instance,
+        :meth:`checkpoint()` appends small delta records to the session
+        journal and only saves the whole session from time to time.
+        """,
+        type=SessionJournalHelper,
+        initial=None,
+    )
+
     _throwaway_managers = dict()
 
     def _on_test_plans_changed(self, old: "Any", new: "Any") -> None:
@@ -287,9 +301,27 @@ class SessionManager(pod.POD):
         :meth:`SessionManager.load_session()`.
         """
         logger.debug("SessionManager.checkpoint()")
-        data = SessionSuspendHelper().suspend(
-            self.state, self.storage.location
-        )
+        if self.journal is not None:
+            data, is_snapshot = self.journal.checkpoint(
+                self.state, self.storage.location
+            )
+            if not is_snapshot:
+                try:
+                    self.storage.append_journal(data)
+                    self._save_metadata()
+                    return
+                except (IOError, OSError) as exc:
+                    logger.warning(
+                        _("Cannot append to session journal: %s"), exc
+                    )
+                    self.journal.reset()
+                    data, is_snapshot = self.journal.checkpoint(
+                        self.state, self.storage.location
+                    )
+        else:
+            data = SessionSuspendHelper().suspend(
+                self.state, self.storage.location
+            )
         logger.debug(
             ngettext(
                 "Saving %d byte of checkpoint data to %r",
@@ -304,6 +336,22 @@ class SessionManager(pod.POD):
         except LockedStorageError:
             self.storage.break_lock()
             self.storage.save_checkpoint(data)
+        self._save_metadata()
+
+    def _save_metadata(self):
+        """
+        Save the meta-data of the session next to the checkpoint data.
+
+        The meta-data is only used to quickly list sessions, failing to save
+        it is not fatal as the whole checkpoint is loaded in that case.
+        """
+        data = SessionSuspendHelper().suspend_metadata(
+            self.state, self.storage.location
+        )
+        try:
+            self.storage.save_metadata(data)
+        except (IOError, OSError) as exc:
+            logger.warning(_("Cannot save session meta-data: %s"), exc)
 
     def destroy(self):
         """
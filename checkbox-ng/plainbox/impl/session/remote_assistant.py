@@ -26,7 +26,7 @@ import time
 from collections import namedtuple
 from contextlib import suppress
 from tempfile import SpooledTemporaryFile
-from threading import Thread, Lock
+from threading import Condition, Thread, Lock
 from plainbox.impl.config import Configuration
 from plainbox.impl.execution import UnifiedRunner
 from plainbox.impl.session.assistant import SessionAssistant
@@ -73,28 +73,45 @@ Finalizing = "finalizing"
 class BufferedUI(SilentUI):
     """UI type that queues the output for later reading."""
 
-    def __init__(self):
+    # Output queued up past this size is dropped until the controller reads
+    # the queue again. The job result keeps the complete io log regardless.
+    MAX_OUTPUT_SIZE = 1024 * 1024
+
+    def __init__(self, condition=None):
         super().__init__()
-        self.lock = Lock()
+        # The condition is notified each time some output is queued up
+        self.lock = Condition() if condition is None else condition
         self._output = io.StringIO()
+        self._dropping = False
 
     def _ignore_program_output(self, stream_name, line):
         pass
 
     def got_program_output(self, stream_name, line):
         with self.lock:
+            if self._output.tell() >= self.MAX_OUTPUT_SIZE:
+                if not self._dropping:
+                    self._output.write("hidden(Dropping test output)\n")
+                    self._dropping = True
+                return
             try:
                 self._output.write(stream_name + line.decode("UTF-8"))
             except UnicodeDecodeError:
                 # Don't start a agent->controller transfer for binary attachments
                 self._output.write("hidden(Hiding binary test output)\n")
                 self.got_program_output = self._ignore_program_output
+            self.lock.notify_all()
+
+    def has_output(self):
+        """Check if there is any output queued up."""
+        return self._output.tell() > 0
 
     def get_output(self):
         """Returns all the output queued up since previous call."""
         with self.lock:
             output = self._output.getvalue()
             self._output = io.StringIO()
+            self._dropping = False
             return output
 
 
@@ -105,6 +122,9 @@ class RemoteSilentUI(SilentUI):
         super().__init__()
         self._msg = "hidden(Command output hidden)"
 
+    def has_output(self):
+        return bool(self._msg)
+
     def get_output(self):
         msg = self._msg
         self._msg = ""
@@ -120,6 +140,7 @@ class BackgroundExecutor(Thread):
         self._ui = ui
         self._builder = None
         self._started_real_run = False
+        self._finished = False
         self._sa.session_change_lock.acquire()
         self.start()
         _logger.debug("BackgroundExecutor started for %s" % job_id)
@@ -131,9 +152,19 @@ class BackgroundExecutor(Thread):
         self.join()
         return self._builder
 
+    @property
+    def finished(self):
+        return self._finished
+
     def run(self):
         self._started_real_run = True
-        self._builder = self._real_run(self._job_id, self._ui, False)
+        try:
+            self._builder = self._real_run(self._job_id, self._ui, False)
+        finally:
+            # Wake up anyone waiting for the job to finish
+            with self._sa.job_condition:
+                self._finished = True
+                self._sa.job_condition.notify_all()
         _logger.debug("Finished running")
 
     def outcome(self):
@@ -143,14 +174,35 @@ class BackgroundExecutor(Thread):
 class RemoteSessionAssistant:
     """Remote execution enabling wrapper for the SessionAssistant"""
 
-    REMOTE_API_VERSION = 13
+    REMOTE_API_VERSION = 15
+
+    # Version of the records returned by get_jobs_records()
+    JOB_RECORDS_VERSION = 1
+    JOB_RECORD_FIELDS = (
+        "id",
+        "partial_id",
+        "name",
+        "category_id",
+        "category_name",
+        "automated",
+        "duration",
+        "description",
+        "outcome",
+        "user",
+        "command",
+        "num",
+        "plugin",
+        "certification_status",
+    )
 
     def __init__(self, cmd_callback):
         _logger.debug("__init__()")
         self._cmd_callback = cmd_callback
         self._session_change_lock = Lock()
         self._operator_lock = Lock()
-        self._ui = BufferedUI()
+        # Notified when the running job queues up output or finishes
+        self._job_condition = Condition()
+        self._ui = BufferedUI(self._job_condition)
         self._input_piping = os.pipe()
         self._passwordless_sudo = is_passwordless_sudo()
         self.terminate_cb = None
@@ -182,6 +234,10 @@ class RemoteSessionAssistant:
     def session_change_lock(self):
         return self._session_change_lock
 
+    @property
+    def job_condition(self):
+        return self._job_condition
+
     @property
     def config(self):
         return self._sa.config
@@ -422,7 +478,7 @@ class RemoteSessionAssistant:
         if "suppress-output" in job.get_flag_set():
             show_out = False
         if show_out:
-            self._ui = BufferedUI()
+            self._ui = BufferedUI(self._job_condition)
         else:
             self._ui = RemoteSilentUI()
         return self._ui
@@ -546,11 +602,31 @@ class RemoteSessionAssistant:
         _logger.debug("monitor_job()")
         # either return [done, running, awaiting response]
         # TODO: handle awaiting_response (reading from stdin by the job)
-        if self._be and self._be.is_alive():
+        if self._be and not self._be.finished:
             return ("running", self._ui.get_output())
         else:
             return ("done", self._ui.get_output())
 
+    @allowed_when(Running, Bootstrapping, Interacting, TestsSelected)
+    def wait_for_job_output(self, timeout):
+        """
+        Wait for the currently running job to produce output or to finish.
+
+        :param timeout:
+            Maximum number of seconds to wait for
+        :returns:
+            (state, payload) tuple, just like :meth:`monitor_job()`
+
+        Unlike :meth:`monitor_job()` this returns as soon as something
+        happens, so the controller does not have to poll the agent.
+        """
+        with self._job_condition:
+            self._job_condition.wait_for(self._has_job_changed, timeout)
+        return self.monitor_job()
+
+    def _has_job_changed(self):
+        return not self._be or self._be.finished or self._ui.has_output()
+
     def get_remote_api_version(self):
         return self.REMOTE_API_VERSION
 
@@ -653,40 +729,110 @@ class RemoteSessionAssistant:
         :returns:
             list of dicts representing jobs
         """
-        test_info_list = tuple()
-        for job_no, job_id in enumerate(job_ids, start=offset + 1):
-            job = self._sa.get_job(job_id)
-            cat_id = self._sa.get_job_state(job.id).effective_category_id
-            duration_txt = _("No estimated duration provided for this job")
-            if job.estimated_duration is not None:
-                duration_txt = "{} {}".format(
-                    job.estimated_duration, _("seconds")
+        return json.dumps(
+            [
+                self._get_job_info(job_id, job_no)
+                for job_no, job_id in enumerate(job_ids, start=offset + 1)
+            ]
+        )
+
+    def get_jobs_records(
+        self, job_ids, offset=0, fields=None, start=0, count=None
+    ):
+        """
+        Get compact records describing a page of a list of jobs.
+
+        :param job_ids:
+            list of job ids to describe
+        :param offset:
+            apply an offset to the job number if for instance the job list
+            is being requested part way through a session
+        :param fields:
+            names of the fields to include in each record (see
+            JOB_RECORD_FIELDS), all of them if None
+        :param start:
+            index in job_ids of the first job to describe
+        :param count:
+            maximum number of jobs to describe, all the remaining jobs if
+            None
+        :returns:
+            A JSON object with the following keys:
+            "version" (JOB_RECORDS_VERSION), "fields" (names of the fields),
+            "records" (one list of values, in the order of "fields", for
+            each job of the page) and "total" (number of job ids)
+        """
+        job_ids = list(job_ids)
+        if fields is None:
+            fields = self.JOB_RECORD_FIELDS
+        else:
+            fields = tuple(fields)
+            unknown_fields = set(fields).difference(self.JOB_RECORD_FIELDS)
+            if unknown_fields:
+                raise ValueError(
+                    "unknown job record fields: {}".format(
+                        ", ".join(sorted(unknown_fields))
+                    )
                 )
-            # the next dict is only to get test_info generating code tidier
-            automated_desc = {
-                True: _("this job is fully automated"),
-                False: _("this job requires some manual interaction"),
-            }
-            test_info = {
-                "id": job.id,
-                "partial_id": job.partial_id,
-                "name": job.tr_summary(),
-                "category_id": cat_id,
-                "category_name": self._sa.get_category(cat_id).tr_name(),
-                "automated": automated_desc[job.automated],
-                "duration": duration_txt,
-                "description": (
-                    job.tr_description()
-                    or _("No description provided for this job")
-                ),
-                "outcome": self._sa.get_job_state(job.id).result.outcome,
-                "user": job.user,
-                "command": job.command,
-                "num": job_no,
-                "plugin": job.plugin,
+        stop = len(job_ids) if count is None else start + count
+        records = []
+        for index, job_id in enumerate(job_ids[start:stop], start=start):
+            job_info = self._get_job_info(job_id, offset + index + 1, fields)
+            records.append([job_info[field] for field in fields])
+        return json.dumps(
+            {
+                "version": self.JOB_RECORDS_VERSION,
+                "fields": fields,
+                "records": records,
+                "total": len(job_ids),
             }
-            test_info_list = test_info_list + ((test_info,))
-        return json.dumps(test_info_list)
+        )
+
+    def _get_job_info(self, job_id, job_no, fields=None):
+        """
+        Describe a job with a {'field': 'val'} dict.
+
+        Only the fields listed in fields (see JOB_RECORD_FIELDS, all of them
+        if None) are computed.
+        """
+        job = self._sa.get_job(job_id)
+        job_state = self._sa.get_job_state(job.id)
+        if fields is None:
+            fields = self.JOB_RECORD_FIELDS
+
+        def get_duration():
+            if job.estimated_duration is None:
+                return _("No estimated duration provided for this job")
+            return "{} {}".format(job.estimated_duration, _("seconds"))
+
+        def get_automated():
+            if job.automated:
+                return _("this job is fully automated")
+            return _("this job requires some manual interaction")
+
+        getter_map = {
+            "id": lambda: job.id,
+            "partial_id": lambda: job.partial_id,
+            "name": job.tr_summary,
+            "category_id": lambda: job_state.effective_category_id,
+            "category_name": lambda: self._sa.get_category(
+                job_state.effective_category_id
+            ).tr_name(),
+            "automated": get_automated,
+            "duration": get_duration,
+            "description": lambda: (
+                job.tr_description()
+                or _("No description provided for this job")
+            ),
+            "outcome": lambda: job_state.result.outcome,
+            "user": lambda: job.user,
+            "command": lambda: job.command,
+            "num": lambda: job_no,
+            "plugin": lambda: job.plugin,
+            "certification_status": lambda: (
+                job_state.effective_certification_status
+            ),
+        }
+        return {field: getter_map[field]() for field in fields}
 
     def delete_sessions(self, session_list):
         return self._sa.delete_sessions(session_list)
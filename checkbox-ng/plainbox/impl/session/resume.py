@@ -53,6 +53,7 @@ import json
 import logging
 import os
 import re
+import zlib
 
 from plainbox.i18n import gettext as _
 from plainbox.impl.result import DiskJobResult
@@ -139,19 +140,73 @@ class EnvelopeUnpackMixIn:
             the JSON representation of a session stored in the envelope
         :raises CorruptedSessionError:
             if the representation of the session is corrupted in any way
+
+        The envelope may contain the records of the session journal after the
+        snapshot itself (see
+        :class:`~plainbox.impl.session.suspend.SessionJournalHelper`), those
+        are replayed on top of the snapshot.
         """
         try:
             data = gzip.decompress(data)
+        except EOFError:
+            # The last journal record may be truncated if the system crashed
+            # while it was being written, keep everything before it.
+            data = self._decompress_intact_members(data)
         except IOError:
             raise CorruptedSessionError(_("Cannot decompress session data"))
         try:
-            text = data.decode("UTF-8")
+            text = data.decode("UTF-8").strip()
         except UnicodeDecodeError:
             raise CorruptedSessionError(_("Cannot decode session text"))
+        decoder = json.JSONDecoder()
         try:
-            return json.loads(text)
+            json_repr, end = decoder.raw_decode(text)
         except ValueError:
             raise CorruptedSessionError(_("Cannot interpret session JSON"))
+        journal_id = (
+            json_repr.get("journal") if isinstance(json_repr, dict) else None
+        )
+        while end < len(text):
+            try:
+                record, end = decoder.raw_decode(text, end)
+            except ValueError:
+                raise CorruptedSessionError(_("Cannot interpret session JSON"))
+            if journal_id is None or not isinstance(record, dict):
+                continue
+            if record.get("journal") != journal_id:
+                # Leftovers from before the last snapshot
+                continue
+            session_repr = json_repr.get("session")
+            if isinstance(session_repr, dict):
+                self._replay_journal_record(session_repr, record)
+        return json_repr
+
+    @staticmethod
+    def _decompress_intact_members(data):
+        result = b""
+        while data:
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            try:
+                member = decompressor.decompress(data)
+            except zlib.error:
+                break
+            if not decompressor.eof:
+                break
+            result += member
+            data = decompressor.unused_data
+        if not result:
+            raise CorruptedSessionError(_("Cannot decompress session data"))
+        logger.warning(_("Ignoring truncated session journal record"))
+        return result
+
+    @staticmethod
+    def _replay_journal_record(session_repr, record):
+        for key, update in record.get("update", {}).items():
+            session_repr.setdefault(key, {}).update(update)
+        for key, remove in record.get("remove", {}).items():
+            for item_key in remove:
+                session_repr.get(key, {}).pop(item_key, None)
+        session_repr.update(record.get("replace", {}))
 
 
 class SessionPeekHelper(EnvelopeUnpackMixIn):
@@ -173,6 +228,35 @@ class SessionPeekHelper(EnvelopeUnpackMixIn):
         json_repr = self.unpack_envelope(data)
         return self._peek_json(json_repr)
 
+    def peek_storage(self, storage):
+        """
+        Peek at the meta-data of a session kept in the given storage.
+
+        The meta-data saved next to the checkpoint is used if it is up to
+        date, the whole checkpoint is loaded and unpacked otherwise.
+
+        :param storage:
+            A SessionStorage object
+        :returns:
+            a SessionMetaData object or None if the session was not saved yet
+        :raises CorruptedSessionError:
+            if the representation of the session is corrupted in any way
+        :raises IncompatibleSessionError:
+            if session serialization format is not supported
+        """
+        data = storage.load_metadata()
+        if data is not None:
+            try:
+                return self._peek_json(json.loads(data.decode("UTF-8")))
+            except (ValueError, SessionResumeError) as exc:
+                logger.debug(
+                    _("Cannot use meta-data of %r: %s"), storage.id, exc
+                )
+        data = storage.load_checkpoint()
+        if len(data) == 0:
+            return None
+        return self.peek(data)
+
     def _peek_json(self, json_repr):
         """
         Resume a SessionMetaData object from the JSON representation.
@@ -30,15 +30,16 @@ from plainbox.abc import IJobResult
 from plainbox.i18n import gettext as _
 from plainbox.impl import deprecated
 from plainbox.impl.depmgr import DependencyDuplicateError
-from plainbox.impl.depmgr import DependencyError
 from plainbox.impl.depmgr import DependencySolver
 from plainbox.impl.secure.qualifiers import select_units
+from plainbox.impl.session.graph import JobGraph
 from plainbox.impl.session.jobs import JobState
 from plainbox.impl.session.jobs import UndesiredJobReadinessInhibitor
 from plainbox.impl.session.system_information import (
     collect as collect_system_information,
 )
 from plainbox.impl.unit.job import JobDefinition
+from plainbox.impl.unit.template import TemplateUnit
 from plainbox.impl.unit.unit_with_id import UnitWithId
 from plainbox.impl.unit.testplan import TestPlanUnitSupport
 from plainbox.suspend_consts import Suspend
@@ -761,9 +762,22 @@ class SessionState:
         self._job_list = job_list
         self._unit_list = unit_list
         self._job_state_map = {job.id: JobState(job) for job in self._job_list}
+        self._job_graph = JobGraph(self._job_list)
+        # Map from resource job id to the list of templates that instantiate
+        # units from the resources of that job
+        self._template_map = {}
+        for unit in unit_list:
+            if isinstance(unit, TemplateUnit):
+                self._template_map.setdefault(unit.resource_id, []).append(
+                    unit
+                )
         self._desired_job_list = []
         self._mandatory_job_list = []
         self._run_list = []
+        # Map from the id of each job on the run list to its position,
+        # rebuilt by _recompute_job_readiness()
+        self._run_index_map = {}
+        self._readiness_evaluation_count = 0
         self._resource_map = {}
         self._fake_resources = False
         self._metadata = SessionMetaData()
@@ -825,6 +839,7 @@ class SessionState:
         for job, should_remove in job_and_flag_list:
             if should_remove:
                 del self._job_state_map[job.id]
+                self._job_graph.remove_job(job)
                 if job.id in self._resource_map:
                     del self._resource_map[job.id]
         # Compute a list of jobs to retain
@@ -894,43 +909,16 @@ class SessionState:
         if include_mandatory:
             self._desired_job_list += self._mandatory_job_list
         self._desired_job_list += list(desired_job_list)
-        # Reset run list just in case desired_job_list is empty
-        self._run_list = []
-        # Try to solve the dependency graph. This is done in a loop as may need
-        # to remove a problematic job and re-try. The loop provides a stop
-        # condition as we will eventually run out of jobs.
-        problems = []
-        # Get a copy of all the jobs as we'll be removing elements from this
-        # list to come to a stable set in the loop below.
-        job_list = self._job_list[:]
-        while self._desired_job_list:
-            # XXX: it might be more efficient to incorporate this 'recovery
-            # mode' right into the solver, this way we'd probably save some
-            # resources or runtime complexity.
-            try:
-                self._run_list = DependencySolver.resolve_dependencies(
-                    job_list, self._desired_job_list
-                )
-            except DependencyError as exc:
-                # When a dependency error is detected remove the affected job
-                # form _desired_job_list and try again.
-                if exc.affected_job in self._desired_job_list:
-                    # The job may have been removed by now:
-                    # https://bugs.launchpad.net/plainbox/+bug/1444126
-                    self._desired_job_list.remove(exc.affected_job)
-                if exc.affected_job in job_list:
-                    # If the affected job is in the job list, remove it from
-                    # the job list we're going to consider in the next run.
-                    # This is done so that if a job depends on a broken but
-                    # existing job, it won't constantly re-add the same broken
-                    # job over and over (so that the algorithm can stop).
-                    job_list.remove(exc.affected_job)
-                # Remember each problem, this can be presented by the UI
-                problems.append(exc)
-                continue
-            else:
-                # Don't iterate the loop if there was no exception
-                break
+        # Solve the dependency graph. Each problematic job is removed (along
+        # with jobs that depend on it) from both the list of jobs we consider
+        # and from _desired_job_list. If a job depends on a broken but
+        # existing job, it is removed as well. The solver finds all of the
+        # problems in one go, each problem can be presented by the UI.
+        self._run_list, self._desired_job_list, problems = (
+            DependencySolver.resolve_dependencies_and_problems(
+                self._job_list, self._desired_job_list, self._job_graph
+            )
+        )
         # Update all job readiness state
         self._recompute_job_readiness()
         # Return all dependency problems to the caller
@@ -995,7 +983,26 @@ class SessionState:
         job.controller.observe_result(
             self, job, result, fake_resources=self._fake_resources
         )
-        self._recompute_job_readiness()
+        self._recompute_dependent_job_readiness(job.id)
+
+    def update_job_result_list(self, job_result_list):
+        """
+        Notice many test results at once and update readiness state.
+
+        :param job_result_list:
+            A list of (job, result) pairs
+
+        This is equivalent to calling :meth:`update_job_result()` for each
+        pair but the readiness of the dependent jobs is only computed once,
+        after all the results are stored.
+        """
+        for job, result in job_result_list:
+            job.controller.observe_result(
+                self, job, result, fake_resources=self._fake_resources
+            )
+        self._recompute_dependent_job_readiness(
+            *(job.id for job, result in job_result_list)
+        )
 
     @deprecated("0.9", "use the add_unit() method instead")
     def add_job(self, new_job, recompute=True):
@@ -1005,7 +1012,8 @@ class SessionState:
         :param new_job:
             The job being added
         :param recompute:
-            If True, recompute readiness inhibitors for all jobs.
+            If True, recompute readiness inhibitors for all jobs that
+            refer to the new job.
             You should only set this to False if you're adding
             a number of jobs and will otherwise ensure that
             :meth:`_recompute_job_readiness()` gets called before
@@ -1027,7 +1035,8 @@ class SessionState:
 
         .. note::
 
-            This method recomputes job readiness for all jobs
+            This method recomputes job readiness for all jobs that refer to
+            the new job
         """
         return self.add_unit(new_job, recompute)
 
@@ -1038,7 +1047,8 @@ class SessionState:
         :param new_unit:
             The unit being added
         :param recompute:
-            If True, recompute readiness inhibitors for all jobs.
+            If True, recompute readiness inhibitors for all jobs that
+            refer to the new job.
             You should only set this to False if you're adding
             a number of jobs and will otherwise ensure that
             :meth:`_recompute_job_readiness()` gets called before
@@ -1063,18 +1073,51 @@ class SessionState:
             discarded.
 
         .. note::
-            This method recomputes job readiness for all jobs unless the
-            recompute=False argument is used. Recomputing takes a while so if
-            you want to add a lot of units consider setting that to False and
-            only recompute at the last call.
+            This method recomputes job readiness for all jobs that refer to
+            the new job unless the recompute=False argument is used.
         """
         if new_unit.Meta.name == "job":
             return self._add_job_unit(new_unit, recompute, via)
         else:
             return self._add_other_unit(new_unit)
 
+    def add_units(self, new_unit_list, via=None):
+        """
+        Add a number of new units to the session.
+
+        :param new_unit_list:
+            The units being added
+        :param via:
+            The job that generated the units, if any
+        :returns:
+            A list with the unit that was actually added, or an existing
+            identical unit, for each of the new units.
+
+        :raises DependencyDuplicateError:
+            if a duplicate, clashing job definition is detected
+
+        This works like calling :meth:`add_unit()` for each of the new units
+        but the readiness of the jobs that refer to the new jobs is only
+        recomputed once, after all of the units were added.
+        """
+        # New jobs (including their siblings) are appended to the job list
+        job_count = len(self._job_list)
+        try:
+            return [
+                self.add_unit(new_unit, recompute=False, via=via)
+                for new_unit in new_unit_list
+            ]
+        finally:
+            self._recompute_dependent_job_readiness(
+                *[job.id for job in self._job_list[job_count:]]
+            )
+
     def _add_other_unit(self, new_unit):
         self.unit_list.append(new_unit)
+        if isinstance(new_unit, TemplateUnit):
+            self._template_map.setdefault(new_unit.resource_id, []).append(
+                new_unit
+            )
         self.on_unit_added(new_unit)
         return new_unit
 
@@ -1086,6 +1129,7 @@ class SessionState:
             # Register the new job in our state
             self.job_state_map[new_job.id] = JobState(new_job)
             self.job_list.append(new_job)
+            self._job_graph.add_job(new_job)
             self.unit_list.append(new_job)
             self.on_job_state_map_changed()
             self.on_unit_added(new_job)
@@ -1100,9 +1144,9 @@ class SessionState:
             self._add_job_siblings_unit(new_job, recompute, via)
             return existing_job
         finally:
-            # Update all job readiness state
+            # Update the readiness state of jobs that refer to the new job
             if recompute:
-                self._recompute_job_readiness()
+                self._recompute_dependent_job_readiness(new_job.id)
 
     def _add_job_siblings_unit(self, new_job, recompute, via):
         if new_job.siblings:
@@ -1200,10 +1244,13 @@ class SessionState:
             only recompute at the last call.
         """
         self._unit_list.remove(unit)
+        if isinstance(unit, TemplateUnit):
+            self._template_map[unit.resource_id].remove(unit)
         self.on_unit_removed(unit)
         if unit.Meta.name == "job":
             self._job_list.remove(unit)
             del self._job_state_map[unit.id]
+            self._job_graph.remove_job(unit)
             try:
                 del self._resource_map[unit.id]
             except KeyError:
@@ -1269,6 +1316,26 @@ class SessionState:
         """
         return self._run_list
 
+    def get_template_list(self, resource_id):
+        """
+        Get the templates that instantiate units from the resources of a job.
+
+        :param resource_id:
+            Id of the resource job
+        :returns:
+            A list of TemplateUnit, in the order they were added
+        """
+        return list(self._template_map.get(resource_id, ()))
+
+    @property
+    def job_graph(self):
+        """
+        Dependency graph of all the jobs known to this session.
+
+        The graph is kept up to date as jobs are added and removed.
+        """
+        return self._job_graph
+
     @property
     def job_state_map(self):
         """Map from job id to JobState associated with each job."""
@@ -1486,12 +1553,26 @@ class SessionState:
         """meta-data object associated with this session state."""
         return self._metadata
 
+    @property
+    def readiness_evaluation_count(self):
+        """
+        Number of times the readiness of a single job was evaluated.
+
+        This is a diagnostic counter. A full recompute evaluates every job on
+        the run list while presenting a result to the session only evaluates
+        the jobs that depend on it.
+        """
+        return self._readiness_evaluation_count
+
     def _recompute_job_readiness(self):
         """
         Internal method of SessionState.
 
         Re-computes [job_state.ready
                      for job_state in _job_state_map.values()]
+
+        This also rebuilds the map of run list positions used by
+        :meth:`_recompute_dependent_job_readiness()`.
         """
         # Reset the state of all jobs to have the undesired inhibitor. Since
         # we maintain a state object for _all_ jobs (including ones not in the
@@ -1501,18 +1582,43 @@ class SessionState:
             job_state.readiness_inhibitor_list = [
                 UndesiredJobReadinessInhibitor
             ]
+        self._run_index_map = {
+            job.id: index for index, job in enumerate(self._run_list)
+        }
         # Take advantage of the fact that run_list is topologically sorted and
         # do a single O(N) pass over _run_list. All "current/update" state is
         # computed before it needs to be observed (thanks to the ordering)
         for job in self._run_list:
-            job_state = self._job_state_map[job.id]
-            # Remove the undesired inhibitor as we want to run this job
-            try:
-                job_state.readiness_inhibitor_list.remove(
-                    UndesiredJobReadinessInhibitor
-                )
-            except ValueError:
-                pass
-            # Ask the job controller about inhibitors affecting this job
-            for inhibitor in job.controller.get_inhibitor_list(self, job):
-                job_state.readiness_inhibitor_list.append(inhibitor)
+            self._evaluate_job_readiness(job)
+
+    def _recompute_dependent_job_readiness(self, *job_id_list):
+        """
+        Internal method of SessionState.
+
+        Re-computes the readiness of the jobs on the run list that depend on
+        any of the jobs with the given ids. Inhibitors only ever look at the
+        results (and resources) of other jobs so a change to one job cannot
+        ripple any further than its direct dependents.
+
+        The dependents are evaluated in the order of the run list.
+        """
+        dependent_id_set = set()
+        for job_id in job_id_list:
+            dependent_id_set.update(self._job_graph.get_dependents(job_id))
+        for dep_id in sorted(
+            dependent_id_set & self._run_index_map.keys(),
+            key=self._run_index_map.__getitem__,
+        ):
+            self._evaluate_job_readiness(self._job_state_map[dep_id].job)
+
+    def _evaluate_job_readiness(self, job):
+        """
+        Internal method of SessionState.
+
+        Ask the job controller about inhibitors affecting a job that is on
+        the run list and store them in the job state.
+        """
+        self._readiness_evaluation_count += 1
+        self._job_state_map[job.id].readiness_inhibitor_list = list(
+            job.controller.get_inhibitor_list(self, job)
+        )
@@ -125,13 +125,19 @@ class WellKnownDirsHelper:
         """
         repo = WellKnownDirsHelper().session_repository()
         logger.debug(_("Enumerating sessions in %s"), repo)
+        candidate_list = []
         try:
-            # Try to enumerate the directory
-            item_list = sorted(
-                os.listdir(repo),
-                key=lambda x: os.stat(os.path.join(repo, x)).st_mtime,
-                reverse=True,
-            )
+            # Try to enumerate the directory, each item is stat'ed only once
+            for entry in os.scandir(repo):
+                # Consider non-hidden directories that end with the word
+                # .session, make sure not to follow any symlinks here
+                if entry.name.startswith(".") or not entry.name.endswith(
+                    ".session"
+                ):
+                    continue
+                stat_result = entry.stat(follow_symlinks=False)
+                if stat.S_ISDIR(stat_result.st_mode):
+                    candidate_list.append((stat_result.st_mtime, entry))
         except OSError as exc:
             # If the directory does not exist,
             # silently return empty collection
@@ -139,21 +145,12 @@ class WellKnownDirsHelper:
                 return []
             # Don't silence any other errors
             raise
+        candidate_list.sort(key=lambda candidate: candidate[0], reverse=True)
         session_list = []
-        # Check each item by looking for directories
-        for item in item_list:
-            pathname = os.path.join(repo, item)
-            # Make sure not to follow any symlinks here
-            stat_result = os.lstat(pathname)
-            # Consider non-hidden directories that end with the word .session
-            if (
-                not item.startswith(".")
-                and item.endswith(".session")
-                and stat.S_ISDIR(stat_result.st_mode)
-            ):
-                logger.debug(_("Found possible session in %r"), pathname)
-                session = SessionStorage(os.path.splitext(item)[0])
-                session_list.append(session)
+        for _mtime, entry in candidate_list:
+            logger.debug(_("Found possible session in %r"), entry.path)
+            session = SessionStorage(os.path.splitext(entry.name)[0])
+            session_list.append(session)
         # Return the full list
         return session_list
 
@@ -184,6 +181,12 @@ class SessionStorage:
 
     _SESSION_FILE_NEXT = "session.next"
 
+    _SESSION_JOURNAL = "session.journal"
+
+    _SESSION_METADATA = "session.metadata"
+
+    _SESSION_METADATA_NEXT = "session.metadata.next"
+
     def __init__(self, id):
         """
         Initialize a :class:`SessionStorage` with the given location.
@@ -287,6 +290,20 @@ class SessionStorage:
             finally:
                 # Close the session file
                 os.close(session_fd)
+            # Append the journal (if any), it is replayed on top of the
+            # session file by the resume code
+            try:
+                journal_fd = os.open(
+                    self._SESSION_JOURNAL, os.O_RDONLY, dir_fd=location_fd
+                )
+            except FileNotFoundError:
+                pass
+            else:
+                try:
+                    with os.fdopen(journal_fd, "rb", closefd=False) as stream:
+                        data += stream.read()
+                finally:
+                    os.close(journal_fd)
         except IOError as exc:
             if exc.errno == errno.ENOENT:
                 # Treat lack of 'session' file as an empty file
@@ -298,6 +315,44 @@ class SessionStorage:
             # Close the location directory
             os.close(location_fd)
 
+    def append_journal(self, data):
+        """
+        Append a record to the session journal.
+
+        The journal complements the data saved by :meth:`save_checkpoint()`
+        and is removed by the next call to that method. Records are appended
+        as-is, :meth:`load_checkpoint()` returns them right after the
+        checkpoint data.
+
+        :raises TypeError:
+            if data is not a bytes object.
+        :raises IOError, OSError:
+            on various problems related to accessing the filesystem.
+        """
+        if not isinstance(data, bytes):
+            raise TypeError("data must be bytes")
+        location_fd = os.open(self.location, os.O_DIRECTORY)
+        try:
+            journal_fd = os.open(
+                self._SESSION_JOURNAL,
+                os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+                0o644,
+                dir_fd=location_fd,
+            )
+            try:
+                is_new = os.fstat(journal_fd).st_size == 0
+                num_written = os.write(journal_fd, data)
+                if num_written != len(data):
+                    raise IOError(_("partial write?"))
+                os.fsync(journal_fd)
+            finally:
+                os.close(journal_fd)
+            if is_new:
+                # Make sure the new directory entry is on disk as well
+                os.fsync(location_fd)
+        finally:
+            os.close(location_fd)
+
     def save_checkpoint(self, data):
         """
         Save checkpoint data to the filesystem.
@@ -425,6 +480,7 @@ class SessionStorage:
                 self._SESSION_FILE_NEXT,
                 self._SESSION_FILE,
             )
+            renamed = False
             try:
                 os.rename(
                     self._SESSION_FILE_NEXT,
@@ -432,6 +488,7 @@ class SessionStorage:
                     src_dir_fd=location_fd,
                     dst_dir_fd=location_fd,
                 )
+                renamed = True
             except Exception as exc:
                 # Same as above, if we fail we need to unlink the next file
                 # otherwise any other attempts will not be able to open() it
@@ -461,11 +518,109 @@ class SessionStorage:
                     self.location,
                     exc,
                 )
+            # The journal (if any) was compacted into the new session file.
+            # Records left behind by a crash happening right now refer to the
+            # previous session file so they are ignored on resume.
+            if renamed:
+                try:
+                    os.unlink(self._SESSION_JOURNAL, dir_fd=location_fd)
+                except FileNotFoundError:
+                    pass
         finally:
             # Close the location directory
             logger.debug(_("Closing descriptor %d"), location_fd)
             os.close(location_fd)
 
+    def _checkpoint_stamp(self, location_fd):
+        """
+        Compute a stamp identifying the current checkpoint data.
+
+        The session file is replaced on each save and the journal only grows
+        until it is removed so their inode numbers and sizes change whenever
+        the data returned by :meth:`load_checkpoint()` changes.
+        """
+        stamp = []
+        for name in (self._SESSION_FILE, self._SESSION_JOURNAL):
+            try:
+                stat_result = os.stat(name, dir_fd=location_fd)
+            except FileNotFoundError:
+                stamp.extend((0, 0))
+            else:
+                stamp.extend((stat_result.st_ino, stat_result.st_size))
+        return " ".join(str(item) for item in stamp).encode("ASCII")
+
+    def save_metadata(self, data):
+        """
+        Save meta-data of the most recent checkpoint to the filesystem.
+
+        The meta-data is a small, uncompressed, summary of the checkpoint
+        data that can be used to list sessions without loading the whole
+        checkpoint. It must be saved after each call to
+        :meth:`save_checkpoint()` or :meth:`append_journal()`, otherwise
+        :meth:`load_metadata()` considers it to be out of date.
+
+        :raises TypeError:
+            if data is not a bytes object.
+        :raises IOError, OSError:
+            on various problems related to accessing the filesystem.
+        """
+        if not isinstance(data, bytes):
+            raise TypeError("data must be bytes")
+        location_fd = os.open(self.location, os.O_DIRECTORY)
+        try:
+            stamp = self._checkpoint_stamp(location_fd)
+            next_fd = os.open(
+                self._SESSION_METADATA_NEXT,
+                os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                0o644,
+                dir_fd=location_fd,
+            )
+            with os.fdopen(next_fd, "wb") as stream:
+                stream.write(stamp + b"\n" + data)
+            # The meta-data can always be recomputed from the checkpoint so
+            # there is no need to fsync it, the rename keeps it consistent.
+            os.replace(
+                self._SESSION_METADATA_NEXT,
+                self._SESSION_METADATA,
+                src_dir_fd=location_fd,
+                dst_dir_fd=location_fd,
+            )
+        finally:
+            os.close(location_fd)
+
+    def load_metadata(self):
+        """
+        Load meta-data of the most recent checkpoint from the filesystem.
+
+        :returns:
+            data saved by :meth:`save_metadata()` or None if there is no
+            meta-data or if it does not describe the most recent checkpoint
+        :rtype: bytes
+
+        :raises IOError, OSError:
+            on various problems related to accessing the filesystem
+        """
+        try:
+            location_fd = os.open(self.location, os.O_DIRECTORY)
+        except FileNotFoundError:
+            return None
+        try:
+            try:
+                metadata_fd = os.open(
+                    self._SESSION_METADATA, os.O_RDONLY, dir_fd=location_fd
+                )
+            except FileNotFoundError:
+                return None
+            with os.fdopen(metadata_fd, "rb") as stream:
+                stamp = stream.readline().rstrip(b"\n")
+                data = stream.read()
+            if stamp != self._checkpoint_stamp(location_fd):
+                logger.debug(_("Meta-data of %r is out of date"), self.id)
+                return None
+            return data
+        finally:
+            os.close(location_fd)
+
     def break_lock(self):
         """
         Forcibly unlock the storage by removing a file created during
@@ -83,6 +83,16 @@ Serialization format versions
 5) Same as '4' but DiskJobResult is stored with a relative pathname to the log
    file if session_dir is provided.
 6) Same as '5' plus store the list of mandatory jobs.
+
+Journaled checkpoints
+^^^^^^^^^^^^^^^^^^^^^
+:class:`SessionJournalHelper` can be used instead of the regular helper to
+avoid writing the whole session on each checkpoint. It creates regular
+snapshots (with an additional ``journal`` identifier) followed by small delta
+records that are appended to the session journal. Each record is a separate
+gzip member, so the snapshot followed by the journal is still a valid gzip
+stream. Records are replayed on top of the snapshot when the session is
+resumed, records of another snapshot are ignored.
 """
 
 import base64
@@ -90,6 +100,7 @@ import gzip
 import json
 import logging
 import os
+import uuid
 
 from plainbox.impl.result import DiskJobResult
 from plainbox.impl.result import MemoryJobResult
@@ -138,6 +149,39 @@ class SessionSuspendHelper1:
         # NOTE: gzip.compress is not deterministic on python3.2
         return gzip.compress(data)
 
+    def suspend_metadata(self, session, session_dir=None):
+        """
+        Compute suspend representation of the session meta-data.
+
+        Compute the data that is saved by :class:`SessionStorage` as a part
+        of :meth:`SessionStorage.save_metadata()`. It has the same layout as
+        the data returned by :meth:`suspend()` but only the meta-data of the
+        session is kept and it is not compressed, which makes it cheap to
+        peek at.
+
+        :param session:
+            The SessionState object to represent.
+        :param session_dir:
+            (optional) The base directory of the session.
+
+        :returns bytes: the serialized data
+        """
+        json_repr = {
+            "version": self.VERSION,
+            "session": {
+                "metadata": self._repr_SessionMetaData(
+                    session.metadata, session_dir
+                )
+            },
+        }
+        return json.dumps(
+            json_repr,
+            ensure_ascii=False,
+            sort_keys=True,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("UTF-8")
+
     def _json_repr(self, session, session_dir):
         """
         Compute the representation of all of the data that needs to be saved.
@@ -675,3 +719,231 @@ class SessionSuspendHelper8(SessionSuspendHelper7):
 
 # Alias for the most recent version
 SessionSuspendHelper = SessionSuspendHelper8
+
+
+#: Marker of the items missing from the representation of a session
+_ABSENT = object()
+
+
+class SessionJournalHelper(SessionSuspendHelper):
+    """
+    Helper class for computing journaled checkpoints of a session.
+
+    The first checkpoint and every :attr:`COMPACT_EVERY` checkpoints after
+    that, a full snapshot is created (compacting the journal). Other
+    checkpoints only describe what changed since the previous one. Unlike the
+    other suspend helpers, this one is stateful and a single instance must be
+    used for all the checkpoints of a session.
+
+    The helper listens to the signals of the session to learn which jobs got
+    a new result (or were added or removed) so that a delta record only
+    represents those jobs. The meta-data of the session (which is small) is
+    represented on each checkpoint, the job lists and the system information
+    only when they are replaced.
+    """
+
+    #: Number of delta records after which a full snapshot is created
+    COMPACT_EVERY = 50
+
+    def __init__(self):
+        self._journal_id = None
+        self._delta_count = 0
+        self._session = None
+        self._session_dir = None
+        # Representation of the session at the previous checkpoint, each
+        # delta record is applied to it
+        self._last_session_repr = None
+        # Job lists and system information of the session at the previous
+        # checkpoint, the session replaces them when they change
+        self._last_job_lists = None
+        self._last_system_information = None
+        self._run_id_set = frozenset()
+        # Ids of the jobs that changed since the previous checkpoint
+        self._changed_job_id_set = set()
+
+    def reset(self):
+        """
+        Forget the previous checkpoint so that the next one is a snapshot
+        """
+        self._last_session_repr = None
+
+    def checkpoint(self, session, session_dir=None):
+        """
+        Compute the next checkpoint of the session.
+
+        :param session:
+            The SessionState object to represent.
+        :param session_dir:
+            (optional) The base directory of the session, see
+            :meth:`SessionSuspendHelper1.suspend()`.
+        :returns:
+            A tuple (data, is_snapshot). Snapshots replace the saved session
+            (and the journal) while other data is appended to the journal.
+        """
+        is_snapshot = (
+            self._last_session_repr is None
+            or self._delta_count >= self.COMPACT_EVERY
+            or session is not self._session
+            or session_dir != self._session_dir
+        )
+        if is_snapshot:
+            json_repr = self._snapshot(session, session_dir)
+        else:
+            json_repr = self._delta(session, session_dir)
+        json_repr["journal"] = self._journal_id
+        data = json.dumps(
+            json_repr,
+            ensure_ascii=False,
+            sort_keys=True,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("UTF-8")
+        return gzip.compress(data), is_snapshot
+
+    def _watch(self, session):
+        if self._session is session:
+            return
+        if self._session is not None:
+            self._session.on_job_result_changed.disconnect(
+                self._on_job_result_changed
+            )
+            self._session.on_job_added.disconnect(self._on_job_changed)
+            self._session.on_job_removed.disconnect(self._on_job_changed)
+        session.on_job_result_changed.connect(self._on_job_result_changed)
+        session.on_job_added.connect(self._on_job_changed)
+        session.on_job_removed.connect(self._on_job_changed)
+        self._session = session
+
+    def _on_job_result_changed(self, job, result):
+        self._changed_job_id_set.add(job.id)
+
+    def _on_job_changed(self, job):
+        self._changed_job_id_set.add(job.id)
+
+    def _snapshot(self, session, session_dir):
+        self._watch(session)
+        self._session_dir = session_dir
+        self._journal_id = uuid.uuid4().hex
+        self._delta_count = 0
+        self._changed_job_id_set.clear()
+        self._last_session_repr = self._repr_SessionState(session, session_dir)
+        self._last_job_lists = self._get_job_lists(session)
+        self._last_system_information = session.system_information
+        self._run_id_set = frozenset(job.id for job in session.run_list)
+        return {"version": self.VERSION, "session": self._last_session_repr}
+
+    def _delta(self, session, session_dir):
+        """
+        Compute a delta record and apply it to the last session representation.
+
+        :returns:
+            A dictionary with the following (optional) keys:
+
+            ``update``:
+                Mapping from a key of the session representation to a mapping
+                of the items that were added or modified.
+
+            ``remove``:
+                Mapping from a key of the session representation to a list of
+                keys of the items that were removed.
+
+            ``replace``:
+                Mapping from a key of the session representation to its new
+                value.
+        """
+        delta = {}
+        changed_job_id_set = self._changed_job_id_set
+        self._changed_job_id_set = set()
+        job_lists = self._get_job_lists(session)
+        if any(
+            job_list is not last_job_list
+            for job_list, last_job_list in zip(job_lists, self._last_job_lists)
+        ):
+            # The run list was recomputed, jobs without a result may have
+            # been added to or removed from it
+            self._last_job_lists = job_lists
+            self._run_id_set = frozenset(job.id for job in session.run_list)
+            self._replace(
+                delta,
+                "desired_job_list",
+                [job.id for job in session.desired_job_list],
+            )
+            self._replace(
+                delta,
+                "mandatory_job_list",
+                [job.id for job in session.mandatory_job_list],
+            )
+            for state in session.job_state_map.values():
+                self._set_item(
+                    delta, "jobs", state.job.id, self._repr_job_checksum(state)
+                )
+        for job_id in sorted(changed_job_id_set):
+            state = session.job_state_map.get(job_id)
+            if state is None:
+                checksum = result_list = _ABSENT
+            else:
+                checksum = self._repr_job_checksum(state)
+                result_list = [
+                    self._repr_JobResult(result, session_dir)
+                    for result in state.result_history
+                ] or _ABSENT
+            self._set_item(delta, "jobs", job_id, checksum)
+            self._set_item(delta, "results", job_id, result_list)
+        metadata_repr = self._repr_SessionMetaData(
+            session.metadata, session_dir
+        )
+        for key, value in metadata_repr.items():
+            self._set_item(delta, "metadata", key, value)
+        if session.system_information is not self._last_system_information:
+            self._last_system_information = session.system_information
+            system_information_repr = {
+                tool_name: tool_output.to_dict()
+                for (
+                    tool_name,
+                    tool_output,
+                ) in session.system_information.items()
+            }
+            for tool_name in list(
+                self._last_session_repr.get("system_information", {})
+            ):
+                if tool_name not in system_information_repr:
+                    self._set_item(
+                        delta, "system_information", tool_name, _ABSENT
+                    )
+            for tool_name, value in system_information_repr.items():
+                self._set_item(delta, "system_information", tool_name, value)
+        self._delta_count += 1
+        return delta
+
+    @staticmethod
+    def _get_job_lists(session):
+        return (
+            session.run_list,
+            session.desired_job_list,
+            session.mandatory_job_list,
+        )
+
+    def _repr_job_checksum(self, state):
+        # Same rules as SessionSuspendHelper6._repr_SessionState()
+        if not state.result.is_hollow or state.job.id in self._run_id_set:
+            return state.job.checksum
+        return _ABSENT
+
+    def _set_item(self, delta, key, item_key, value):
+        item_map = self._last_session_repr.setdefault(key, {})
+        if value is _ABSENT:
+            if item_key in item_map:
+                del item_map[item_key]
+                delta.setdefault("remove", {}).setdefault(key, []).append(
+                    item_key
+                )
+        elif item_map.get(item_key, _ABSENT) != value:
+            item_map[item_key] = value
+            delta.setdefault("update", {}).setdefault(key, {})[
+                item_key
+            ] = value
+
+    def _replace(self, delta, key, value):
+        if self._last_session_repr.get(key) != value:
+            self._last_session_repr[key] = value
+            delta.setdefault("replace", {})[key] = value
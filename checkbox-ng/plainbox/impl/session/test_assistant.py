@@ -19,14 +19,22 @@
 
 """Tests for the session assistant module class."""
 
+import functools
 from unittest import mock
 
+from plainbox.abc import IJobResult
+from plainbox.impl.config import Configuration
+from plainbox.impl.jobcache import ResourceJobCache
+from plainbox.impl.result import MemoryJobResult
 from plainbox.impl.secure.providers.v1 import Provider1
 from plainbox.impl.session.assistant import (
     SessionAssistant,
     UsageExpectation,
     SessionMetaData,
 )
+from plainbox.impl.session.jobs import JobState
+from plainbox.impl.session.state import SessionState
+from plainbox.impl.testing_utils import make_job
 from plainbox.vendor import morris
 
 
@@ -149,6 +157,35 @@ class SessionAssistantTests(morris.SignalTestCase):
         self.assertTrue(mock_storage_deleted.remove.called)
         self.assertFalse(mock_storage_not_deleted.remove.called)
 
+    def test_get_resource_cache(self, _):
+        self_mock = mock.MagicMock()
+        self_mock._config = Configuration.from_text(
+            "[execution]\n"
+            "resource_cache_invalidation_keys = boot_id, kernel\n"
+            "resource_cache_max_size = 2\n"
+            "resource_cache_max_age = 1\n",
+            "test",
+        )
+
+        cache = SessionAssistant._get_resource_cache(self_mock)
+
+        self.assertEqual(cache._invalidation_keys, ("boot_id", "kernel"))
+        self.assertEqual(cache._max_size, 2 * 1024 * 1024)
+        self.assertEqual(cache._max_age, 24 * 3600)
+
+    def test_get_resource_cache_unknown_key(self, _):
+        self_mock = mock.MagicMock()
+        self_mock._config = Configuration.from_text(
+            "[execution]\nresource_cache_invalidation_keys = bogus\n", "test"
+        )
+
+        cache = SessionAssistant._get_resource_cache(self_mock)
+
+        self.assertEqual(
+            cache._invalidation_keys,
+            tuple(sorted(ResourceJobCache.DEFAULT_INVALIDATION_KEYS)),
+        )
+
     def test_note_metadata_starting_job(self, _):
         self_mock = mock.MagicMock()
 
@@ -223,3 +260,196 @@ class SessionAssistantTests(morris.SignalTestCase):
         self.assertEqual(
             self_mock._context.state.update_desired_job_list.call_count, 1
         )
+
+    def test_run_bootstrap_jobs_serial(self, mock_get_providers):
+        self_mock = mock.MagicMock()
+        self_mock._config.get_value.return_value = 1
+        job = mock.MagicMock(id="job")
+        self_mock._context.state.job_state_map = {
+            "job": mock.MagicMock(result_history=())
+        }
+        SessionAssistant._run_bootstrap_jobs(self_mock, [job])
+        self_mock.run_job.assert_called_once_with("job", "silent", False)
+        self.assertEqual(self_mock.use_job_result.call_count, 1)
+        self.assertFalse(self_mock.run_bootstrap_jobs_in_parallel.called)
+
+    def test_run_bootstrap_jobs_parallel(self, mock_get_providers):
+        self_mock = mock.MagicMock()
+        self_mock._config.get_value.return_value = 4
+        job = mock.MagicMock(id="job")
+        done_job = mock.MagicMock(id="done_job")
+        self_mock._context.state.job_state_map = {
+            "job": mock.MagicMock(result_history=()),
+            "done_job": mock.MagicMock(result_history=(mock.MagicMock(),)),
+        }
+        SessionAssistant._run_bootstrap_jobs(self_mock, [job, done_job])
+        self_mock.run_bootstrap_jobs_in_parallel.assert_called_once_with(
+            ["job"], 4
+        )
+        self.assertFalse(self_mock.run_job.called)
+
+    def test_run_bootstrap_jobs_in_parallel(self, mock_get_providers):
+        # R1 and R2 are independent, R3 depends on R1 and R4 depends on R2
+        # that fails so it cannot start and is handled by run_job()
+        job_list = [
+            make_job("R1", plugin="resource"),
+            make_job("R2", plugin="resource"),
+            make_job("R3", plugin="resource", depends="R1"),
+            make_job("R4", plugin="resource", depends="R2"),
+        ]
+        state = SessionState(job_list)
+        state.update_desired_job_list(job_list)
+        outcome_map = {
+            "R1": IJobResult.OUTCOME_PASS,
+            "R2": IJobResult.OUTCOME_FAIL,
+            "R3": IJobResult.OUTCOME_PASS,
+        }
+        started_list = []
+
+        def run_job(job, job_state, environ, ui, concurrent):
+            self.assertTrue(concurrent)
+            started_list.append(job.id)
+            return MemoryJobResult({"outcome": outcome_map[job.id]})
+
+        used_list = []
+
+        def use_job_result(job_id, result):
+            used_list.append(job_id)
+            state.update_job_result(state.job_state_map[job_id].job, result)
+
+        self_mock = mock.MagicMock()
+        self_mock._context.state = state
+        self_mock._runner.run_job.side_effect = run_job
+        self_mock.use_job_result.side_effect = use_job_result
+        self_mock.run_job.return_value.get_result.return_value = (
+            MemoryJobResult({"outcome": IJobResult.OUTCOME_NOT_SUPPORTED})
+        )
+        self_mock._run_jobs_concurrently = functools.partial(
+            SessionAssistant._run_jobs_concurrently, self_mock
+        )
+
+        SessionAssistant.run_bootstrap_jobs_in_parallel(
+            self_mock, ["R1", "R2", "R3", "R4"], 2
+        )
+
+        self.assertEqual(sorted(started_list), ["R1", "R2", "R3"])
+        self.assertEqual(started_list[-1], "R3")
+        self.assertEqual(used_list, ["R1", "R2", "R3", "R4"])
+        self.assertEqual(self_mock.run_job.call_args[0][0], "R4")
+        self.assertEqual(
+            state.job_state_map["R4"].result.outcome,
+            IJobResult.OUTCOME_NOT_SUPPORTED,
+        )
+
+    def test_run_jobs_in_parallel(self, mock_get_providers):
+        # P1 and P2 are run concurrently, P3 has to wait for P1, S is not
+        # parallel-safe so P4 cannot be started before S is done
+        job_list = [
+            make_job("P1", plugin="shell", flags="parallel-safe"),
+            make_job("P2", plugin="shell", flags="parallel-safe"),
+            make_job(
+                "P3", plugin="shell", flags="parallel-safe", depends="P1"
+            ),
+            make_job("S", plugin="shell"),
+            make_job("P4", plugin="shell", flags="parallel-safe"),
+        ]
+        state = SessionState(job_list)
+        state.update_desired_job_list(job_list)
+        started_list = []
+
+        def run_job(job, job_state, environ, ui, concurrent):
+            self.assertTrue(concurrent)
+            started_list.append(job.id)
+            return MemoryJobResult({"outcome": IJobResult.OUTCOME_PASS})
+
+        def self_run_job(job_id, ui, native):
+            started_list.append(job_id)
+            builder = mock.MagicMock()
+            builder.get_result.return_value = MemoryJobResult(
+                {"outcome": IJobResult.OUTCOME_PASS}
+            )
+            return builder
+
+        used_list = []
+
+        def use_job_result(job_id, result):
+            used_list.append(job_id)
+            state.update_job_result(state.job_state_map[job_id].job, result)
+
+        self_mock = mock.MagicMock()
+        self_mock._context.state = state
+        self_mock._runner.run_job.side_effect = run_job
+        self_mock.run_job.side_effect = self_run_job
+        self_mock.use_job_result.side_effect = use_job_result
+        self_mock._run_jobs_concurrently = functools.partial(
+            SessionAssistant._run_jobs_concurrently, self_mock
+        )
+        ui = mock.MagicMock()
+
+        SessionAssistant.run_jobs_in_parallel(
+            self_mock, ["P1", "P2", "P3", "S", "P4"], 4, ui
+        )
+
+        self.assertEqual(sorted(started_list[:2]), ["P1", "P2"])
+        self.assertEqual(started_list[2:], ["P3", "S", "P4"])
+        self.assertEqual(used_list, ["P1", "P2", "P3", "S", "P4"])
+        self_mock.run_job.assert_called_once_with("S", ui, False)
+        self.assertEqual(ui.finished.call_count, 4)
+
+    def test_run_jobs_concurrently_rechecks_dependents(
+        self, mock_get_providers
+    ):
+        # Only the jobs depending on A are checked again after its result is
+        # used, the other ones are checked once
+        job_list = [
+            make_job("A", plugin="shell"),
+            make_job("B", plugin="shell", depends="A"),
+            make_job("C", plugin="shell"),
+            make_job("D", plugin="shell", depends="B"),
+        ]
+        state = SessionState(job_list)
+        state.update_desired_job_list(job_list)
+        checked_list = []
+        original_can_start = JobState.can_start
+
+        def can_start(job_state):
+            checked_list.append(job_state.job.id)
+            return original_can_start(job_state)
+
+        def run_job(job, job_state, environ, ui, concurrent):
+            return MemoryJobResult({"outcome": IJobResult.OUTCOME_PASS})
+
+        self_mock = mock.MagicMock()
+        self_mock._context.state = state
+        self_mock._runner.run_job.side_effect = run_job
+
+        with mock.patch.object(JobState, "can_start", can_start):
+            for job, result in SessionAssistant._run_jobs_concurrently(
+                self_mock, job_list, 2, lambda job: True
+            ):
+                state.update_job_result(job, result)
+
+        self.assertEqual(checked_list, ["A", "B", "C", "D", "B", "D"])
+
+    def test_run_jobs_concurrently_interrupted(self, mock_get_providers):
+        job_list = [
+            make_job("P1", plugin="shell", flags="parallel-safe"),
+            make_job("P2", plugin="shell", flags="parallel-safe"),
+        ]
+        state = SessionState(job_list)
+        state.update_desired_job_list(job_list)
+
+        def run_job(job, job_state, environ, ui, concurrent):
+            raise KeyboardInterrupt
+
+        self_mock = mock.MagicMock()
+        self_mock._context.state = state
+        self_mock._runner.run_job.side_effect = run_job
+
+        with self.assertRaises(KeyboardInterrupt):
+            list(
+                SessionAssistant._run_jobs_concurrently(
+                    self_mock, job_list, 1, lambda job: True
+                )
+            )
+        self_mock._runner.kill_running_jobs.assert_called_once_with()
@@ -0,0 +1,126 @@
+# This file is part of Checkbox.
+#
+# Copyright 2024 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+plainbox.impl.session.test_graph
+================================
+
+Test definitions for plainbox.impl.session.graph module
+"""
+
+import json
+from unittest import TestCase
+
+from plainbox.impl.session.graph import JobGraph
+from plainbox.impl.session.graph import is_job_impacting_suspend
+from plainbox.impl.testing_utils import make_job
+from plainbox.suspend_consts import Suspend
+
+
+class JobGraphTests(TestCase):
+    def setUp(self):
+        self.job_a = make_job("a", depends="b", after="c")
+        self.job_b = make_job("b", requires="r.attr == 'value'")
+        self.job_c = make_job("c", salvages="b")
+        self.graph = JobGraph([self.job_a, self.job_b, self.job_c])
+
+    def test_contains(self):
+        self.assertIn("a", self.graph)
+        self.assertNotIn("r", self.graph)
+        self.assertEqual(len(self.graph), 3)
+
+    def test_get_dependencies(self):
+        self.assertEqual(self.graph.get_dependencies("a"), {"b", "c"})
+        self.assertEqual(
+            self.graph.get_dependencies("a", JobGraph.DEP_TYPE_DIRECT), {"b"}
+        )
+        self.assertEqual(
+            self.graph.get_dependencies("a", JobGraph.DEP_TYPE_ORDERING),
+            {"c"},
+        )
+        self.assertEqual(
+            self.graph.get_dependencies("b", JobGraph.DEP_TYPE_RESOURCE),
+            {"r"},
+        )
+        self.assertEqual(
+            self.graph.get_dependencies("c", JobGraph.DEP_TYPE_SALVAGE),
+            {"b"},
+        )
+        self.assertEqual(self.graph.get_dependencies("unknown"), set())
+
+    def test_get_dependents(self):
+        self.assertEqual(self.graph.get_dependents("b"), {"a", "c"})
+        self.assertEqual(
+            self.graph.get_dependents("b", JobGraph.DEP_TYPE_SALVAGE), {"c"}
+        )
+        # Jobs that are not in the graph can still be depended on
+        self.assertEqual(self.graph.get_dependents("r"), {"b"})
+
+    def test_remove_job(self):
+        self.graph.remove_job(self.job_a)
+        self.assertNotIn("a", self.graph)
+        self.assertEqual(self.graph.get_dependents("b"), {"c"})
+        self.assertEqual(self.graph.get_dependents("c"), set())
+        self.graph.remove_job(self.job_b)
+        self.assertEqual(self.graph.get_dependents("r"), set())
+        # Edges of the remaining jobs are kept
+        self.assertEqual(self.graph.get_dependencies("c"), {"b"})
+
+    def test_add_job__replaces(self):
+        self.graph.add_job(make_job("a", depends="c"))
+        self.assertEqual(self.graph.get_dependencies("a"), {"c"})
+        self.assertEqual(self.graph.get_dependents("b"), {"c"})
+
+    def test_bad_resource_program(self):
+        graph = JobGraph([make_job("a", requires="r.attr ==")])
+        self.assertEqual(graph.get_dependencies("a"), set())
+
+    def test_suspend_edges(self):
+        job_flag = make_job("flag", flags=Suspend.AUTO_FLAG)
+        job_sibling = make_job(
+            "sibling",
+            siblings=json.dumps(
+                [{"id": "sibling-after", "depends": Suspend.MANUAL_JOB_ID}]
+            ),
+        )
+        graph = JobGraph([job_flag, job_sibling])
+        self.assertEqual(
+            graph.get_dependencies(
+                Suspend.AUTO_JOB_ID, JobGraph.DEP_TYPE_SUSPEND
+            ),
+            {"flag"},
+        )
+        self.assertEqual(
+            graph.get_dependencies(Suspend.MANUAL_JOB_ID), {"sibling"}
+        )
+        graph.remove_job(job_flag)
+        self.assertEqual(graph.get_dependencies(Suspend.AUTO_JOB_ID), set())
+
+
+class IsJobImpactingSuspendTests(TestCase):
+    def test_flag(self):
+        job = make_job("job", flags="also-after-suspend")
+        self.assertTrue(is_job_impacting_suspend(Suspend.AUTO_JOB_ID, job))
+        self.assertFalse(is_job_impacting_suspend(Suspend.MANUAL_JOB_ID, job))
+
+    def test_siblings(self):
+        job = make_job(
+            "job",
+            siblings=json.dumps(
+                [{"id": "sibling-j1", "depends": Suspend.MANUAL_JOB_ID}]
+            ),
+        )
+        self.assertFalse(is_job_impacting_suspend(Suspend.AUTO_JOB_ID, job))
+        self.assertTrue(is_job_impacting_suspend(Suspend.MANUAL_JOB_ID, job))
@@ -30,6 +30,7 @@ from plainbox.impl.session import SessionManager
 from plainbox.impl.session import SessionState
 from plainbox.impl.session import SessionStorage
 from plainbox.impl.session.state import SessionDeviceContext
+from plainbox.impl.session.suspend import SessionJournalHelper
 from plainbox.impl.session.suspend import SessionSuspendHelper
 from plainbox.impl.unit.job import JobDefinition
 from plainbox.vendor import mock
@@ -102,6 +103,61 @@ class SessionManagerTests(SignalTestCase):
         self.storage.save_checkpoint.assert_called_with(
             helper_cls().suspend(self.context.state)
         )
+        # Ensure that the meta-data was saved next to the checkpoint
+        helper_cls().suspend_metadata.assert_called_with(
+            self.context.state, self.storage.location
+        )
+        self.storage.save_metadata.assert_called_with(
+            helper_cls().suspend_metadata()
+        )
+
+    def test_checkpoint_metadata_failure(self):
+        """
+        verify that SessionManager.checkpoint() doesn't fail when the session
+        meta-data cannot be saved
+        """
+        helper_name = "plainbox.impl.session.manager.SessionSuspendHelper"
+        self.storage.save_metadata.side_effect = OSError("disk full")
+        with mock.patch(helper_name, spec=SessionSuspendHelper):
+            self.manager.checkpoint()
+        self.storage.save_checkpoint.assert_called_once_with(mock.ANY)
+
+    @mock.patch("plainbox.impl.session.manager.SessionSuspendHelper")
+    def test_checkpoint_journal(self, helper_cls):
+        """
+        verify that SessionManager.checkpoint() appends to the journal when
+        the journal helper returns a delta record
+        """
+        self.manager.journal = mock.Mock(spec=SessionJournalHelper)
+        self.manager.journal.checkpoint.return_value = (b"delta", False)
+        self.manager.checkpoint()
+        self.manager.journal.checkpoint.assert_called_with(
+            self.context.state, self.storage.location
+        )
+        self.storage.append_journal.assert_called_with(b"delta")
+        self.storage.save_checkpoint.assert_not_called()
+        self.storage.save_metadata.assert_called_with(
+            helper_cls().suspend_metadata()
+        )
+        self.manager.journal.checkpoint.return_value = (b"snapshot", True)
+        self.manager.checkpoint()
+        self.storage.save_checkpoint.assert_called_with(b"snapshot")
+
+    @mock.patch("plainbox.impl.session.manager.SessionSuspendHelper")
+    def test_checkpoint_journal_failure(self, helper_cls):
+        """
+        verify that SessionManager.checkpoint() saves a snapshot when the
+        journal cannot be written
+        """
+        self.manager.journal = mock.Mock(spec=SessionJournalHelper)
+        self.manager.journal.checkpoint.side_effect = [
+            (b"delta", False),
+            (b"snapshot", True),
+        ]
+        self.storage.append_journal.side_effect = OSError("disk full")
+        self.manager.checkpoint()
+        self.manager.journal.reset.assert_called_with()
+        self.storage.save_checkpoint.assert_called_with(b"snapshot")
 
     def test_load_session(self):
         """
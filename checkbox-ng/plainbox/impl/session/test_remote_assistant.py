@@ -17,7 +17,10 @@
 # You should have received a copy of the GNU General Public License
 # along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
 
+import json
+from functools import partial
 from os.path import exists
+from threading import Condition, Event, Timer
 
 from unittest import TestCase, mock
 
@@ -477,6 +480,157 @@ class RemoteAssistantFinishJobTests(TestCase):
         )
 
 
+class RemoteAssistantJobRecordsTests(TestCase):
+    def setUp(self):
+        self.rsa = mock.MagicMock()
+        self.rsa.JOB_RECORDS_VERSION = 1
+        self.rsa.JOB_RECORD_FIELDS = (
+            remote_assistant.RemoteSessionAssistant.JOB_RECORD_FIELDS
+        )
+        self.rsa._get_job_info.side_effect = self._get_job_info
+
+    def _get_job_info(self, job_id, job_no, fields):
+        info = {field: "{}-{}".format(field, job_id) for field in fields}
+        if "num" in fields:
+            info["num"] = job_no
+        return info
+
+    def test_get_jobs_records__page(self):
+        records = json.loads(
+            remote_assistant.RemoteSessionAssistant.get_jobs_records(
+                self.rsa, ["a", "b", "c"], 10, ["id", "num"], 1, 1
+            )
+        )
+        self.assertEqual(
+            records,
+            {
+                "version": 1,
+                "fields": ["id", "num"],
+                "records": [["id-b", 12]],
+                "total": 3,
+            },
+        )
+
+    def test_get_jobs_records__all_fields(self):
+        records = json.loads(
+            remote_assistant.RemoteSessionAssistant.get_jobs_records(
+                self.rsa, ["a", "b"]
+            )
+        )
+        self.assertEqual(records["fields"], list(self.rsa.JOB_RECORD_FIELDS))
+        self.assertEqual(len(records["records"]), 2)
+        self.assertEqual(
+            records["records"][1][records["fields"].index("num")], 2
+        )
+
+    def test_get_jobs_records__unknown_field(self):
+        with self.assertRaises(ValueError):
+            remote_assistant.RemoteSessionAssistant.get_jobs_records(
+                self.rsa, ["a"], 0, ["id", "bogus"]
+            )
+
+    def test_get_job_info__only_requested_fields(self):
+        rsa = mock.MagicMock()
+        rsa.JOB_RECORD_FIELDS = (
+            remote_assistant.RemoteSessionAssistant.JOB_RECORD_FIELDS
+        )
+        job = rsa._sa.get_job.return_value
+        job.id = "a"
+        job.estimated_duration = None
+        info = remote_assistant.RemoteSessionAssistant._get_job_info(
+            rsa, "a", 3, ("id", "num", "duration")
+        )
+        self.assertEqual(
+            info,
+            {
+                "id": "a",
+                "num": 3,
+                "duration": "No estimated duration provided for this job",
+            },
+        )
+        job.tr_summary.assert_not_called()
+        job.tr_description.assert_not_called()
+        rsa._sa.get_category.assert_not_called()
+        info = remote_assistant.RemoteSessionAssistant._get_job_info(
+            rsa, "a", 3
+        )
+        self.assertEqual(list(info), list(rsa.JOB_RECORD_FIELDS))
+
+
+class RemoteAssistantJobOutputTests(TestCase):
+    def setUp(self):
+        self.condition = Condition()
+        self.ui = remote_assistant.BufferedUI(self.condition)
+        self.rsa = mock.MagicMock()
+        self.rsa._state = remote_assistant.Running
+        self.rsa._job_condition = self.condition
+        self.rsa.job_condition = self.condition
+        self.rsa._ui = self.ui
+        self.rsa._has_job_changed = partial(
+            remote_assistant.RemoteSessionAssistant._has_job_changed, self.rsa
+        )
+        self.rsa.monitor_job = partial(
+            remote_assistant.RemoteSessionAssistant.monitor_job, self.rsa
+        )
+        self.job_done = Event()
+
+    def _run_job(self, job_id, ui, _):
+        ui.got_program_output("stdout", b"output\n")
+        self.job_done.wait()
+        return mock.sentinel.builder
+
+    def test_wait_for_job_output__output(self):
+        self.rsa._be = remote_assistant.BackgroundExecutor(
+            self.rsa, "job", self._run_job, self.ui
+        )
+        try:
+            state, payload = (
+                remote_assistant.RemoteSessionAssistant.wait_for_job_output(
+                    self.rsa, 30
+                )
+            )
+        finally:
+            self.job_done.set()
+        self.assertEqual(state, "running")
+        self.assertEqual(payload, "stdoutoutput\n")
+        self.assertIs(self.rsa._be.wait(), mock.sentinel.builder)
+
+    def test_wait_for_job_output__finished(self):
+        self.rsa._be = remote_assistant.BackgroundExecutor(
+            self.rsa, "job", self._run_job, remote_assistant.RemoteSilentUI()
+        )
+        Timer(0.1, self.job_done.set).start()
+        state, _ = remote_assistant.RemoteSessionAssistant.wait_for_job_output(
+            self.rsa, 30
+        )
+        self.assertEqual(state, "done")
+        self.assertTrue(self.rsa._be.finished)
+
+    def test_wait_for_job_output__timeout(self):
+        self.rsa._be = mock.Mock(finished=False)
+        state, payload = (
+            remote_assistant.RemoteSessionAssistant.wait_for_job_output(
+                self.rsa, 0.01
+            )
+        )
+        self.assertEqual(state, "running")
+        self.assertEqual(payload, "")
+
+    def test_buffered_ui_drops_output_past_limit(self):
+        with mock.patch.object(
+            remote_assistant.BufferedUI, "MAX_OUTPUT_SIZE", 10
+        ):
+            self.ui.got_program_output("stdout", b"0123456789\n")
+            self.ui.got_program_output("stdout", b"lost\n")
+            self.ui.got_program_output("stdout", b"lost too\n")
+            self.assertEqual(
+                self.ui.get_output(),
+                "stdout0123456789\nhidden(Dropping test output)\n",
+            )
+            self.ui.got_program_output("stdout", b"kept\n")
+            self.assertEqual(self.ui.get_output(), "stdoutkept\n")
+
+
 class SessionAssistantAgentTests(TestCase):
     def test_on_connect(self):
         conn = mock.Mock()
@@ -62,6 +62,8 @@ from plainbox.impl.session.resume import SessionResumeHelper6
 from plainbox.impl.session.resume import SessionResumeHelper7
 from plainbox.impl.session.resume import SessionResumeHelper8
 from plainbox.impl.session.state import SessionState
+from plainbox.impl.session.storage import SessionStorage
+from plainbox.impl.session.suspend import SessionSuspendHelper
 from plainbox.impl.testing_utils import make_job
 from plainbox.testing_utils.testcases import TestCaseWithParameters
 from plainbox.vendor import mock
@@ -602,6 +604,44 @@ class SessionPeekHelperTests(TestCase):
             SessionPeekHelper().peek(data)
         self.assertEqual(str(boom.exception), "Unsupported version 9")
 
+    def _make_storage(self, metadata=None, checkpoint=b""):
+        storage = mock.Mock(spec=SessionStorage, id="session")
+        storage.load_metadata.return_value = metadata
+        storage.load_checkpoint.return_value = checkpoint
+        return storage
+
+    def test_peek_storage_metadata(self):
+        session = SessionState([])
+        session.metadata.title = "title"
+        session.metadata.flags = {"incomplete"}
+        session.metadata.app_id = "app-id"
+        session.metadata.last_job_start_time = 0.0
+        storage = self._make_storage(
+            SessionSuspendHelper().suspend_metadata(session)
+        )
+        metadata = SessionPeekHelper().peek_storage(storage)
+        self.assertEqual(metadata.title, "title")
+        self.assertEqual(metadata.flags, {"incomplete"})
+        self.assertEqual(metadata.app_id, "app-id")
+        storage.load_checkpoint.assert_not_called()
+
+    def test_peek_storage_checkpoint(self):
+        session = SessionState([])
+        session.metadata.title = "title"
+        session.metadata.last_job_start_time = 0.0
+        for metadata in (None, b"garbage"):
+            storage = self._make_storage(
+                metadata, SessionSuspendHelper().suspend(session)
+            )
+            self.assertEqual(
+                SessionPeekHelper().peek_storage(storage).title, "title"
+            )
+            storage.load_checkpoint.assert_called_once_with()
+
+    def test_peek_storage_not_saved(self):
+        storage = self._make_storage()
+        self.assertIsNone(SessionPeekHelper().peek_storage(storage))
+
 
 class SessionResumeTests(TestCase):
     """
@@ -47,6 +47,7 @@ from plainbox.impl.session.state import SessionMetaData
 from plainbox.impl.testing_utils import make_job
 from plainbox.impl.unit.job import JobDefinition
 from plainbox.impl.unit.category import CategoryUnit
+from plainbox.impl.unit.template import TemplateUnit
 from plainbox.impl.unit.unit_with_id import UnitWithId
 from plainbox.suspend_consts import Suspend
 from plainbox.vendor.morris import SignalTestCase
@@ -211,6 +212,30 @@ class SessionStateAPITests(TestCase):
         # appended in any way.
         self.assertEqual(session._resource_map, {"R": [new_res]})
 
+    def test_get_template_list(self):
+        template_a = TemplateUnit(
+            {"template-resource": "R", "id": "a-{attr}", "plugin": "shell"}
+        )
+        template_b = TemplateUnit(
+            {"template-resource": "R", "id": "b-{attr}", "plugin": "shell"}
+        )
+        session = SessionState([template_a])
+        session.add_unit(template_b)
+        self.assertEqual(
+            session.get_template_list("R"), [template_a, template_b]
+        )
+        self.assertEqual(session.get_template_list("other"), [])
+        session.remove_unit(template_a)
+        self.assertEqual(session.get_template_list("R"), [template_b])
+
+    def test_add_units(self):
+        job_a = make_job("A")
+        job_b = make_job("B", depends="A")
+        session = SessionState([])
+        self.assertEqual(session.add_units([job_a, job_b]), [job_a, job_b])
+        self.assertEqual(session.job_list, [job_a, job_b])
+        self.assertIn("B", session.job_state_map)
+
     def test_add_unit(self):
         # Define a job
         job = make_job("A")
@@ -524,6 +549,15 @@ class SessionStateTrimTests(TestCase):
         self.session.trim_job_list(JobIdQualifier("a", self.origin))
         self.assertNotIn("a", self.session.job_state_map)
 
+    def test_trim_does_remove_jobs_from_graph(self):
+        """
+        verify that trim_job_list() removes jobs from the job graph
+        """
+        self.assertIn("a", self.session.job_graph)
+        self.session.trim_job_list(JobIdQualifier("a", self.origin))
+        self.assertNotIn("a", self.session.job_graph)
+        self.assertIn("b", self.session.job_graph)
+
     def test_trim_does_remove_resources(self):
         """
         verify that trim_job_list() removes resources for removed jobs
@@ -943,6 +977,172 @@ class SessionStateReactionToJobResultTests(TestCase):
         )
 
 
+class SessionStateIncrementalReadinessTests(TestCase):
+    # This test checks that presenting a result to the session only
+    # re-evaluates the readiness of the jobs that depend on the job that
+    # produced the result, instead of every job on the run list.
+
+    def setUp(self):
+        # Job A depends on a resource provided by job R, job X depends on job
+        # Y, job Z runs after job Y and job S salvages job Y. There are also
+        # many unrelated jobs that should never be re-evaluated when the
+        # results of Y or R are presented to the session.
+        self.job_A = make_job("A", requires="R.attr == 'value'")
+        self.job_R = make_job("R", plugin="resource")
+        self.job_X = make_job("X", depends="Y")
+        self.job_Y = make_job("Y")
+        self.job_Z = make_job("Z", after="Y")
+        self.job_S = make_job("S", salvages="Y")
+        self.unrelated_job_list = [
+            make_job("unrelated-{}".format(index)) for index in range(100)
+        ]
+        self.job_list = [
+            self.job_A,
+            self.job_R,
+            self.job_X,
+            self.job_Y,
+            self.job_Z,
+            self.job_S,
+        ] + self.unrelated_job_list
+        self.session = SessionState(self.job_list)
+        self.session.update_desired_job_list(self.job_list)
+
+    def test_full_recompute_evaluates_run_list(self):
+        count = self.session.readiness_evaluation_count
+        self.session._recompute_job_readiness()
+        self.assertEqual(
+            self.session.readiness_evaluation_count - count,
+            len(self.session.run_list),
+        )
+
+    def test_result_evaluates_only_dependent_jobs(self):
+        count = self.session.readiness_evaluation_count
+        result_Y = MemoryJobResult({"outcome": IJobResult.OUTCOME_FAIL})
+        self.session.update_job_result(self.job_Y, result_Y)
+        # X, Z and S refer to Y, nothing else does
+        self.assertEqual(self.session.readiness_evaluation_count - count, 3)
+        self.assertEqual(
+            self.session.job_state_map["X"].readiness_inhibitor_list[0].cause,
+            InhibitionCause.FAILED_DEP,
+        )
+        self.assertTrue(self.session.job_state_map["Z"].can_start())
+        self.assertTrue(self.session.job_state_map["S"].can_start())
+
+    def test_dependent_jobs_evaluated_in_run_list_order(self):
+        result_Y = MemoryJobResult({"outcome": IJobResult.OUTCOME_PASS})
+        with patch.object(
+            self.session,
+            "_evaluate_job_readiness",
+            wraps=self.session._evaluate_job_readiness,
+        ) as evaluate_mock:
+            self.session.update_job_result(self.job_Y, result_Y)
+        evaluated_id_list = [c[0][0].id for c in evaluate_mock.call_args_list]
+        self.assertEqual(
+            evaluated_id_list,
+            [
+                job.id
+                for job in self.session.run_list
+                if job.id in ("X", "Z", "S")
+            ],
+        )
+
+    def test_resource_result_evaluates_only_dependent_jobs(self):
+        count = self.session.readiness_evaluation_count
+        result_R = MemoryJobResult(
+            {
+                "outcome": IJobResult.OUTCOME_PASS,
+                "io_log": [(0, "stdout", b"attr: value\n")],
+            }
+        )
+        self.session.update_job_result(self.job_R, result_R)
+        self.assertEqual(self.session.readiness_evaluation_count - count, 1)
+        self.assertTrue(self.session.job_state_map["A"].can_start())
+
+    def test_result_list_evaluates_dependent_jobs_once(self):
+        count = self.session.readiness_evaluation_count
+        result_Y = MemoryJobResult({"outcome": IJobResult.OUTCOME_PASS})
+        result_R = MemoryJobResult(
+            {
+                "outcome": IJobResult.OUTCOME_PASS,
+                "io_log": [(0, "stdout", b"attr: value\n")],
+            }
+        )
+        self.session.update_job_result_list(
+            [
+                (self.job_Y, result_Y),
+                (self.job_R, result_R),
+                (self.unrelated_job_list[0], result_Y),
+            ]
+        )
+        # X, Z, S and A are each evaluated once
+        self.assertEqual(self.session.readiness_evaluation_count - count, 4)
+        self.assertIs(self.session.job_state_map["Y"].result, result_Y)
+        self.assertEqual(
+            self.session.resource_map["R"], [Resource({"attr": "value"})]
+        )
+        for job_id in ("A", "X", "Z"):
+            self.assertTrue(self.session.job_state_map[job_id].can_start())
+
+    def test_unreferenced_result_evaluates_nothing(self):
+        count = self.session.readiness_evaluation_count
+        result = MemoryJobResult({"outcome": IJobResult.OUTCOME_PASS})
+        self.session.update_job_result(self.unrelated_job_list[0], result)
+        self.assertEqual(self.session.readiness_evaluation_count, count)
+
+    def test_incremental_matches_full_recompute(self):
+        result_Y = MemoryJobResult({"outcome": IJobResult.OUTCOME_PASS})
+        self.session.update_job_result(self.job_Y, result_Y)
+        incremental = {
+            job_id: list(state.readiness_inhibitor_list)
+            for job_id, state in self.session.job_state_map.items()
+        }
+        self.session._recompute_job_readiness()
+        full = {
+            job_id: list(state.readiness_inhibitor_list)
+            for job_id, state in self.session.job_state_map.items()
+        }
+        self.assertEqual(incremental, full)
+
+    def test_job_graph_follows_added_and_removed_jobs(self):
+        job_W = make_job("W", depends="Y")
+        self.session.add_unit(job_W)
+        self.assertEqual(
+            self.session.job_graph.get_dependents("Y"), {"X", "Z", "S", "W"}
+        )
+        self.session.remove_unit(job_W)
+        self.assertEqual(
+            self.session.job_graph.get_dependents("Y"), {"X", "Z", "S"}
+        )
+
+    def test_add_units_evaluates_dependents_once(self):
+        job_suspend = make_job(Suspend.AUTO_JOB_ID)
+        session = SessionState([job_suspend])
+        session.update_desired_job_list([job_suspend])
+        count = session.readiness_evaluation_count
+        session.add_units(
+            [
+                make_job("F{}".format(index), flags=Suspend.AUTO_FLAG)
+                for index in range(3)
+            ]
+        )
+        # The suspend job refers to all of the new jobs
+        self.assertEqual(session.readiness_evaluation_count - count, 1)
+
+    def test_suspend_job_tracks_flagged_jobs(self):
+        job_F = make_job("F", flags=Suspend.AUTO_FLAG)
+        job_suspend = make_job(Suspend.AUTO_JOB_ID)
+        session = SessionState([job_F, job_suspend])
+        session.update_desired_job_list([job_suspend, job_F])
+        suspend_state = session.job_state_map[job_suspend.id]
+        self.assertEqual(
+            suspend_state.readiness_inhibitor_list[0].cause,
+            InhibitionCause.PENDING_DEP,
+        )
+        result_F = MemoryJobResult({"outcome": IJobResult.OUTCOME_PASS})
+        session.update_job_result(job_F, result_F)
+        self.assertTrue(suspend_state.can_start())
+
+
 class SessionMetadataTests(TestCase):
     def test_smoke(self):
         metadata = SessionMetaData()
@@ -1014,8 +1214,14 @@ class SessionDeviceContextTests(SignalTestCase):
         self.unit.provider = self.provider
         self.provider.unit_list = [self.unit]
         self.provider.problem_list = []
-        self.job = Mock(name="job", spec_set=JobDefinition, siblings=None)
+        self.job = Mock(
+            name="job", spec_set=JobDefinition, siblings=None, flags=None
+        )
         self.job.get_flag_set = Mock(return_value=())
+        self.job.get_direct_dependencies = Mock(return_value=set())
+        self.job.get_after_dependencies = Mock(return_value=set())
+        self.job.get_resource_dependencies = Mock(return_value=set())
+        self.job.get_salvage_dependencies = Mock(return_value=set())
         self.job.Meta.name = "job"
 
     def test_smoke(self):
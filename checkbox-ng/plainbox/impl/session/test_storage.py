@@ -71,3 +71,29 @@ class SessionStorageTests(TestCase):
         self.assertEqual(data_out, data_in)
         # Remove the storage now
         storage.remove()
+
+    def test_journal(self):
+        storage = SessionStorage.create("test_storage-")
+        storage.save_checkpoint(b"snapshot")
+        storage.append_journal(b"-one")
+        storage.append_journal(b"-two")
+        self.assertEqual(storage.load_checkpoint(), b"snapshot-one-two")
+        # Saving a checkpoint compacts (removes) the journal
+        storage.save_checkpoint(b"new snapshot")
+        self.assertEqual(storage.load_checkpoint(), b"new snapshot")
+        storage.remove()
+
+    def test_metadata(self):
+        storage = SessionStorage.create("test_storage-")
+        self.assertIsNone(storage.load_metadata())
+        storage.save_checkpoint(b"snapshot")
+        storage.save_metadata(b"metadata")
+        self.assertEqual(storage.load_metadata(), b"metadata")
+        # The meta-data is out of date once the checkpoint data changes
+        storage.append_journal(b"-one")
+        self.assertIsNone(storage.load_metadata())
+        storage.save_metadata(b"metadata-one")
+        self.assertEqual(storage.load_metadata(), b"metadata-one")
+        storage.save_checkpoint(b"new snapshot")
+        self.assertIsNone(storage.load_metadata())
+        storage.remove()
@@ -27,6 +27,7 @@ Test definitions for :mod:`plainbox.impl.session.suspend` module
 from functools import partial
 from unittest import TestCase
 import gzip
+import json
 
 from plainbox.abc import IJobResult
 from plainbox.impl.job import JobDefinition
@@ -34,7 +35,10 @@ from plainbox.impl.result import DiskJobResult
 from plainbox.impl.result import IOLogRecord
 from plainbox.impl.result import MemoryJobResult
 from plainbox.impl.session.state import SessionMetaData
+from plainbox.impl.session.resume import SessionResumeHelper
 from plainbox.impl.session.state import SessionState
+from plainbox.impl.session.suspend import SessionJournalHelper
+from plainbox.impl.session.suspend import SessionSuspendHelper
 from plainbox.impl.session.suspend import SessionSuspendHelper1
 from plainbox.impl.session.suspend import SessionSuspendHelper2
 from plainbox.impl.session.suspend import SessionSuspendHelper3
@@ -930,6 +934,137 @@ class SessionSuspendHelper6Tests(SessionSuspendHelper5Tests):
         )
 
 
+class SessionJournalHelperTests(TestCase):
+    def setUp(self):
+        self.job_a = make_job(id="a")
+        self.job_b = make_job(id="b")
+        self.job_list = [self.job_a, self.job_b]
+        self.state = SessionState(self.job_list)
+        self.state.update_desired_job_list(self.job_list)
+        self.state.metadata.last_job_start_time = 0.0
+        self.helper = SessionJournalHelper()
+
+    def _resume(self, data):
+        return SessionResumeHelper(self.job_list, None, None).resume(data)
+
+    def test_snapshot_then_delta(self):
+        snapshot, is_snapshot = self.helper.checkpoint(self.state)
+        self.assertTrue(is_snapshot)
+        self.state.metadata.running_job_name = "a"
+        self.state.update_job_result(
+            self.job_a, MemoryJobResult({"outcome": IJobResult.OUTCOME_PASS})
+        )
+        delta, is_snapshot = self.helper.checkpoint(self.state)
+        self.assertFalse(is_snapshot)
+        record = json.loads(gzip.decompress(delta).decode("UTF-8"))
+        self.assertEqual(list(record["update"]["results"]), ["a"])
+        self.assertNotIn("jobs", record.get("update", {}))
+        self.assertEqual(
+            record["update"]["metadata"], {"running_job_name": "a"}
+        )
+        state = self._resume(snapshot + delta)
+        self.assertEqual(
+            state.job_state_map["a"].result.outcome, IJobResult.OUTCOME_PASS
+        )
+        self.assertEqual(state.metadata.running_job_name, "a")
+        # Without the journal the session is as it was in the snapshot
+        state = self._resume(snapshot)
+        self.assertIsNone(state.job_state_map["a"].result.outcome)
+
+    def test_delta_only_represents_changed_jobs(self):
+        self.helper.checkpoint(self.state)
+        with mock.patch.object(
+            self.helper,
+            "_repr_JobResult",
+            wraps=self.helper._repr_JobResult,
+        ) as repr_mock:
+            self.state.update_job_result(
+                self.job_a,
+                MemoryJobResult({"outcome": IJobResult.OUTCOME_PASS}),
+            )
+            self.helper.checkpoint(self.state)
+            self.assertEqual(repr_mock.call_count, 1)
+            repr_mock.reset_mock()
+            self.state.metadata.title = "title"
+            delta, _ = self.helper.checkpoint(self.state)
+            repr_mock.assert_not_called()
+        record = json.loads(gzip.decompress(delta).decode("UTF-8"))
+        self.assertEqual(
+            record,
+            {
+                "journal": self.helper._journal_id,
+                "update": {"metadata": {"title": "title"}},
+            },
+        )
+
+    def test_replayed_journal_matches_session(self):
+        data, _ = self.helper.checkpoint(self.state)
+        job_c = make_job(id="c")
+
+        def check():
+            nonlocal data
+            delta, is_snapshot = self.helper.checkpoint(self.state)
+            self.assertFalse(is_snapshot)
+            data += delta
+            session_repr = SessionSuspendHelper()._repr_SessionState(
+                self.state, None
+            )
+            self.assertEqual(self.helper._last_session_repr, session_repr)
+            json_repr = SessionResumeHelper(
+                self.job_list + [job_c], None, None
+            ).unpack_envelope(data)
+            self.assertEqual(json_repr["session"], session_repr)
+
+        self.state.update_job_result(
+            self.job_a, MemoryJobResult({"outcome": IJobResult.OUTCOME_FAIL})
+        )
+        check()
+        self.state.update_job_result(
+            self.job_a, MemoryJobResult({"outcome": IJobResult.OUTCOME_PASS})
+        )
+        check()
+        # b has no result and leaves the run list
+        self.state.update_desired_job_list([self.job_a])
+        check()
+        self.state.add_unit(job_c)
+        self.state.update_desired_job_list([self.job_a, job_c])
+        check()
+        self.state.update_desired_job_list([self.job_a])
+        self.state.remove_unit(job_c)
+        check()
+
+    def test_compaction(self):
+        self.helper.checkpoint(self.state)
+        for i in range(self.helper.COMPACT_EVERY):
+            self.state.metadata.title = str(i)
+            _, is_snapshot = self.helper.checkpoint(self.state)
+            self.assertFalse(is_snapshot)
+        _, is_snapshot = self.helper.checkpoint(self.state)
+        self.assertTrue(is_snapshot)
+
+    def test_stale_records_are_ignored(self):
+        self.helper.checkpoint(self.state)
+        self.state.metadata.title = "stale"
+        stale_delta, _ = self.helper.checkpoint(self.state)
+        self.helper.reset()
+        snapshot, _ = self.helper.checkpoint(self.state)
+        self.state.metadata.title = "current"
+        delta, _ = self.helper.checkpoint(self.state)
+        state = self._resume(snapshot + stale_delta + delta)
+        self.assertEqual(state.metadata.title, "current")
+        state = self._resume(snapshot + delta + stale_delta)
+        self.assertEqual(state.metadata.title, "current")
+
+    def test_truncated_record_is_ignored(self):
+        snapshot, _ = self.helper.checkpoint(self.state)
+        self.state.metadata.title = "first"
+        delta1, _ = self.helper.checkpoint(self.state)
+        self.state.metadata.title = "second"
+        delta2, _ = self.helper.checkpoint(self.state)
+        state = self._resume(snapshot + delta1 + delta2[:-4])
+        self.assertEqual(state.metadata.title, "first")
+
+
 class RegressionTests(TestCase):
 
     def test_1388055(self):
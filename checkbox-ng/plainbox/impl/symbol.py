@@ -116,6 +116,12 @@ class Symbol:
         """
         return hash(self._name)
 
+    def __getnewargs__(self):
+        """
+        Get the arguments of __new__() so that unpickled symbols are interned
+        """
+        return (self._name,)
+
 
 class SymbolDefNs:
     """
@@ -46,6 +46,7 @@ from plainbox.impl.secure.providers.v1 import Provider1
 from plainbox.impl.secure.rfc822 import RFC822Record
 from plainbox.impl.secure.rfc822 import RFC822SyntaxError
 from plainbox.impl.session import InhibitionCause
+from plainbox.impl.session import JobGraph
 from plainbox.impl.session import JobReadinessInhibitor
 from plainbox.impl.session import JobState
 from plainbox.impl.session import SessionState
@@ -103,6 +104,33 @@ class CheckBoxSessionStateControllerTests(TestCase):
             {("ordering", "j7")},
         )
 
+    def test_get_dependency_set__job_graph(self):
+        # The jobs to run before a suspend job come from the graph, limited
+        # to the jobs that are being solved
+        job_g = JobDefinition({"id": "j7", "flags": Suspend.AUTO_FLAG})
+        job_h = JobDefinition({"id": "j8", "flags": Suspend.AUTO_FLAG})
+        suspend_job = JobDefinition({"id": Suspend.AUTO_JOB_ID})
+        job_graph = JobGraph([job_g, job_h, suspend_job])
+        with mock.patch.object(
+            self.ctrl, "_get_before_suspend_dependency_set"
+        ) as mock_get:
+            self.assertEqual(
+                self.ctrl.get_dependency_set(
+                    suspend_job,
+                    [job_g, suspend_job],
+                    job_graph=job_graph,
+                    job_id_set={"j7", Suspend.AUTO_JOB_ID},
+                ),
+                {("ordering", "j7")},
+            )
+            self.assertEqual(
+                self.ctrl.get_dependency_set(
+                    suspend_job, [job_h], job_graph=job_graph
+                ),
+                {("ordering", "j8")},
+            )
+        mock_get.assert_not_called()
+
     def test_get_inhibitor_list_PENDING_RESOURCE(self):
         # verify that jobs that require a resource that hasn't been
         # invoked yet produce the PENDING_RESOURCE inhibitor
@@ -279,6 +307,7 @@ class CheckBoxSessionStateControllerTests(TestCase):
             "j2": mock.Mock(spec_set=JobState),
             Suspend.AUTO_JOB_ID: mock.Mock(spec_set=JobState),
         }
+        session_state.job_graph = JobGraph([j1, j2, suspend_job])
         jsm_j1 = session_state.job_state_map["j1"]
         jsm_j1.job = j1
         jsm_j1.result.outcome = IJobResult.OUTCOME_NONE
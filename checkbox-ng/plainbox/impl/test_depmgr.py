@@ -25,11 +25,17 @@ Test definitions for plainbox.impl.depmgr module
 """
 
 from unittest import TestCase
+import random
+import sys
 
 from plainbox.impl.depmgr import DependencyCycleError
 from plainbox.impl.depmgr import DependencyDuplicateError
+from plainbox.impl.depmgr import DependencyError
 from plainbox.impl.depmgr import DependencyMissingError
 from plainbox.impl.depmgr import DependencySolver
+from plainbox.impl.depmgr import DependencyUnknownError
+from plainbox.impl.job import JobDefinition
+from plainbox.impl.secure.origin import Origin
 from plainbox.impl.testing_utils import make_job
 
 
@@ -306,3 +312,160 @@ class TestDependencySolver(TestCase):
         with self.assertRaises(DependencyCycleError) as call:
             DependencySolver.resolve_dependencies(job_list)
         self.assertEqual(call.exception.job_list, [A, R, A])
+
+    def test_long_dependency_chain(self):
+        # This tests a chain of jobs longer than the recursion limit
+        # C0 -> C1 -> ... -> Cn
+        n = sys.getrecursionlimit() * 2
+        origin = Origin.get_caller_origin()
+        job_list = [
+            JobDefinition(
+                {"id": "C{}".format(i), "depends": "C{}".format(i + 1)}, origin
+            )
+            for i in range(n)
+        ]
+        job_list.append(JobDefinition({"id": "C{}".format(n)}, origin))
+        observed = DependencySolver.resolve_dependencies(job_list)
+        self.assertEqual(observed, job_list[::-1])
+
+
+class TestDependencySolverProblems(TestCase):
+
+    def _resolve_one_by_one(self, job_list, visit_list):
+        # Reference implementation, discard jobs one error at a time
+        job_list = list(job_list)
+        visit_list = list(visit_list)
+        problems = []
+        solution = []
+        while visit_list:
+            try:
+                solution = DependencySolver.resolve_dependencies(
+                    job_list, visit_list
+                )
+            except DependencyError as exc:
+                if exc.affected_job in visit_list:
+                    visit_list.remove(exc.affected_job)
+                if exc.affected_job in job_list:
+                    job_list.remove(exc.affected_job)
+                problems.append(exc)
+            else:
+                break
+        return solution, visit_list, problems
+
+    def test_no_problems(self):
+        A = make_job(id="A", depends="B")
+        B = make_job(id="B")
+        self.assertEqual(
+            DependencySolver.resolve_dependencies_and_problems([A, B], [A]),
+            ([B, A], [A], []),
+        )
+
+    def test_empty_visit_list(self):
+        A = make_job(id="A")
+        another_A = make_job(id="A")
+        self.assertEqual(
+            DependencySolver.resolve_dependencies_and_problems(
+                [A, another_A], []
+            ),
+            ([], [], []),
+        )
+
+    def test_missing_dependency_propagates(self):
+        # A -> B -> (inexisting X)
+        # C -> B
+        # D
+        A = make_job(id="A", depends="B")
+        B = make_job(id="B", depends="X")
+        C = make_job(id="C", depends="B")
+        D = make_job(id="D")
+        solution, visit_list, problems = (
+            DependencySolver.resolve_dependencies_and_problems(
+                [A, B, C, D], [A, C, D]
+            )
+        )
+        self.assertEqual(solution, [D])
+        self.assertEqual(visit_list, [D])
+        self.assertEqual(
+            problems,
+            [
+                DependencyMissingError(
+                    B, "X", DependencyMissingError.DEP_TYPE_DIRECT
+                ),
+                DependencyMissingError(
+                    A, "B", DependencyMissingError.DEP_TYPE_DIRECT
+                ),
+                DependencyMissingError(
+                    C, "B", DependencyMissingError.DEP_TYPE_DIRECT
+                ),
+            ],
+        )
+
+    def test_cycle(self):
+        # A -> B -> C -> B
+        # D -> C
+        A = make_job(id="A", depends="B")
+        B = make_job(id="B", depends="C")
+        C = make_job(id="C", depends="B")
+        D = make_job(id="D", depends="C")
+        job_list = [A, B, C, D]
+        solution, visit_list, problems = (
+            DependencySolver.resolve_dependencies_and_problems(job_list)
+        )
+        self.assertEqual(solution, [])
+        self.assertEqual(visit_list, [])
+        self.assertEqual(
+            [type(problem) for problem in problems],
+            [
+                DependencyCycleError,
+                DependencyMissingError,
+                DependencyMissingError,
+                DependencyMissingError,
+            ],
+        )
+        self.assertEqual(problems[0].job_list, [B, C, B])
+        self.assertEqual(
+            [problem.affected_job for problem in problems], [B, A, C, D]
+        )
+
+    def test_unknown_job(self):
+        A = make_job(id="A")
+        B = make_job(id="B")
+        solution, visit_list, problems = (
+            DependencySolver.resolve_dependencies_and_problems([A], [B, A])
+        )
+        self.assertEqual(solution, [A])
+        self.assertEqual(visit_list, [A])
+        self.assertEqual(problems, [DependencyUnknownError(B)])
+
+    def test_same_as_one_by_one(self):
+        # Random graphs with missing jobs, cycles and repeated jobs to visit
+        rnd = random.Random(0)
+        origin = Origin.get_caller_origin()
+        for _ in range(200):
+            id_list = ["j{}".format(i) for i in range(rnd.randint(2, 12))]
+            job_list = []
+            for job_id in id_list:
+                data = {"id": job_id}
+                deps = rnd.sample(id_list + ["x"], rnd.randint(0, 3))
+                if deps:
+                    data["depends"] = " ".join(deps)
+                after = rnd.sample(id_list, rnd.randint(0, 1))
+                if after:
+                    data["after"] = " ".join(after)
+                job_list.append(JobDefinition(data, origin))
+            visit_list = [
+                rnd.choice(job_list) for _ in range(rnd.randint(0, 12))
+            ]
+            solution, visit_list_left, problems = (
+                DependencySolver.resolve_dependencies_and_problems(
+                    job_list, visit_list
+                )
+            )
+            expected = self._resolve_one_by_one(job_list, visit_list)
+            self.assertEqual(solution, expected[0])
+            self.assertEqual(visit_list_left, expected[1])
+            # DependencyCycleError has no notion of equality
+            self.assertEqual(
+                [repr(problem) for problem in problems],
+                [repr(problem) for problem in expected[2]],
+            )
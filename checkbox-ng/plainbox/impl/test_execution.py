@@ -0,0 +1,280 @@
+# This file is part of Checkbox.
+#
+# Copyright 2024 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+plainbox.impl.test_execution
+============================
+
+Test definitions for plainbox.impl.execution module
+"""
+
+import os
+import signal
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase, mock
+
+from plainbox.impl.execution import IOPump
+from plainbox.impl.execution import UnifiedRunner
+from plainbox.vendor import extcmd
+
+
+class IOPumpTests(TestCase):
+    def setUp(self):
+        self.pump = IOPump()
+        self.addCleanup(self.pump.close)
+        self.delegate = mock.Mock()
+
+    def _lines(self):
+        return [c[0] for c in self.delegate.on_line.call_args_list]
+
+    def test_output_lines(self):
+        proc = subprocess.Popen(
+            ["printf", "one\ntwo\nthree"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self.pump.add_output(proc.stdout, "stdout", self.delegate)
+        self.pump.add_output(proc.stderr, "stderr", self.delegate)
+        self.pump.run()
+        proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
+        self.assertEqual(
+            self._lines(),
+            [("stdout", b"one\n"), ("stdout", b"two\n"), ("stdout", b"three")],
+        )
+
+    def test_output_lines_across_chunks(self):
+        self.pump.CHUNK_SIZE = 3
+        r, w = os.pipe()
+        os.write(w, b"a longer line\nx\n\nend")
+        os.close(w)
+        with open(r, "rb") as stream:
+            self.pump.add_output(stream, "stdout", self.delegate)
+            self.pump.run()
+        self.assertEqual(
+            self._lines(),
+            [
+                ("stdout", b"a longer line\n"),
+                ("stdout", b"x\n"),
+                ("stdout", b"\n"),
+                ("stdout", b"end"),
+            ],
+        )
+
+    def test_input_forwarded_and_closed(self):
+        source_r, source_w = os.pipe()
+        target_r, target_w = os.pipe()
+        proc = subprocess.Popen(
+            ["cat"], stdin=target_r, stdout=subprocess.PIPE
+        )
+        os.close(target_r)
+        os.write(source_w, b"hello\n")
+        os.close(source_w)
+        with open(source_r, "rb") as source:
+            self.pump.add_input(source, target_w)
+            self.pump.add_output(proc.stdout, "stdout", self.delegate)
+            # cat only exits if the pump closes its input once the source
+            # reaches its end
+            self.pump.run()
+        proc.wait()
+        proc.stdout.close()
+        self.assertEqual(self._lines(), [("stdout", b"hello\n")])
+
+    def test_input_not_watchable(self):
+        with tempfile.NamedTemporaryFile() as regular_file:
+            for source_path in (os.devnull, regular_file.name):
+                target_r, target_w = os.pipe()
+                with open(source_path, "rb") as source:
+                    self.pump.add_input(source, target_w)
+                # The input is closed right away
+                with open(target_r, "rb") as target:
+                    self.assertEqual(target.read(), b"")
+
+    def test_input_without_fileno(self):
+        target_r, target_w = os.pipe()
+        self.pump.add_input(object(), target_w)
+        self.pump.close()
+        with open(target_r, "rb") as target:
+            self.assertEqual(target.read(), b"")
+
+
+@mock.patch("plainbox.impl.execution.ResourceJobCache", new=mock.Mock())
+class UnifiedRunnerExecuteJobTests(TestCase):
+    def setUp(self):
+        self.runner = UnifiedRunner("id", [], "")
+        self.job = mock.Mock(user=None, checksum="checksum")
+        self.job.get_flag_set.return_value = {"preserve-cwd"}
+        self.job.provider.namespace = "ns"
+        self.delegate = mock.Mock()
+
+    def _execute_job(self, stdin_path, command=("cat",)):
+        with open(stdin_path, "rb") as stdin, mock.patch(
+            "sys.stdin", stdin
+        ), mock.patch(
+            "plainbox.impl.execution.get_execution_command",
+            return_value=list(command),
+        ), mock.patch(
+            "plainbox.impl.execution.get_execution_environment",
+            return_value=dict(os.environ),
+        ):
+            return self.runner.execute_job(
+                self.job,
+                {},
+                extcmd.ExternalCommandWithDelegate(self.delegate),
+            )
+
+    def test_stdin_devnull(self):
+        self.assertEqual(self._execute_job(os.devnull), 0)
+        self.delegate.on_end.assert_called_once_with(0)
+        self.assertEqual(self.runner._running_jobs_pid_set, set())
+
+    def test_stdin_regular_file(self):
+        with tempfile.NamedTemporaryFile() as stdin_file:
+            self.assertEqual(self._execute_job(stdin_file.name), 0)
+        self.delegate.on_end.assert_called_once_with(0)
+        self.assertEqual(self.runner._running_jobs_pid_set, set())
+
+    def test_kill_running_jobs(self):
+        # The job leaves a process behind that keeps its output open
+        command = ["sh", "-c", "sleep 60 & sleep 60"]
+        with ThreadPoolExecutor(1) as executor:
+            future = executor.submit(self._execute_job, os.devnull, command)
+            while not future.done() and not self.runner._running_jobs_pid_set:
+                time.sleep(0.01)
+            self.runner.kill_running_jobs()
+            self.assertEqual(future.result(timeout=10), -signal.SIGKILL)
+        self.assertEqual(self.runner._running_jobs_pid_set, set())
+
+
+@mock.patch("plainbox.impl.execution.ResourceJobCache", new=mock.Mock())
+class UnifiedRunnerRunJobTests(TestCase):
+    def setUp(self):
+        io_log_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(io_log_dir.cleanup)
+        self.command_io_delegate = mock.Mock()
+        self.runner = UnifiedRunner(
+            "id", [], io_log_dir.name, self.command_io_delegate
+        )
+        self.job = mock.Mock(id="job", plugin="shell", command="true")
+
+        self.stdin_list = []
+
+        def execute_job(job, environ, ecmd, stdin=None):
+            self.stdin_list.append(stdin)
+            ecmd._delegate.on_begin(["true"], {})
+            ecmd._delegate.on_line("stdout", b"line")
+            ecmd._delegate.on_end(0)
+            return 0
+
+        self.runner.execute_job = execute_job
+
+    def test_command_io_delegate(self):
+        result = self.runner.run_job(self.job, None)
+        self.assertEqual(result.outcome, "pass")
+        self.command_io_delegate.on_line.assert_called_once_with(
+            "stdout", b"line"
+        )
+
+    def test_command_io_delegate_not_shared_by_concurrent_jobs(self):
+        result = self.runner.run_job(self.job, None, concurrent=True)
+        self.assertEqual(result.outcome, "pass")
+        self.command_io_delegate.on_line.assert_not_called()
+
+    def test_concurrent_jobs_stdin(self):
+        self.runner.run_job(self.job, None)
+        self.runner.run_job(self.job, None, concurrent=True)
+        stdin, concurrent_stdin = self.stdin_list
+        self.assertFalse(stdin)
+        self.assertEqual(concurrent_stdin.name, os.devnull)
+
+
+@mock.patch("plainbox.impl.execution.ResourceJobCache", new=mock.Mock())
+class UnifiedRunnerNestTests(TestCase):
+    def setUp(self):
+        self.bin_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.bin_dir.cleanup)
+        self.tool = os.path.join(self.bin_dir.name, "tool")
+        self.provider = mock.Mock(namespace="ns", executable_list=[self.tool])
+        self.other_provider = mock.Mock(namespace="other", executable_list=[])
+        self.job = mock.Mock()
+        self.job.provider.namespace = "ns"
+
+    def _get_nest_dir(self, runner):
+        with runner.configured_filesystem(self.job) as nest_dir:
+            return nest_dir
+
+    def test_nest_reused(self):
+        runner = UnifiedRunner("id", [self.provider, self.other_provider], "")
+        nest_dir = self._get_nest_dir(runner)
+        self.assertEqual(
+            os.readlink(os.path.join(nest_dir, "tool")), self.tool
+        )
+        self.assertEqual(self._get_nest_dir(runner), nest_dir)
+        del runner
+        self.assertFalse(os.path.exists(nest_dir))
+
+    def test_nest_rebuilt_when_providers_change(self):
+        provider_list = [self.provider]
+        runner = UnifiedRunner("id", provider_list, "")
+        nest_dir = self._get_nest_dir(runner)
+        provider_list.append(mock.Mock(namespace="ns", executable_list=[]))
+        new_nest_dir = self._get_nest_dir(runner)
+        self.assertNotEqual(new_nest_dir, nest_dir)
+        self.assertFalse(os.path.exists(nest_dir))
+        self.assertTrue(os.path.isdir(new_nest_dir))
+
+    def test_nest_rebuilt_when_removed(self):
+        runner = UnifiedRunner("id", [self.provider], "")
+        nest_dir = self._get_nest_dir(runner)
+        os.unlink(os.path.join(nest_dir, "tool"))
+        os.rmdir(nest_dir)
+        new_nest_dir = self._get_nest_dir(runner)
+        self.assertTrue(os.path.islink(os.path.join(new_nest_dir, "tool")))
+
+    def test_nest_not_writable_by_others(self):
+        runner = UnifiedRunner("id", [self.provider], "")
+        nest_dir = self._get_nest_dir(runner)
+        self.assertEqual(os.stat(nest_dir).st_mode & 0o777, 0o755)
+
+    def test_nest_rebuilt_when_writable_by_others(self):
+        runner = UnifiedRunner("id", [self.provider], "")
+        nest_dir = self._get_nest_dir(runner)
+        os.chmod(nest_dir, 0o777)
+        new_nest_dir = self._get_nest_dir(runner)
+        self.assertNotEqual(new_nest_dir, nest_dir)
+        self.assertFalse(os.path.exists(nest_dir))
+        self.assertEqual(os.stat(new_nest_dir).st_mode & 0o777, 0o755)
+
+    def test_nest_created_once_by_concurrent_jobs(self):
+        runner = UnifiedRunner("id", [self.provider], "")
+        mkdtemp = tempfile.mkdtemp
+
+        def slow_mkdtemp(*args):
+            # Give the other threads time to race for the nest
+            time.sleep(0.05)
+            return mkdtemp(*args)
+
+        with mock.patch(
+            "plainbox.impl.execution.tempfile.mkdtemp", slow_mkdtemp
+        ), ThreadPoolExecutor(8) as executor:
+            nest_dir_set = set(
+                executor.map(lambda _: self._get_nest_dir(runner), range(32))
+            )
+        self.assertEqual(len(nest_dir_set), 1)
@@ -0,0 +1,169 @@
+# This file is part of Checkbox.
+#
+# Copyright 2024 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+plainbox.impl.test_jobcache
+===========================
+
+Test definitions for plainbox.impl.jobcache module
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+from unittest import TestCase, mock
+
+from plainbox.impl.jobcache import ResourceJobCache
+
+
+class ResourceJobCacheTests(TestCase):
+    def setUp(self):
+        tmp_dir = TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = tmp_dir.name
+        env_patcher = mock.patch.dict(
+            os.environ, {"XDG_CACHE_HOME": self.tmp_dir}
+        )
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+        os.environ.pop("SNAP_USER_COMMON", None)
+        self.state = {"kernel": "1.0"}
+        key_map_patcher = mock.patch.dict(
+            ResourceJobCache.INVALIDATION_KEY_MAP,
+            {"kernel": lambda: self.state["kernel"]},
+        )
+        key_map_patcher.start()
+        self.addCleanup(key_map_patcher.stop)
+        self.compute_count = 0
+        self.compute_lock = threading.Lock()
+
+    def compute(self, size=10):
+        with self.compute_lock:
+            self.compute_count += 1
+            io_log_filename = os.path.join(
+                self.tmp_dir, "io-{}.record.gz".format(self.compute_count)
+            )
+        with open(io_log_filename, "wb") as f:
+            f.write(b"x" * size)
+        result = mock.Mock()
+        result.get_builder().as_dict.return_value = {
+            "outcome": "pass",
+            "io_log_filename": io_log_filename,
+        }
+        return result
+
+    def make_cache(self, **kwargs):
+        cache = ResourceJobCache(("kernel",), **kwargs)
+        cache.load()
+        return cache
+
+    def test_get(self):
+        from_cache, result = self.make_cache().get("a", self.compute)
+        self.assertFalse(from_cache)
+        self.assertEqual(result.outcome, "pass")
+        # A new cache only loads the index and then the entry that is used
+        cache = self.make_cache()
+        with mock.patch.object(
+            cache, "_try_load_cache_entry", wraps=cache._try_load_cache_entry
+        ) as load_mock:
+            from_cache, result = cache.get("a", self.compute)
+        self.assertTrue(from_cache)
+        self.assertEqual(result.outcome, "pass")
+        self.assertEqual(load_mock.call_count, 1)
+        self.assertEqual(self.compute_count, 1)
+
+    def test_get_stale(self):
+        self.make_cache().get("a", self.compute)
+        self.state["kernel"] = "2.0"
+        from_cache, _ = self.make_cache().get("a", self.compute)
+        self.assertFalse(from_cache)
+        from_cache, _ = self.make_cache().get("a", self.compute)
+        self.assertTrue(from_cache)
+        self.assertEqual(self.compute_count, 2)
+
+    def test_get_expired(self):
+        with mock.patch("plainbox.impl.jobcache.time.time", return_value=0):
+            self.make_cache().get("a", self.compute)
+        from_cache, _ = self.make_cache(max_age=10).get("a", self.compute)
+        self.assertFalse(from_cache)
+
+    def test_evict_lru(self):
+        cache = self.make_cache(max_size=3000)
+        with mock.patch("plainbox.impl.jobcache.time.time") as time_mock:
+            time_mock.return_value = 1
+            cache.get("a", lambda: self.compute(1000))
+            time_mock.return_value = 2
+            cache.get("b", lambda: self.compute(1000))
+            time_mock.return_value = 3
+            cache.get("a", self.compute)
+            time_mock.return_value = 4
+            cache.get("c", lambda: self.compute(1000))
+        cache_path = cache._get_cache_path()
+        self.assertEqual(
+            sorted(os.listdir(cache_path)), ["a", "c", "index.json"]
+        )
+        self.assertEqual(sorted(self.make_cache()._index), ["a", "c"])
+
+    def test_get_concurrently(self):
+        cache = self.make_cache()
+        checksum_list = ["job{}".format(i) for i in range(32)] * 2
+        with mock.patch(
+            "plainbox.impl.jobcache.logger.warning"
+        ) as warning_mock, ThreadPoolExecutor(8) as executor:
+            list(
+                executor.map(
+                    lambda checksum: cache.get(checksum, self.compute),
+                    checksum_list,
+                )
+            )
+        warning_mock.assert_not_called()
+        self.assertEqual(
+            sorted(self.make_cache()._index), sorted(set(checksum_list))
+        )
+
+    def test_save_index_failure(self):
+        cache = self.make_cache()
+        with mock.patch(
+            "plainbox.impl.jobcache.os.replace", side_effect=OSError
+        ):
+            cache.get("a", self.compute)
+        # Neither the index nor its temporary file are left behind
+        self.assertEqual(os.listdir(cache._get_cache_path()), ["a"])
+
+    def test_load_legacy_cache(self):
+        cache_path = ResourceJobCache()._get_cache_path()
+        os.makedirs(os.path.join(cache_path, "a"))
+        cache = self.make_cache()
+        self.assertEqual(os.listdir(cache_path), [])
+        from_cache, _ = cache.get("a", self.compute)
+        self.assertFalse(from_cache)
+
+    def test_clear(self):
+        cache = self.make_cache()
+        cache.get("a", self.compute)
+        cache.clear()
+        self.assertEqual(os.listdir(cache._get_cache_path()), [])
+        from_cache, _ = self.make_cache().get("a", self.compute)
+        self.assertFalse(from_cache)
+
+    def test_unknown_invalidation_key(self):
+        with self.assertRaises(ValueError):
+            ResourceJobCache(("bogus",))
+
+    def test_default_fingerprint(self):
+        cache = ResourceJobCache(tuple(ResourceJobCache.INVALIDATION_KEY_MAP))
+        self.assertEqual(len(cache.fingerprint), 64)
@@ -470,6 +470,82 @@ class ResourceExpressionTests(TestCase):
             expr.evaluate(resource_map["a"], resource_map=resource_map)
         )
 
+    def test_evaluate_or_short_circuits(self):
+        resource_map = {"a": [Resource({"foo": 1})]}
+        expr = ResourceExpression("a.foo == 1 or b.bar == 2")
+        # The b resource is missing but it is never needed
+        self.assertTrue(
+            expr.evaluate(resource_map["a"], resource_map=resource_map)
+        )
+
+    def test_evaluate_and_short_circuits(self):
+        resource_map = {"a": [Resource({"foo": 1})]}
+        expr = ResourceExpression("a.foo == 2 and b.bar == 2")
+        self.assertFalse(
+            expr.evaluate(resource_map["a"], resource_map=resource_map)
+        )
+
+    def test_evaluate_split_is_cached(self):
+        resource_map = {"a": [Resource({"foo": 1})]}
+        expr = ResourceExpression("a.foo == 2 or a.foo == 1")
+        expr.evaluate(resource_map["a"], resource_map=resource_map)
+        split = expr._get_split()
+        expr.evaluate(resource_map["a"], resource_map=resource_map)
+        self.assertIs(expr._get_split(), split)
+        self.assertEqual(split[0], " or ")
+        self.assertEqual(split[1].text, "a.foo == 2")
+        self.assertEqual(split[2].text, "a.foo == 1")
+
+    def test_evaluate_prefilter(self):
+        resource_map = {
+            "a": [Resource({"foo": str(i)}) for i in range(100)],
+            "b": [Resource({"bar": str(i)}) for i in range(100)],
+        }
+        expr = ResourceExpression("(a.foo == '42' and b.bar == '7')")
+        filter_list, residual = expr._get_prefilter()
+        self.assertEqual(len(filter_list), 2)
+        self.assertIsNone(residual)
+        self.assertTrue(
+            expr.evaluate(
+                resource_map["a"], resource_map["b"], resource_map=resource_map
+            )
+        )
+        expr = ResourceExpression("(a.foo == '42' and b.bar == '100')")
+        self.assertFalse(
+            expr.evaluate(
+                resource_map["a"], resource_map["b"], resource_map=resource_map
+            )
+        )
+
+    def test_evaluate_prefilter_with_residual(self):
+        resource_map = {
+            "a": [Resource({"foo": str(i)}) for i in range(10)],
+            "b": [Resource({"bar": str(i)}) for i in range(10)],
+        }
+        expr = ResourceExpression("(a.foo > '5' and a.foo == b.bar)")
+        filter_list, residual = expr._get_prefilter()
+        self.assertEqual(len(filter_list[0]), 1)
+        self.assertEqual(len(filter_list[1]), 0)
+        self.assertIsNotNone(residual)
+        self.assertTrue(
+            expr.evaluate(
+                resource_map["a"], resource_map["b"], resource_map=resource_map
+            )
+        )
+        expr = ResourceExpression("(a.foo > '5' and a.foo < b.bar < '6')")
+        self.assertFalse(
+            expr.evaluate(
+                resource_map["a"], resource_map["b"], resource_map=resource_map
+            )
+        )
+
+    def test_evaluate_prefilter_exception(self):
+        # Resources that raise in a filter are simply discarded
+        expr = ResourceExpression("(a.foo.bar == 1 and b.bar == 2)")
+        self.assertFalse(
+            expr.evaluate([Resource({"foo": 1})], [Resource({"bar": 2})])
+        )
+
 
 class ResourceProgramTests(TestCase):
 
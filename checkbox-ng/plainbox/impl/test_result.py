@@ -26,15 +26,20 @@ Test definitions for plainbox.impl.result module
 from tempfile import TemporaryDirectory
 from unittest import TestCase
 import doctest
+import gzip
 import io
+import os
 
 from plainbox.abc import IJobResult
+from plainbox.impl.result import BinaryIOLogRecordReader
+from plainbox.impl.result import BinaryIOLogRecordWriter
 from plainbox.impl.result import DiskJobResult
 from plainbox.impl.result import IOLogRecord
 from plainbox.impl.result import IOLogRecordReader
 from plainbox.impl.result import IOLogRecordWriter
 from plainbox.impl.result import JobResultBuilder
 from plainbox.impl.result import MemoryJobResult
+from plainbox.impl.result import io_log_text_cache
 from plainbox.impl.testing_utils import make_io_log
 from plainbox.vendor import mock
 
@@ -117,6 +122,79 @@ class DiskJobResultTests(TestCase, CommonTestsMixIn):
         )
         self.assertEqual(result.io_log_as_text_attachment, "")
 
+    def test_io_log_text_cache(self):
+        result = DiskJobResult(
+            {
+                "io_log_filename": make_io_log(
+                    [
+                        (0, "stdout", b"foo\xe2\x82"),
+                        (0, "stderr", b"\x1ebar\n"),
+                        (0, "stdout", b"\xac\n"),
+                    ],
+                    self.scratch_dir.name,
+                ),
+            }
+        )
+        with mock.patch.object(
+            result, "get_io_log", wraps=result.get_io_log
+        ) as mock_get_io_log:
+            with io_log_text_cache():
+                for _ in range(2):
+                    self.assertEqual(
+                        result.io_log_as_flat_text, "foo�bar\n�\n"
+                    )
+                    self.assertEqual(
+                        result.io_log_as_text_attachment, "foo€\n"
+                    )
+            # Each text is only decoded once
+            self.assertEqual(mock_get_io_log.call_count, 2)
+            self.assertEqual(result.io_log_as_text_attachment, "foo€\n")
+            self.assertEqual(mock_get_io_log.call_count, 3)
+
+    def test_io_log_text_cache_is_bounded(self):
+        result_list = [
+            DiskJobResult(
+                {
+                    "io_log_filename": make_io_log(
+                        [(0, "stdout", b"x" * 10)],
+                        self.scratch_dir.name,
+                    ),
+                }
+            )
+            for _ in range(3)
+        ]
+        with io_log_text_cache(max_size=25):
+            for result in result_list:
+                with mock.patch.object(
+                    result, "get_io_log", wraps=result.get_io_log
+                ) as mock_get_io_log:
+                    result.io_log_as_flat_text
+                    result.io_log_as_flat_text
+                self.assertEqual(mock_get_io_log.call_count, 1)
+            # Only the two most recently used texts fit in the cache
+            with mock.patch.object(
+                result_list[0], "get_io_log", wraps=result_list[0].get_io_log
+            ) as mock_get_io_log:
+                result_list[0].io_log_as_flat_text
+            self.assertEqual(mock_get_io_log.call_count, 1)
+            with mock.patch.object(
+                result_list[2], "get_io_log", wraps=result_list[2].get_io_log
+            ) as mock_get_io_log:
+                result_list[2].io_log_as_flat_text
+            self.assertEqual(mock_get_io_log.call_count, 0)
+
+    def test_io_log_text_cache_invalid_attachment(self):
+        result = DiskJobResult(
+            {
+                "io_log_filename": make_io_log(
+                    [(0, "stdout", b"foo\xe2\x82")], self.scratch_dir.name
+                ),
+            }
+        )
+        with io_log_text_cache():
+            self.assertEqual(result.io_log_as_text_attachment, "")
+            self.assertEqual(result.io_log_as_flat_text, "foo�")
+
 
 class MemoryJobResultTests(TestCase, CommonTestsMixIn):
 
@@ -200,6 +278,57 @@ class IOLogRecordWriterTests(TestCase):
         self.assertEqual(record_list, [self._RECORD])
 
 
+class BinaryIOLogRecordTests(TestCase):
+
+    _RECORD_LIST = [
+        IOLogRecord(0.123, "stdout", b"some\ndata"),
+        IOLogRecord(0.5, "stderr", b""),
+        IOLogRecord(1.0, "stdout", bytes(range(256))),
+    ]
+
+    def _write(self, stream):
+        writer = BinaryIOLogRecordWriter(stream)
+        for record in self._RECORD_LIST:
+            writer.write_record(record)
+
+    def test_round_trip(self):
+        stream = io.BytesIO()
+        self._write(stream)
+        stream.seek(0)
+        self.assertEqual(
+            list(BinaryIOLogRecordReader(stream)), self._RECORD_LIST
+        )
+
+    def test_truncated_stream(self):
+        stream = io.BytesIO()
+        self._write(stream)
+        stream = io.BytesIO(stream.getvalue()[:-1])
+        self.assertEqual(
+            list(BinaryIOLogRecordReader(stream)), self._RECORD_LIST[:2]
+        )
+
+    def test_not_binary_stream(self):
+        stream = io.BufferedReader(io.BytesIO(b'[0.1,"stdout",""]\n'))
+        self.assertFalse(BinaryIOLogRecordReader.is_binary_stream(stream))
+        with self.assertRaises(ValueError):
+            BinaryIOLogRecordReader(stream)
+
+    def test_unsupported_version(self):
+        stream = io.BytesIO(BinaryIOLogRecordWriter.MAGIC + b"\xff")
+        with self.assertRaises(ValueError):
+            BinaryIOLogRecordReader(stream)
+
+    def test_disk_job_result_reads_both_formats(self):
+        with TemporaryDirectory() as scratch_dir:
+            legacy_path = make_io_log(self._RECORD_LIST, scratch_dir)
+            binary_path = os.path.join(scratch_dir, "binary.record.gz")
+            with gzip.open(binary_path, "wb") as stream:
+                self._write(stream)
+            for path in (legacy_path, binary_path):
+                result = DiskJobResult({"io_log_filename": path})
+                self.assertEqual(list(result.get_io_log()), self._RECORD_LIST)
+
+
 class JobResultBuildeTests(TestCase):
 
     def test_smoke_hollow(self):
@@ -24,6 +24,7 @@ plainbox.impl.test_symbol
 Test definitions for plainbox.impl.symbol module
 """
 
+import pickle
 import unittest
 
 from plainbox.impl.symbol import SymbolDef, Symbol
@@ -64,6 +65,13 @@ class SymbolTests(unittest.TestCase):
         """
         self.assertIs(Symbol("foo"), Symbol("foo"))
 
+    def test_symbol_pickle(self):
+        """
+        verify that unpickled symbols are the same object
+        """
+        symbol = Symbol("foo")
+        self.assertIs(pickle.loads(pickle.dumps(symbol)), symbol)
+
     def test_different_symbols_are_not_same(self):
         """
         verify that two symbols with different names are not the same object
@@ -31,7 +31,6 @@ Shared code for test data transports..
 from collections import OrderedDict
 from io import TextIOWrapper
 from logging import getLogger
-import pkg_resources
 import re
 from shutil import copyfileobj
 import sys
@@ -39,6 +38,7 @@ import sys
 from plainbox.abc import ISessionStateTransport
 from plainbox.i18n import gettext as _
 from plainbox.impl.exporter import ByteStringStreamTranslator
+from plainbox.impl.secure.plugins import get_entry_points
 
 import requests
 
@@ -254,7 +254,7 @@ def get_all_transports():
     Returns a map of transports (mapping from name to transport class)
     """
     transport_map = OrderedDict()
-    iterator = pkg_resources.iter_entry_points("plainbox.transport")
+    iterator = get_entry_points("plainbox.transport")
     for entry_point in sorted(iterator, key=lambda ep: ep.name):
         try:
             transport_cls = entry_point.load()
@@ -23,9 +23,8 @@ import logging
 import os.path
 import re
 
-import pkg_resources
-
 from plainbox.i18n import gettext as _
+from plainbox.impl.secure.plugins import load_entry_point
 from plainbox.impl.symbol import SymbolDef
 from plainbox.impl.unit import concrete_validators
 from plainbox.impl.unit.unit_with_id import UnitWithId
@@ -122,7 +121,7 @@ class ExporterUnit(UnitWithId):
                 concrete_validators.present,
                 concrete_validators.untranslatable,
                 CorrectFieldValueValidator(
-                    lambda entry_point: pkg_resources.load_entry_point(
+                    lambda entry_point: load_entry_point(
                         "checkbox-ng", "plainbox.exporter", entry_point
                     ),
                     Problem.wrong,
@@ -218,7 +217,7 @@ class ExporterUnitSupport:
 
     def _get_exporter_cls(self, exporter):
         """Return the exporter class."""
-        return pkg_resources.load_entry_point(
+        return load_entry_point(
             "checkbox-ng", "plainbox.exporter", exporter.entry_point
         )
 
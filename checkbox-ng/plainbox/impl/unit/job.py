@@ -606,6 +606,21 @@ class JobDefinition(UnitWithId, IJobDefinition):
         """
         return self.plugin in ["shell", "resource", "attachment"]
 
+    @cached_property
+    def parallel_safe(self):
+        """
+        Whether the job can run concurrently with other parallel-safe jobs
+
+        Only automated shell jobs with the ``parallel-safe`` flag qualify.
+        Jobs that can restart or terminate the application never do.
+        """
+        flag_set = self.get_flag_set()
+        return (
+            self.plugin == "shell"
+            and "parallel-safe" in flag_set
+            and not flag_set & {"noreturn", "autorestart"}
+        )
+
     @cached_property
     def startup_user_interaction_required(self):
         """
@@ -649,6 +664,7 @@ class JobDefinition(UnitWithId, IJobDefinition):
             )
         return self._resource_program
 
+    @instance_method_lru_cache(maxsize=None)
     def get_direct_dependencies(self):
         """
         Compute and return a set of direct dependencies
@@ -671,6 +687,7 @@ class JobDefinition(UnitWithId, IJobDefinition):
         V().visit(WordList.parse(self.depends))
         return deps
 
+    @instance_method_lru_cache(maxsize=None)
     def get_after_dependencies(self):
         """
         Compute and return a set of after dependencies.
@@ -701,6 +718,7 @@ class JobDefinition(UnitWithId, IJobDefinition):
         V().visit(WordList.parse(self.after))
         return deps
 
+    @instance_method_lru_cache(maxsize=None)
     def get_salvage_dependencies(self):
         """Return a set of jobs that need to fail before this job can run."""
         deps = set()
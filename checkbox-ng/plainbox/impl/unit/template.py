@@ -37,6 +37,7 @@ from plainbox.impl.symbol import SymbolDef
 from plainbox.impl.unit import all_units
 from plainbox.impl.unit import concrete_validators
 from plainbox.impl.unit import get_accessed_parameters
+from plainbox.impl.unit.unit import UnitValidator
 from plainbox.impl.unit.unit_with_id import UnitWithId
 from plainbox.impl.unit.unit_with_id import UnitWithIdValidator
 from plainbox.impl.unit.validators import CorrectFieldValueValidator
@@ -180,6 +181,9 @@ class TemplateUnit(UnitWithId):
         )
         self._filter_program = None
         self._fake_resources = False
+        # Map from the class of the instantiated units to the issues found in
+        # the fields that do not depend on any template parameter
+        self._static_issue_map = {}
 
     @classmethod
     def instantiate_template(
@@ -529,6 +533,61 @@ class TemplateUnit(UnitWithId):
             self.field_offset_map,
         )
 
+    @instance_method_lru_cache(maxsize=None)
+    def get_parametric_field_set(self):
+        """
+        Get the set of names of the fields that depend on template parameters.
+
+        Translatable fields are named without the leading underscore.
+        """
+        return frozenset(
+            key[1:] if key.startswith("_") else key
+            for key, param_set in self.get_accessed_parameters(
+                force=True, template_engine=self.template_engine
+            ).items()
+            if param_set
+        )
+
+    def check_instance(self, unit):
+        """
+        Check a unit instantiated from this template for correctness.
+
+        :param unit:
+            A unit returned by :meth:`instantiate_one()`
+        :returns:
+            A list of issues, just like ``unit.check()``
+        :raises MissingParam:
+            If the unit refers to a parameter that it does not define
+
+        Field validators that only look at a field that does not depend on
+        any template parameter find the same issues in every instance of this
+        template. Those issues are found once, with the first instance that
+        is checked, and reused for the other instances. Only the remaining
+        validators run for each instance.
+        """
+        validator = unit.Meta.validator_cls()
+        if type(validator).check is not UnitValidator.check:
+            # Validators with extra checks need to see the whole unit
+            return unit.check()
+        parametric_field_set = self.get_parametric_field_set()
+
+        def is_static(field, field_validator):
+            return (
+                field_validator.field_local
+                and str(field) not in parametric_field_set
+            )
+
+        def is_variant(field, field_validator):
+            return not is_static(field, field_validator)
+
+        static_issue_list = self._static_issue_map.get(type(unit))
+        if static_issue_list is None:
+            static_issue_list = list(validator.check_selected(unit, is_static))
+            self._static_issue_map[type(unit)] = static_issue_list
+        return static_issue_list + list(
+            validator.check_selected(unit, is_variant)
+        )
+
     def should_instantiate(self, resource):
         """
         Check if a job should be instantiated for a specific resource.
@@ -173,6 +173,18 @@ class TestJobDefinitionDefinition(TestCase):
         job3 = JobDefinition({"flags": "a,b,c"})
         self.assertEqual(job3.get_flag_set(), set(["a", "b", "c"]))
 
+    def test_parallel_safe(self):
+        job1 = JobDefinition({"plugin": "shell"})
+        self.assertFalse(job1.parallel_safe)
+        job2 = JobDefinition({"plugin": "shell", "flags": "parallel-safe"})
+        self.assertTrue(job2.parallel_safe)
+        job3 = JobDefinition({"plugin": "manual", "flags": "parallel-safe"})
+        self.assertFalse(job3.parallel_safe)
+        job4 = JobDefinition(
+            {"plugin": "shell", "flags": "parallel-safe noreturn"}
+        )
+        self.assertFalse(job4.parallel_safe)
+
 
 class JobDefinitionParsingTests(TestCaseWithParameters):
 
@@ -626,6 +626,78 @@ class TemplateUnitTests(TestCase):
         self.assertEqual(len(unit_list), 1)
         self.assertEqual(unit_list[0].partial_id, "check-device-sda1")
 
+    def test_get_parametric_field_set(self):
+        template = TemplateUnit(
+            {
+                "template-resource": "resource",
+                "id": "check-device-{dev_name}",
+                "_summary": "Test {name}",
+                "plugin": "shell",
+            }
+        )
+        self.assertEqual(
+            template.get_parametric_field_set(), {"id", "summary"}
+        )
+
+    def test_check_instance(self):
+        template = TemplateUnit(
+            {
+                "template-resource": "resource",
+                "id": "check-device-{dev_name}",
+                "plugin": "bogus",
+                "command": "echo {dev_name}",
+            }
+        )
+        unit_list = template.instantiate_all(
+            [Resource({"dev_name": "sda1"}), Resource({"dev_name": "sda2"})]
+        )
+        for unit in unit_list:
+            self.assertEqual(
+                sorted(
+                    (str(issue.field), issue.kind, issue.severity)
+                    for issue in template.check_instance(unit)
+                ),
+                sorted(
+                    (str(issue.field), issue.kind, issue.severity)
+                    for issue in unit.check()
+                ),
+            )
+
+    def test_check_instance__static_checks_run_once(self):
+        template = TemplateUnit(
+            {
+                "template-resource": "resource",
+                "id": "check-device-{dev_name}",
+                "plugin": "shell",
+                "command": "true",
+            }
+        )
+        unit_list = template.instantiate_all(
+            [Resource({"dev_name": "sda1"}), Resource({"dev_name": "sda2"})]
+        )
+        with mock.patch.object(
+            JobDefinition, "command", new_callable=mock.PropertyMock
+        ) as mock_command:
+            mock_command.return_value = "true"
+            template.check_instance(unit_list[0])
+            call_count = mock_command.call_count
+            template.check_instance(unit_list[1])
+        # The command field does not depend on any parameter, only the
+        # validators that look at other fields read it again
+        self.assertLess(mock_command.call_count - call_count, call_count)
+
+    def test_check_instance__missing_param(self):
+        template = TemplateUnit(
+            {
+                "template-resource": "resource",
+                "id": "check-device-{missing}",
+                "plugin": "shell",
+            }
+        )
+        unit = template.instantiate_one(Resource({"dev_name": "sda1"}))
+        with self.assertRaises(MissingParam):
+            template.check_instance(unit)
+
 
 class TemplateUnitJinja2Tests(TestCase):
 
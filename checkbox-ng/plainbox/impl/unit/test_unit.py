@@ -25,9 +25,12 @@ Test definitions for plainbox.impl.unit (package init file)
 
 from unittest import TestCase
 
+from jinja2 import Template
+
 from plainbox.abc import IProvider1
 from plainbox.impl.unit.unit import Unit
 from plainbox.impl.unit.unit import MissingParam
+from plainbox.impl.unit.unit import get_jinja2_template
 from plainbox.impl.validation import Problem
 from plainbox.impl.validation import Severity
 from plainbox.vendor import mock
@@ -210,6 +213,39 @@ class TestUnitDefinition(TestCase):
         self.assertEqual(unit6.get_record_value("key"), None)
         self.assertEqual(unit6.get_record_value("key", "default"), "default")
 
+    def test_get_record_value_jinja2(self):
+        """
+        Ensure that jinja2 fields are rendered with the parameters and the
+        environment
+        """
+        data = {
+            "template-engine": "jinja2",
+            "key": "{{ param }}-{{ __system_env__['PARAM'] }}",
+        }
+        unit1 = Unit(dict(data), parameters={"param": "one"})
+        unit2 = Unit(dict(data), parameters={"param": "two"})
+        unit3 = Unit({"template-engine": "jinja2", "key": "{{ 1 + 1 }}"})
+        with mock.patch.dict("os.environ", {"PARAM": "env"}):
+            self.assertEqual(unit1.get_record_value("key"), "one-env")
+            self.assertEqual(unit2.get_record_value("key"), "two-env")
+        self.assertEqual(unit3.get_record_value("key"), "2")
+
+    def test_jinja2_templates_are_compiled_once(self):
+        """
+        Ensure that units sharing the same field text share the compiled
+        template
+        """
+        data = {"template-engine": "jinja2", "key": "{{ param }}-compiled"}
+        unit1 = Unit(dict(data), parameters={"param": "one"})
+        unit2 = Unit(dict(data), parameters={"param": "two"})
+        with mock.patch(
+            "plainbox.impl.unit.unit.Template", wraps=Template
+        ) as mock_template:
+            get_jinja2_template.cache_clear()
+            self.assertEqual(unit1.get_record_value("key"), "one-compiled")
+            self.assertEqual(unit2.get_record_value("key"), "two-compiled")
+        mock_template.assert_called_once_with("{{ param }}-compiled")
+
     def test_get_translated_data__typical(self):
         """
         Verify the runtime behavior of get_translated_data()
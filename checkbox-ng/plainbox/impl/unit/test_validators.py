@@ -23,8 +23,10 @@ plainbox.impl.unit.test_validators
 Test definitions for plainbox.impl.validators
 """
 
-from unittest import TestCase
+from unittest import TestCase, mock
 
+from plainbox.abc import IProvider1
+from plainbox.impl.testing_utils import make_job
 from plainbox.impl.unit.validators import CorrectFieldValueValidator
 from plainbox.impl.unit.validators import DeprecatedFieldValidator
 from plainbox.impl.unit.validators import IFieldValidator
@@ -34,6 +36,7 @@ from plainbox.impl.unit.validators import TemplateVariantFieldValidator
 from plainbox.impl.unit.validators import TranslatableFieldValidator
 from plainbox.impl.unit.validators import UniqueValueValidator
 from plainbox.impl.unit.validators import UnitReferenceValidator
+from plainbox.impl.unit.validators import UnitValidationContext
 from plainbox.impl.unit.validators import UntranslatableFieldValidator
 
 
@@ -52,3 +55,20 @@ class NoTestsForAllThatCode(TestCase):
         UnitReferenceValidator
         UntranslatableFieldValidator
         self.assertTrue(True)
+
+
+class UnitValidationContextTests(TestCase):
+    def test_prepare(self):
+        job_a = make_job("a")
+        job_b = make_job("b", depends="a")
+        provider = mock.Mock(spec=IProvider1, unit_list=[job_a, job_b])
+        context = UnitValidationContext([provider])
+        with mock.patch(
+            "plainbox.impl.unit.validators.compute_value_map",
+            return_value={},
+        ) as compute_mock:
+            context.prepare([job_a, job_b])
+            context.prepare([job_a])
+        # The id map is shared by all the validators of all the units
+        compute_mock.assert_called_once_with(context, "id")
+        self.assertEqual(context.shared_cache, {"field_value_map[id]": {}})
@@ -42,7 +42,7 @@ from plainbox.impl.unit.validators import PresentFieldValidator
 from plainbox.impl.unit.validators import ReferenceConstraint
 from plainbox.impl.unit.validators import TemplateInvariantFieldValidator
 from plainbox.impl.unit.validators import UnitReferenceValidator
-from plainbox.impl.unit.validators import compute_value_map
+from plainbox.impl.unit.validators import get_value_map
 from plainbox.impl.validation import Problem
 from plainbox.impl.validation import Severity
 from plainbox.impl.xparsers import Error
@@ -69,6 +69,9 @@ class NoBaseIncludeValidator(FieldValidatorBase):
     field patterns.
     """
 
+    def prepare_context(self, field, context):
+        get_value_map(context, "id")
+
     def check_in_context(self, parent, unit, field, context):
         for issue in self._check_test_plan_in_context(
             parent, unit, field, context
@@ -77,9 +80,7 @@ class NoBaseIncludeValidator(FieldValidatorBase):
 
     def _check_test_plan_in_context(self, parent, unit, field, context):
         included_job_id = []
-        id_map = context.compute_shared(
-            "field_value_map[id]", compute_value_map, context, "id"
-        )
+        id_map = get_value_map(context, "id")
         warning = _(
             "selector {!a} will select a job already matched by the "
             "'include' field patterns"
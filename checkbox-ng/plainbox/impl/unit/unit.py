@@ -72,6 +72,18 @@ def on_ubuntucore():
     return False
 
 
+@lru_cache(maxsize=1024)
+def get_jinja2_template(source):
+    """
+    Get a compiled Jinja2 template for the given source text
+
+    Compiling a template costs much more than rendering it and all the units
+    instantiated from one template unit share the same source text, so the
+    compiled templates are kept in a process-wide cache.
+    """
+    return Template(source)
+
+
 class MissingParam(Exception):
     """
     Indicaiton of a missing parameter required for template instantiation.
@@ -126,6 +138,24 @@ class UnitValidator:
                 for issue in validator.check(self, unit, field):
                     yield issue
 
+    def check_selected(self, unit, select_fn):
+        """
+        Check a specific unit with some of the field validators
+
+        :param unit:
+            The :class:`Unit` to check
+        :param select_fn:
+            A function called as ``select_fn(field, validator)`` that returns
+            True for each field validator that should be used
+        :returns:
+            A generator yielding subsequent issues
+        """
+        for field, validators in sorted(unit.Meta.field_validators.items()):
+            for validator in validators:
+                if select_fn(field, validator):
+                    for issue in validator.check(self, unit, field):
+                        yield issue
+
     def check_in_context(self, unit, context):
         """
         Check a specific unit for correctness in a broader context
@@ -674,6 +704,26 @@ class Unit(metaclass=UnitType):
         else:
             return {}
 
+    @instance_method_lru_cache(maxsize=None)
+    def _jinja2_context(self):
+        # Add the current system environment variables to the parameters so
+        # that they can be used in all fields (i.e. not just in the command
+        # shell). By adding here rather than in the template instantiation we
+        # avoid problems with creation of checkpoints. The context is built
+        # once per unit, os.environ is a live mapping anyway.
+        context = dict(self.parameters) if self.is_parametric else {}
+        context.update(
+            {
+                "__checkbox_env__": self._checkbox_env(),
+                "__system_env__": os.environ,
+                "__on_ubuntucore__": on_ubuntucore(),
+            }
+        )
+        return context
+
+    def _render_jinja2(self, value):
+        return get_jinja2_template(value).render(self._jinja2_context())
+
     @instance_method_lru_cache(maxsize=None)
     def get_record_value(self, name, default=None):
         """
@@ -692,16 +742,7 @@ class Unit(metaclass=UnitType):
             value = self._data.get(name, default)
         if value is not None and self.is_parametric:
             if self.template_engine == "jinja2":
-                # Add the current system environment variables to the
-                # parameters so that they can be used in all fields (i.e. not
-                # just in the command shell). By adding here rather than in the
-                # template instantiation we avoid problems with creation of
-                # checkpoints
-                tmp_params = self.parameters.copy()
-                tmp_params.update({"__checkbox_env__": self._checkbox_env()})
-                tmp_params.update({"__system_env__": os.environ})
-                tmp_params.update({"__on_ubuntucore__": on_ubuntucore()})
-                value = Template(value).render(tmp_params)
+                value = self._render_jinja2(value)
             else:
                 try:
                     value = string.Formatter().vformat(
@@ -715,12 +756,7 @@ class Unit(metaclass=UnitType):
             and not self.is_parametric
             and not self.unit == "template"
         ):
-            tmp_params = {
-                "__checkbox_env__": self._checkbox_env(),
-                "__system_env__": os.environ,
-                "__on_ubuntucore__": on_ubuntucore(),
-            }
-            value = Template(value).render(tmp_params)
+            value = self._render_jinja2(value)
         return value
 
     @instance_method_lru_cache(maxsize=None)
@@ -745,11 +781,7 @@ class Unit(metaclass=UnitType):
             value = self._raw_data.get("{}".format(name), default)
         if value is not None and self.is_parametric:
             if self.template_engine == "jinja2":
-                tmp_params = self.parameters.copy()
-                tmp_params.update({"__checkbox_env__": self._checkbox_env()})
-                tmp_params.update({"__system_env__": os.environ})
-                tmp_params.update({"__on_ubuntucore__": on_ubuntucore()})
-                value = Template(value).render(tmp_params)
+                value = self._render_jinja2(value)
             else:
                 value = string.Formatter().vformat(value, (), self.parameters)
         elif (
@@ -758,12 +790,7 @@ class Unit(metaclass=UnitType):
             and not self.is_parametric
             and not self.unit == "template"
         ):
-            tmp_params = {
-                "__checkbox_env__": self._checkbox_env(),
-                "__system_env__": os.environ,
-                "__on_ubuntucore__": on_ubuntucore(),
-            }
-            value = Template(value).render(tmp_params)
+            value = self._render_jinja2(value)
         return value
 
     @instance_method_lru_cache(maxsize=None)
@@ -804,24 +831,13 @@ class Unit(metaclass=UnitType):
                 # handle exceptions here and hint that this might be the cause
                 # of the problem?
                 if self.template_engine == "jinja2":
-                    tmp_params = self.parameters.copy()
-                    tmp_params.update(
-                        {"__checkbox_env__": self._checkbox_env()}
-                    )
-                    tmp_params.update({"__system_env__": os.environ})
-                    tmp_params.update({"__on_ubuntucore__": on_ubuntucore()})
-                    msgstr = Template(msgstr).render(tmp_params)
+                    msgstr = self._render_jinja2(msgstr)
                 else:
                     msgstr = string.Formatter().vformat(
                         msgstr, (), self.parameters
                     )
             elif self.template_engine == "jinja2":
-                tmp_params = {
-                    "__checkbox_env__": self._checkbox_env(),
-                    "__system_env__": os.environ,
-                    "__on_ubuntucore__": on_ubuntucore(),
-                }
-                msgstr = Template(msgstr).render(tmp_params)
+                msgstr = self._render_jinja2(msgstr)
             return msgstr
         # If there was no marked-for-translation value then let's just return
         # the normal (untranslatable) version.
@@ -831,24 +847,13 @@ class Unit(metaclass=UnitType):
             # the non-raw value here.
             if self.is_parametric:
                 if self.template_engine == "jinja2":
-                    tmp_params = self.parameters.copy()
-                    tmp_params.update(
-                        {"__checkbox_env__": self._checkbox_env()}
-                    )
-                    tmp_params.update({"__system_env__": os.environ})
-                    tmp_params.update({"__on_ubuntucore__": on_ubuntucore()})
-                    msgstr = Template(msgstr).render(tmp_params)
+                    msgstr = self._render_jinja2(msgstr)
                 else:
                     msgstr = string.Formatter().vformat(
                         msgstr, (), self.parameters
                     )
             elif self.template_engine == "jinja2":
-                tmp_params = {
-                    "__checkbox_env__": self._checkbox_env(),
-                    "__system_env__": os.environ,
-                    "__on_ubuntucore__": on_ubuntucore(),
-                }
-                msgstr = Template(msgstr).render(tmp_params)
+                msgstr = self._render_jinja2(msgstr)
             return msgstr
         # If we have nothing better let's just return the default value
         return default
@@ -119,6 +119,28 @@ class UnitValidationContext(pod.POD):
             self.shared_cache[cache_key] = func(*args, **kwargs)
         return self.shared_cache[cache_key]
 
+    def prepare(self, unit_list):
+        """
+        Compute the shared helpers needed to check some units.
+
+        :param unit_list:
+            List of units that are going to be checked in this context
+
+        This lets each field validator of the given units compute its shared
+        helpers up-front. A context that is copied afterwards, for instance
+        into worker processes, does not need to compute them again.
+        """
+        meta_set = set()
+        for unit in unit_list:
+            if unit.Meta in meta_set:
+                continue
+            meta_set.add(unit.Meta)
+            for field, validators in sorted(
+                unit.Meta.field_validators.items()
+            ):
+                for validator in validators:
+                    validator.prepare_context(field, self)
+
 
 class UnitFieldIssue(Issue):
     """
@@ -185,8 +207,16 @@ class IFieldValidator(metaclass=abc.ABCMeta):
     Interface for all :class:`Unit` field validators.
 
     Instances of this class participate in the validation process.
+
+    :attr field_local:
+        True if :meth:`check()` only looks at the value of the field it
+        checks (and at properties shared by all the instances of a template).
+        Issues found by such validators in a field that does not depend on any
+        template parameter are the same for every instance of a template.
     """
 
+    field_local = False
+
     @abc.abstractmethod
     def __init__(self, **kwargs):
         """
@@ -237,12 +267,26 @@ class IFieldValidator(metaclass=abc.ABCMeta):
         detected problems
         """
 
+    def prepare_context(self, field, context):
+        """
+        Compute the shared helpers used by :meth:`check_in_context()`
+
+        :param field:
+            The field to check, this may be a Symbol
+        :param context:
+            The :class:`UnitValidationContext` to prepare
+        :returns:
+            None
+        """
+
 
 class FieldValidatorBase(IFieldValidator):
     """
     Base validator that implements no checks of any kind
     """
 
+    field_local = True
+
     def __init__(self, message=None):
         self.message = message
 
@@ -296,6 +340,7 @@ class CorrectFieldValueValidator(FieldValidatorBase):
             has_two_args = len(inspect.getargspec(correct_fn).args) == 2
         self.correct_fn = correct_fn
         self.correct_fn_needs_unit = has_two_args
+        self.field_local = onlyif is None and not has_two_args
         self.kind = kind or self.default_kind
         self.severity = severity or self.default_severity
         self.onlyif = onlyif
@@ -611,6 +656,23 @@ def compute_value_map(context, field):
     return value_map
 
 
+def get_value_map(context, field):
+    """
+    Get the value map of a field, shared by all units of a context
+
+    :param context:
+        The :class:`UnitValidationContext` instance to look at
+    :param field:
+        The field to map
+    :returns:
+        The return value of :func:`compute_value_map()`, computed at most once
+        per context and field.
+    """
+    return context.compute_shared(
+        "field_value_map[{}]".format(field), compute_value_map, context, field
+    )
+
+
 class UniqueValueValidator(FieldValidatorBase):
     """
     Validator that checks if a value of a specific field is unique
@@ -625,13 +687,11 @@ class UniqueValueValidator(FieldValidatorBase):
     which translates to O(N) cost for the whole context.
     """
 
+    def prepare_context(self, field, context):
+        get_value_map(context, field)
+
     def check_in_context(self, parent, unit, field, context):
-        value_map = context.compute_shared(
-            "field_value_map[{}]".format(field),
-            compute_value_map,
-            context,
-            field,
-        )
+        value_map = get_value_map(context, field)
         value = getattr(unit, field2prop(field))
         units_with_this_value = value_map[value]
         n = len(units_with_this_value)
@@ -705,10 +765,11 @@ class UnitReferenceValidator(FieldValidatorBase):
             constraints = ()
         self.constraints = constraints
 
+    def prepare_context(self, field, context):
+        get_value_map(context, "id")
+
     def check_in_context(self, parent, unit, field, context):
-        id_map = context.compute_shared(
-            "field_value_map[id]", compute_value_map, context, "id"
-        )
+        id_map = get_value_map(context, "id")
         try:
             value_list = self.get_references_fn(unit)
         except Exception as exc:
@@ -716,7 +777,10 @@ class UnitReferenceValidator(FieldValidatorBase):
             value_list = None
         if value_list is None:
             value_list = []
-        elif not isinstance(value_list, (list, tuple, set)):
+        elif isinstance(value_list, set):
+            # Report issues in the same order regardless of hash seeds
+            value_list = sorted(value_list)
+        elif not isinstance(value_list, (list, tuple)):
             value_list = [value_list]
         for unit_id in value_list:
             try:
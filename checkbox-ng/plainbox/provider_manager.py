@@ -32,6 +32,7 @@ import argparse
 import inspect
 import itertools
 import logging
+import multiprocessing
 import os
 import re
 import shutil
@@ -1137,6 +1138,13 @@ class ValidateCommand(ManageCommand):
             action="store_true",
             help=argparse.SUPPRESS,
         )
+        group.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            metavar="N",
+            help=_("Validate units in N processes (default: CPU count)"),
+        )
 
     def invoked(self, ns):
         if ns.new_validation_core:
@@ -1257,7 +1265,7 @@ class ValidateCommand(ManageCommand):
         unit_list, exc_list = self.collect_all_units(provider)
         early_issue_gen = self.get_early_issues(exc_list)
         context = UnitValidationContext(provider_list)
-        issue_gen = self.validate_units_in_context(context, unit_list)
+        issue_gen = self.validate_units_in_context(context, unit_list, ns.jobs)
         del context
         failed = False
         hidden = 0
@@ -1311,12 +1319,42 @@ class ValidateCommand(ManageCommand):
                 _("NOTE: subsequent units from problematic files are ignored")
             )
 
-    def validate_units_in_context(self, context, unit_list):
+    def validate_units_in_context(self, context, unit_list, jobs=1):
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        jobs = min(jobs, len(unit_list))
+        # The worker processes need to inherit the units and the context,
+        # they are not meant to be pickled.
+        if jobs > 1 and "fork" in multiprocessing.get_all_start_methods():
+            for issue in self._validate_units_in_processes(
+                context, unit_list, jobs
+            ):
+                yield issue
+            return
         for unit in unit_list:
             _logger.info(_("Validating unit %s"), unit)
             for issue in unit.check(context=context, live=True):
                 yield issue
 
+    def _validate_units_in_processes(self, context, unit_list, jobs):
+        # Compute the value maps shared by all units before forking so that
+        # each worker does not have to compute them again
+        context.prepare(unit_list)
+        mp_context = multiprocessing.get_context("fork")
+        # Small chunks balance the load as some units are much more
+        # expensive to check than others
+        chunksize = max(1, len(unit_list) // (jobs * 16))
+        with mp_context.Pool(
+            jobs, _init_validation_worker, (context, unit_list)
+        ) as pool:
+            # imap() keeps the order of units so issues are reported in the
+            # same order as when validating serially
+            for issue_list in pool.imap(
+                _validate_unit, range(len(unit_list)), chunksize
+            ):
+                for issue in issue_list:
+                    yield issue
+
     def get_provider(self):
         """
         Get a Provider1 that describes the current provider
@@ -1330,6 +1368,36 @@ class ValidateCommand(ManageCommand):
         )
 
 
+# Validation context and units inherited by each validation worker process
+_validation_context = None
+_validation_unit_list = None
+
+
+def _init_validation_worker(context, unit_list):
+    global _validation_context, _validation_unit_list
+    _validation_context = context
+    _validation_unit_list = unit_list
+
+
+def _validate_unit(index):
+    """
+    Check one of the units of a validation worker process.
+
+    :param index:
+        Index of the unit to check
+    :returns:
+        A list of :class:`plainbox.impl.validation.Issue` instances. They
+        do not reference the unit so that they can be sent to the parent
+        process.
+    """
+    unit = _validation_unit_list[index]
+    _logger.info(_("Validating unit %s"), unit)
+    return [
+        Issue(issue.message, issue.severity, issue.kind, issue.origin)
+        for issue in unit.check(context=_validation_context, live=True)
+    ]
+
+
 def exc2issue(exc):
     """
     Convert an arbitrary exception to an Issue
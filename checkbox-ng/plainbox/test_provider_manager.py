@@ -549,6 +549,31 @@ class ProviderManagerToolTests(TestCase):
             ),
         )
 
+    def test_validate__jobs(self):
+        """
+        verify that ``validate --jobs`` reports issues in the same order
+        regardless of the number of processes
+        """
+        for index in range(4):
+            filename = os.path.join(
+                self.tmpdir, "jobs", "broken{}.pxu".format(index)
+            )
+            with open(filename, "wt", encoding="UTF-8") as stream:
+                print("id: broken{}".format(index), file=stream)
+                print("plugin: shell", file=stream)
+                print("depends: missing other", file=stream)
+        output_list = []
+        for jobs in ("1", "3"):
+            with TestIO() as test_io:
+                self.tool.main(["validate", "-N", "--jobs", jobs])
+            output_list.append(test_io.stdout)
+        self.assertEqual(output_list[0], output_list[1])
+        self.assertIn(
+            "error: jobs/broken3.pxu:3: job 'broken3', field 'depends', unit"
+            " 'com.example::missing' is not available",
+            output_list[0],
+        )
+
     def test_info(self):
         """
         verify that ``info`` shows basic provider information
@@ -0,0 +1,129 @@
+# This file is part of Checkbox.
+#
+# Copyright 2024 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark of the udevadm parser over the sample udevadm data.
+
+Run it with::
+
+    python3 -m checkbox_support.parsers.tests.benchmark_udevadm
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from pkg_resources import resource_filename
+
+from checkbox_support.parsers.udevadm import parse_udevadm_output
+from checkbox_support.parsers.udevadm import parse_udevadm_records
+
+# Attributes of the devices that are reported by the udev resource
+ATTRIBUTES = (
+    "path",
+    "name",
+    "bus",
+    "category",
+    "driver",
+    "product_id",
+    "vendor_id",
+    "subproduct_id",
+    "subvendor_id",
+    "product",
+    "vendor",
+    "interface",
+    "mac",
+    "product_slug",
+    "vendor_slug",
+    "symlink_uuid",
+)
+
+
+def load_samples():
+    """Get a list of (name, udevadm output, lsblk output) tuples."""
+    data_dir = resource_filename(
+        "checkbox_support", "parsers/tests/udevadm_data"
+    )
+    samples = []
+    for filename in sorted(glob.glob(os.path.join(data_dir, "*.txt"))):
+        with open(filename, "rt", encoding="UTF-8") as stream:
+            output = stream.read()
+        lsblk = ""
+        lsblk_filename = os.path.splitext(filename)[0] + ".lsblk"
+        if os.path.exists(lsblk_filename):
+            with open(lsblk_filename, "rt", encoding="UTF-8") as stream:
+                lsblk = stream.read()
+        name = os.path.splitext(os.path.basename(filename))[0]
+        samples.append((name, output, lsblk))
+    return samples
+
+
+def bench(fn, repeat):
+    """Get the best time of ``repeat`` calls to ``fn``."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        duration = time.perf_counter() - start
+        if best is None or duration < best:
+            best = duration
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=3, help="number of runs"
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="show each sample"
+    )
+    args = parser.parse_args()
+
+    samples = load_samples()
+    totals = [0, 0, 0]
+    for name, output, lsblk in samples:
+
+        def parse_records():
+            parse_udevadm_records(output)
+
+        def parse_devices():
+            for device in parse_udevadm_output(output, lsblk, True, 64):
+                for attribute in ATTRIBUTES:
+                    getattr(device, attribute)
+
+        records = len(parse_udevadm_records(output))
+        records_time = bench(parse_records, args.repeat)
+        devices_time = bench(parse_devices, args.repeat)
+        totals[0] += records
+        totals[1] += records_time
+        totals[2] += devices_time
+        if args.verbose:
+            print(
+                "{:<40} {:>6} records {:>8.2f}ms {:>8.2f}ms".format(
+                    name, records, records_time * 1000, devices_time * 1000
+                )
+            )
+    print(
+        "{} samples, {} records: parsing {:.3f}s, "
+        "classifying {:.3f}s (best of {})".format(
+            len(samples), totals[0], totals[1], totals[2], args.repeat
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
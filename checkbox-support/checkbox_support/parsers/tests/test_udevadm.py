@@ -14,14 +14,20 @@
 # You should have received a copy of the GNU General Public License
 # along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
 from io import StringIO
-from unittest import TestCase
+from tempfile import TemporaryDirectory
+from unittest import TestCase, mock
 from textwrap import dedent
 
 from pkg_resources import resource_filename
 
 from checkbox_support.parsers.udevadm import UdevadmParser, decode_id
+from checkbox_support.parsers.udevadm import UdevadmDevice
+from checkbox_support.parsers.udevadm import iter_udevadm_records
 from checkbox_support.parsers.udevadm import parse_udevadm_output
+from checkbox_support.parsers.udevadm import parse_udevadm_records
+from checkbox_support.parsers.udevadm import UdevadmSnapshot
 
 
 class UdevadmDataMixIn(object):
@@ -1231,3 +1237,144 @@ class TestDecodeId(TestCase):
 
     def test_strip_whitespace(self):
         self.assertEqual("USB 2.0", decode_id("  USB 2.0  "))
+
+
+class TestIterUdevadmRecords(TestCase):
+
+    def test_stream(self):
+        stream = StringIO(
+            "P: /devices/a\r\nE: DEVPATH=/devices/a\nE: X=1\n  2\n\n\n"
+            "P: /devices/a/b\nN: b\nS: link\n\n"
+        )
+        records = iter_udevadm_records(stream)
+        self.assertEqual(
+            next(records),
+            ("/devices/a", None, [], {"DEVPATH": "/devices/a", "X": "1  2"}),
+        )
+        self.assertEqual(
+            next(records),
+            ("/devices/a/b", "b", ["link"], {"DEVPATH": "/devices/a/b"}),
+        )
+        self.assertEqual(list(records), [])
+
+
+class TestUdevadmDeviceMemoization(TestCase):
+
+    def test_setter_invalidates_children(self):
+        epoch = [0]
+        parent = UdevadmDevice({"SUBSYSTEM": "usb"}, None, epoch=epoch)
+        child = UdevadmDevice(
+            {"SUBSYSTEM": "input"}, None, stack=[parent], epoch=epoch
+        )
+        self.assertEqual(child.bus, "usb")
+        parent.bus = "pci"
+        self.assertEqual(child.bus, "input")
+
+
+class TestUdevadmSnapshot(TestCase, UdevadmDataMixIn):
+
+    def setUp(self):
+        self.snapshot = UdevadmSnapshot(
+            parse_udevadm_records(self.get_text("DELL_XPS1340")),
+            self.get_lsblk("DELL_XPS1340") or "",
+            42,
+        )
+        session_share = TemporaryDirectory()
+        self.addCleanup(session_share.cleanup)
+        self.session_share = session_share.name
+        self.filename = os.path.join(
+            self.session_share, UdevadmSnapshot.FILENAME
+        )
+
+    def summary(self, devices):
+        return [(d.path, d.category, d.product, d.vendor) for d in devices]
+
+    def test_parse_snapshot(self):
+        devices = parse_udevadm_output(self.snapshot, bits=64)
+        expected = parse_udevadm_output(
+            self.get_text("DELL_XPS1340"), self.snapshot.lsblk, bits=64
+        )
+        self.assertEqual(self.summary(devices), self.summary(expected))
+
+    def test_save_load(self):
+        self.snapshot.save(self.filename)
+        snapshot = UdevadmSnapshot.load(self.filename)
+        self.assertEqual(snapshot.records, self.snapshot.records)
+        self.assertEqual(snapshot.lsblk, self.snapshot.lsblk)
+        self.assertEqual(snapshot.seqnum, 42)
+        self.assertEqual(
+            os.listdir(self.session_share), ["udevadm-snapshot.json"]
+        )
+
+    def test_load_bad_version(self):
+        with open(self.filename, "wt") as stream:
+            stream.write('{"version": 0}')
+        with self.assertRaises(ValueError):
+            UdevadmSnapshot.load(self.filename)
+
+    @mock.patch.object(UdevadmSnapshot, "read_seqnum")
+    @mock.patch.object(UdevadmSnapshot, "capture")
+    def test_get_session_snapshot(self, capture_mock, read_seqnum_mock):
+        capture_mock.return_value = self.snapshot
+        read_seqnum_mock.return_value = 42
+        with mock.patch.dict(
+            os.environ, {"PLAINBOX_SESSION_SHARE": self.session_share}
+        ):
+            UdevadmSnapshot.get_session_snapshot()
+            snapshot = UdevadmSnapshot.get_session_snapshot()
+            self.assertEqual(capture_mock.call_count, 1)
+            self.assertEqual(snapshot.records, self.snapshot.records)
+            # A uevent happened since the snapshot was taken
+            read_seqnum_mock.return_value = 43
+            UdevadmSnapshot.get_session_snapshot()
+            self.assertEqual(capture_mock.call_count, 2)
+            UdevadmSnapshot.get_session_snapshot(refresh=True)
+            self.assertEqual(capture_mock.call_count, 3)
+            UdevadmSnapshot.invalidate_session_snapshot()
+            self.assertFalse(os.path.exists(self.filename))
+
+    @mock.patch("json.dump")
+    def test_save_failure(self, dump_mock):
+        dump_mock.side_effect = OSError("No space left on device")
+        with self.assertRaises(OSError):
+            self.snapshot.save(self.filename)
+        self.assertEqual(os.listdir(self.session_share), [])
+
+    @mock.patch.object(UdevadmSnapshot, "read_seqnum")
+    @mock.patch.object(UdevadmSnapshot, "capture")
+    def test_get_session_snapshot_save_failure(
+        self, capture_mock, read_seqnum_mock
+    ):
+        capture_mock.return_value = self.snapshot
+        read_seqnum_mock.return_value = 42
+        with mock.patch.dict(
+            os.environ, {"PLAINBOX_SESSION_SHARE": self.session_share}
+        ):
+            with mock.patch.object(UdevadmSnapshot, "save") as save_mock:
+                save_mock.side_effect = OSError("Read-only file system")
+                with self.assertLogs(level="WARNING"):
+                    snapshot = UdevadmSnapshot.get_session_snapshot()
+        self.assertEqual(snapshot, self.snapshot)
+
+    @mock.patch.object(UdevadmSnapshot, "read_seqnum")
+    @mock.patch.object(UdevadmSnapshot, "capture")
+    def test_get_session_snapshot_no_seqnum(
+        self, capture_mock, read_seqnum_mock
+    ):
+        self.snapshot.seqnum = None
+        capture_mock.return_value = self.snapshot
+        read_seqnum_mock.return_value = None
+        with mock.patch.dict(
+            os.environ, {"PLAINBOX_SESSION_SHARE": self.session_share}
+        ):
+            UdevadmSnapshot.get_session_snapshot()
+            UdevadmSnapshot.get_session_snapshot()
+        # The snapshot can't be validated so it is never reused
+        self.assertEqual(capture_mock.call_count, 2)
+
+    @mock.patch.object(UdevadmSnapshot, "capture")
+    def test_get_session_snapshot_no_session(self, capture_mock):
+        with mock.patch.dict(os.environ, clear=True):
+            snapshot = UdevadmSnapshot.get_session_snapshot()
+        self.assertEqual(snapshot, capture_mock.return_value)
+        self.assertEqual(os.listdir(self.session_share), [])
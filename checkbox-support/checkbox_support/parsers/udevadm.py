@@ -22,7 +22,10 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from collections import OrderedDict
+from io import StringIO
 from subprocess import check_output, CalledProcessError
+import json
+import logging
 import os
 import re
 import string
@@ -94,6 +97,37 @@ ROOT_MOUNTPOINT = re.compile(
     r"ubuntu-seed|ubuntu-boot|ubuntu-save|data|boot)"
 )
 CAMERA_RE = re.compile(r"Camera", re.I)
+# Some attribute lines have a space character after the
+# ':', others don't have it (see udevadm-info.c).
+UDEVADM_LINE_RE = re.compile(r"(?P<key>[A-Z]):\s*(?P<value>.*)")
+UDEVADM_PROPERTY_RE = re.compile(r"(?P<key>[^=]+)=(?P<value>.*)")
+# Category of the PCI devices by (class, subclass), network and display
+# devices need more heuristics and are not listed here
+PCI_CATEGORY_MAP = {
+    (Pci.BASE_CLASS_SERIAL, Pci.CLASS_SERIAL_USB): "USB",
+    (Pci.BASE_CLASS_STORAGE, Pci.CLASS_STORAGE_SCSI): "SCSI",
+    (Pci.BASE_CLASS_STORAGE, Pci.CLASS_STORAGE_IDE): "IDE",
+    (Pci.BASE_CLASS_STORAGE, Pci.CLASS_STORAGE_FLOPPY): "FLOPPY",
+    (Pci.BASE_CLASS_STORAGE, Pci.CLASS_STORAGE_RAID): "RAID",
+    (Pci.BASE_CLASS_COMMUNICATION, Pci.CLASS_COMMUNICATION_MODEM): "MODEM",
+    (Pci.BASE_CLASS_INPUT, Pci.CLASS_INPUT_SCANNER): "SCANNER",
+    (Pci.BASE_CLASS_MULTIMEDIA, Pci.CLASS_MULTIMEDIA_AUDIO): "AUDIO",
+    (Pci.BASE_CLASS_MULTIMEDIA, Pci.CLASS_MULTIMEDIA_AUDIO_DEVICE): "AUDIO",
+    (Pci.BASE_CLASS_SERIAL, Pci.CLASS_SERIAL_FIREWIRE): "FIREWIRE",
+    (Pci.BASE_CLASS_WIRELESS, Pci.CLASS_WIRELESS_BLUETOOTH): "BLUETOOTH",
+    (Pci.BASE_CLASS_BRIDGE, Pci.CLASS_BRIDGE_PCMCIA): "SOCKET",
+    (Pci.BASE_CLASS_BRIDGE, Pci.CLASS_BRIDGE_CARDBUS): "SOCKET",
+}
+# Category of the SCSI devices by type, except for the disks (types 0, 7
+# and 14) that depend on the parent devices
+SCSI_TYPE_CATEGORY_MAP = {
+    1: "TAPE",
+    2: "PRINTER",
+    4: "CDROM",
+    5: "CDROM",
+    6: "SCANNER",
+    12: "RAID",
+}
 
 
 def slugify(_string):
@@ -123,6 +157,36 @@ def find_pkname_is_root_mountpoint(devname, lsblk=None):
     return False
 
 
+class _derived_property(property):
+    """
+    Property of a device whose computed value is memoized.
+
+    Computed values may depend on the properties of the parent devices, so
+    setting any derived property invalidates the memoized values of all of
+    the devices sharing the same epoch (i.e. parsed together).
+    """
+
+    def __get__(self, device, owner=None):
+        if device is None:
+            return self
+        name = self.fget.__name__
+        epoch = device._epoch[0]
+        try:
+            value_epoch, value = device._cache[name]
+        except KeyError:
+            pass
+        else:
+            if value_epoch == epoch:
+                return value
+        value = self.fget(device)
+        device._cache[name] = (epoch, value)
+        return value
+
+    def __set__(self, device, value):
+        super(_derived_property, self).__set__(device, value)
+        device._epoch[0] += 1
+
+
 class UdevadmDevice(object):
     __slots__ = (
         "_environment",
@@ -144,6 +208,8 @@ class UdevadmDevice(object):
         "_subvendor_id",
         "_vendor_slug",
         "_symlinks",
+        "_cache",
+        "_epoch",
     )
 
     def __init__(
@@ -155,6 +221,7 @@ class UdevadmDevice(object):
         bits=None,
         stack=[],
         symlinks=None,
+        epoch=None,
     ):
         self._environment = environment
         self._name = name
@@ -177,6 +244,9 @@ class UdevadmDevice(object):
         self._symlinks = []
         if symlinks:
             self._symlinks = symlinks
+        # Memoized values of the derived properties, see _derived_property
+        self._cache = {}
+        self._epoch = epoch if epoch is not None else [0]
 
     def __repr__(self):
         vid = int(self.vendor_id) if self.vendor_id else 0
@@ -190,7 +260,7 @@ class UdevadmDevice(object):
         if self._name is not None:
             return self._name
 
-    @property
+    @_derived_property
     def bus(self):
         if self._bus is not None:
             return self._bus
@@ -245,7 +315,7 @@ class UdevadmDevice(object):
     def bus(self, value):
         self._bus = value
 
-    @property
+    @_derived_property
     def category(self):
         if self._category is not None:
             return self._category
@@ -337,51 +407,8 @@ class UdevadmDevice(object):
                     )
                 ):
                     return "VIDEO"
-            if (
-                class_id == Pci.BASE_CLASS_SERIAL
-                and subclass_id == Pci.CLASS_SERIAL_USB
-            ):
-                return "USB"
-            if class_id == Pci.BASE_CLASS_STORAGE:
-                if subclass_id == Pci.CLASS_STORAGE_SCSI:
-                    return "SCSI"
-                if subclass_id == Pci.CLASS_STORAGE_IDE:
-                    return "IDE"
-                if subclass_id == Pci.CLASS_STORAGE_FLOPPY:
-                    return "FLOPPY"
-                if subclass_id == Pci.CLASS_STORAGE_RAID:
-                    return "RAID"
-            if (
-                class_id == Pci.BASE_CLASS_COMMUNICATION
-                and subclass_id == Pci.CLASS_COMMUNICATION_MODEM
-            ):
-                return "MODEM"
-            if (
-                class_id == Pci.BASE_CLASS_INPUT
-                and subclass_id == Pci.CLASS_INPUT_SCANNER
-            ):
-                return "SCANNER"
-            if class_id == Pci.BASE_CLASS_MULTIMEDIA:
-                if (
-                    subclass_id == Pci.CLASS_MULTIMEDIA_AUDIO
-                    or subclass_id == Pci.CLASS_MULTIMEDIA_AUDIO_DEVICE
-                ):
-                    return "AUDIO"
-            if (
-                class_id == Pci.BASE_CLASS_SERIAL
-                and subclass_id == Pci.CLASS_SERIAL_FIREWIRE
-            ):
-                return "FIREWIRE"
-            if (
-                class_id == Pci.BASE_CLASS_WIRELESS
-                and subclass_id == Pci.CLASS_WIRELESS_BLUETOOTH
-            ):
-                return "BLUETOOTH"
-            if class_id == Pci.BASE_CLASS_BRIDGE and (
-                subclass_id == Pci.CLASS_BRIDGE_PCMCIA
-                or subclass_id == Pci.CLASS_BRIDGE_CARDBUS
-            ):
-                return "SOCKET"
+            if (class_id, subclass_id) in PCI_CATEGORY_MAP:
+                return PCI_CATEGORY_MAP[(class_id, subclass_id)]
 
         if "TYPE" in self._environment and "INTERFACE" in self._environment:
             interface_class, interface_subclass, interface_protocol = (
@@ -579,16 +606,8 @@ class UdevadmDevice(object):
                     d.driver == "rts_pstor" for d in self._stack
                 ):
                     return "DISK"
-                if type == 1:
-                    return "TAPE"
-                if type == 2:
-                    return "PRINTER"
-                if type in (4, 5):
-                    return "CDROM"
-                if type == 6:
-                    return "SCANNER"
-                if type == 12:
-                    return "RAID"
+                if type in SCSI_TYPE_CATEGORY_MAP:
+                    return SCSI_TYPE_CATEGORY_MAP[type]
             if self._list_partitions and devtype == "partition":
                 if self._stack:
                     parent = self._stack[-1]
@@ -686,7 +705,7 @@ class UdevadmDevice(object):
         if "MAJOR" in self._environment:
             return self._environment["MAJOR"]
 
-    @property
+    @_derived_property
     def driver(self):
         if "DRIVER" in self._environment:
             return self._environment["DRIVER"]
@@ -701,7 +720,7 @@ class UdevadmDevice(object):
                     return parent._environment["DRIVER"]
         return None
 
-    @property
+    @_derived_property
     def path(self):
         devpath = self._environment.get("DEVPATH")
         if (
@@ -717,7 +736,7 @@ class UdevadmDevice(object):
         """
         return self._environment.get("DEVPATH")
 
-    @property
+    @_derived_property
     def _mmc_type(self):
         """
         Return the MMC type available in the stack.
@@ -733,7 +752,7 @@ class UdevadmDevice(object):
                 return parent._environment["MMC_TYPE"]
         return None
 
-    @property
+    @_derived_property
     def product_id(self):
         if self._product_id is not None:
             return self._product_id
@@ -799,7 +818,7 @@ class UdevadmDevice(object):
     def product_id(self, value):
         self._product_id = value
 
-    @property
+    @_derived_property
     def vendor_id(self):
         if self._vendor_id is not None:
             return self._vendor_id
@@ -864,7 +883,7 @@ class UdevadmDevice(object):
     def vendor_id(self, value):
         self._vendor_id = value
 
-    @property
+    @_derived_property
     def subproduct_id(self):
         if self._subproduct_id is not None:
             return self._subproduct_id
@@ -888,7 +907,7 @@ class UdevadmDevice(object):
     def subproduct_id(self, value):
         self._subproduct_id = value
 
-    @property
+    @_derived_property
     def subvendor_id(self):
         if self._subvendor_id is not None:
             return self._subvendor_id
@@ -912,7 +931,7 @@ class UdevadmDevice(object):
     def subvendor_id(self, value):
         self._subvendor_id = value
 
-    @property
+    @_derived_property
     def product_slug(self):
         """Returns the product name with special characters removed."""
         if self._product_slug is not None:
@@ -922,7 +941,7 @@ class UdevadmDevice(object):
 
         return None
 
-    @property
+    @_derived_property
     def vendor_slug(self):
         """Returns the vendor name with special characters removed."""
         if self._vendor_slug is not None:
@@ -932,7 +951,7 @@ class UdevadmDevice(object):
 
         return None
 
-    @property
+    @_derived_property
     def product(self):
         if self._product is not None:
             return self._product
@@ -1063,7 +1082,7 @@ class UdevadmDevice(object):
     def product(self, value):
         self._product = value
 
-    @property
+    @_derived_property
     def vendor(self):
         if self._vendor is not None:
             return self._vendor
@@ -1151,7 +1170,7 @@ class UdevadmDevice(object):
     def vendor(self, value):
         self._vendor = value
 
-    @property
+    @_derived_property
     def interface(self):
         if self._interface is not None:
             return self._interface
@@ -1170,7 +1189,7 @@ class UdevadmDevice(object):
             return self._environment["RFKILL_NAME"]
         return None
 
-    @property
+    @_derived_property
     def mac(self):
         if self._mac is not None:
             return self._mac
@@ -1239,6 +1258,8 @@ class UdevadmParser(object):
         self, stream_or_string, lsblk=None, list_partitions=False, bits=None
     ):
         self.stream_or_string = stream_or_string
+        if lsblk is None and isinstance(stream_or_string, UdevadmSnapshot):
+            lsblk = stream_or_string.lsblk
         self.lsblk = lsblk
         self.list_partitions = list_partitions
         self.bits = bits
@@ -1376,63 +1397,20 @@ class UdevadmParser(object):
         return {}
 
     def run(self):
-        # Some attribute lines have a space character after the
-        # ':', others don't have it (see udevadm-info.c).
-        line_pattern = re.compile(r"(?P<key>[A-Z]):\s*(?P<value>.*)")
-        multi_pattern = re.compile(r"(?P<key>[^=]+)=(?P<value>.*)")
-
         stack = []
-        if isinstance(self.stream_or_string, type("")):
-            output = self.stream_or_string
+        # Shared by all the devices, see _derived_property
+        epoch = [0]
+        if isinstance(self.stream_or_string, UdevadmSnapshot):
+            records = self.stream_or_string.records
         else:
-            output = self.stream_or_string.read()
-        output = output.replace("\r", "")  # Just in case...
-        for record in re.split("\n{2,}", output):
-            record = record.strip()
-            if not record:
-                continue
-
-            # Determine path, name and environment
-            path = None
-            name = None
-            element = None
-            symlinks = []
-            environment = {}
-            for line in record.splitlines():
-                line_match = line_pattern.match(line)
-                if not line_match:
-                    if environment:
-                        # Append to last environment element
-                        environment[element] += line
-                    continue
-
-                key = line_match.group("key")
-                value = line_match.group("value")
-
-                if key == "P":
-                    path = value
-                elif key == "N":
-                    name = value
-                elif key == "S":
-                    symlinks.append(value)
-                elif key == "E":
-                    key_match = multi_pattern.match(value)
-                    if not key_match:
-                        raise Exception(
-                            "Device property not supported: %s" % value
-                        )
-                    element = key_match.group("key")
-                    environment[element] = key_match.group("value")
-
+            records = iter_udevadm_records(self.stream_or_string)
+        for path, name, symlinks, environment in records:
             # Update stack
             while stack:
                 if stack[-1]._raw_path + "/" in path:
                     break
                 stack.pop()
 
-            # Set default DEVPATH
-            environment.setdefault("DEVPATH", path)
-
             device = self.device_factory(
                 environment,
                 name,
@@ -1441,6 +1419,7 @@ class UdevadmParser(object):
                 self.bits,
                 list(stack),
                 symlinks,
+                epoch=epoch,
             )
             if not self._ignoreDevice(device):
                 if device._raw_path in self.devices:
@@ -1637,13 +1616,227 @@ def known_to_be_video_device(vendor_id, product_id, pci_class, pci_subclass):
         return product_id in [0x0152, 0x0412, 0x0402, 0xA780]
 
 
+def iter_udevadm_records(stream_or_string):
+    """
+    Parse the output of `udevadm info --export-db` one device at a time.
+
+    The output is consumed line by line, so a stream does not have to be
+    read in memory at once.
+
+    :returns: A generator of (path, name, symlinks, environment) tuples, one
+    for each device of the udev database, in order
+    """
+    if isinstance(stream_or_string, type("")):
+        stream_or_string = StringIO(stream_or_string)
+    record_lines = []
+    for line in stream_or_string:
+        line = line.replace("\r", "").rstrip("\n")  # Just in case...
+        if line:
+            record_lines.append(line)
+        elif record_lines:
+            record = _parse_udevadm_record(record_lines)
+            if record:
+                yield record
+            record_lines = []
+    if record_lines:
+        record = _parse_udevadm_record(record_lines)
+        if record:
+            yield record
+
+
+def _parse_udevadm_record(record_lines):
+    record = "\n".join(record_lines).strip()
+    if not record:
+        return None
+
+    # Determine path, name and environment
+    path = None
+    name = None
+    element = None
+    symlinks = []
+    environment = {}
+    for line in record.splitlines():
+        line_match = UDEVADM_LINE_RE.match(line)
+        if not line_match:
+            if environment:
+                # Append to last environment element
+                environment[element] += line
+            continue
+
+        key = line_match.group("key")
+        value = line_match.group("value")
+
+        if key == "P":
+            path = value
+        elif key == "N":
+            name = value
+        elif key == "S":
+            symlinks.append(value)
+        elif key == "E":
+            key_match = UDEVADM_PROPERTY_RE.match(value)
+            if not key_match:
+                raise Exception("Device property not supported: %s" % value)
+            element = key_match.group("key")
+            environment[element] = key_match.group("value")
+
+    # Set default DEVPATH
+    environment.setdefault("DEVPATH", path)
+    return path, name, symlinks, environment
+
+
+def parse_udevadm_records(output):
+    """
+    Split the output of `udevadm info --export-db` into device records.
+
+    :returns: A list of (path, name, symlinks, environment) tuples, one for
+    each device of the udev database, in order
+    """
+    return list(iter_udevadm_records(output))
+
+
+class UdevadmSnapshot(object):
+    """
+    Pre-parsed copy of the udev database and of the block devices list.
+
+    A testing session shares one snapshot between all the jobs that look at
+    the udev database, see :meth:`get_session_snapshot()`. It can be passed
+    to :class:`UdevadmParser` instead of the `udevadm` output.
+    """
+
+    VERSION = 1
+    FILENAME = "udevadm-snapshot.json"
+    UDEVADM_CMD = ["udevadm", "info", "--export-db"]
+    LSBLK_CMD = ["lsblk", "-i", "-n", "-P", "-o", "KNAME,TYPE,MOUNTPOINT"]
+    # Incremented by the kernel on every uevent, hotplug events included
+    SEQNUM_PATH = "/sys/kernel/uevent_seqnum"
+
+    def __init__(self, records, lsblk, seqnum=None):
+        self.records = records
+        self.lsblk = lsblk
+        self.seqnum = seqnum
+
+    @classmethod
+    def read_seqnum(cls):
+        """Get the current uevent sequence number, None if unavailable."""
+        try:
+            with open(cls.SEQNUM_PATH, "rt") as stream:
+                return int(stream.read())
+        except (IOError, OSError, ValueError):
+            return None
+
+    @classmethod
+    def capture(cls):
+        """
+        Take a new snapshot of the system.
+
+        :raises CalledProcessError: if `udevadm` or `lsblk` fail
+        """
+        seqnum = cls.read_seqnum()
+        # Set the error policy to 'ignore' in order to let tests depending
+        # on the udev resource to properly match udev properties
+        output = check_output(cls.UDEVADM_CMD).decode("UTF-8", "ignore")
+        lsblk = check_output(cls.LSBLK_CMD).decode("UTF-8", "ignore")
+        return cls(parse_udevadm_records(output), lsblk, seqnum)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Load a snapshot saved with :meth:`save()`.
+
+        :raises ValueError: if the file is not a snapshot of this version
+        """
+        with open(filename, "rt", encoding="UTF-8") as stream:
+            data = json.load(stream)
+        if data.get("version") != cls.VERSION:
+            raise ValueError("Unsupported udevadm snapshot version")
+        return cls(
+            [tuple(record) for record in data["records"]],
+            data["lsblk"],
+            data["seqnum"],
+        )
+
+    def save(self, filename):
+        """Atomically save the snapshot to a file."""
+        data = {
+            "version": self.VERSION,
+            "seqnum": self.seqnum,
+            "lsblk": self.lsblk,
+            "records": self.records,
+        }
+        tmp_filename = "{}.{}.tmp".format(filename, os.getpid())
+        try:
+            with open(tmp_filename, "wt", encoding="UTF-8") as stream:
+                json.dump(data, stream, separators=(",", ":"))
+            os.replace(tmp_filename, filename)
+        finally:
+            # Don't leave a partial copy behind when the write failed
+            if os.path.exists(tmp_filename):
+                try:
+                    os.remove(tmp_filename)
+                except (IOError, OSError):
+                    pass
+
+    @classmethod
+    def get_session_snapshot(cls, refresh=False):
+        """
+        Get the udev snapshot of the current testing session.
+
+        The snapshot is stored in $PLAINBOX_SESSION_SHARE and reused until a
+        uevent (e.g. a device was plugged) happens, or until it is
+        invalidated with :meth:`invalidate_session_snapshot()`. Outside of a
+        session, or when the uevent sequence number can't be read (e.g. in
+        some containers), a new snapshot is captured each time.
+
+        :param refresh: capture a new snapshot even if one can be reused
+        """
+        session_share = os.environ.get("PLAINBOX_SESSION_SHARE")
+        if not session_share:
+            return cls.capture()
+        filename = os.path.join(session_share, cls.FILENAME)
+        seqnum = None if refresh else cls.read_seqnum()
+        # Without a sequence number there is no way to tell if a uevent
+        # happened since the stored snapshot was taken
+        if seqnum is not None:
+            try:
+                snapshot = cls.load(filename)
+            except (IOError, OSError, ValueError, KeyError):
+                pass
+            else:
+                if snapshot.seqnum == seqnum:
+                    return snapshot
+        snapshot = cls.capture()
+        try:
+            snapshot.save(filename)
+        except (IOError, OSError) as exc:
+            # The snapshot is still good for the caller, only the other jobs
+            # of the session will have to capture their own
+            logging.warning("Unable to save the udev snapshot: %s", exc)
+        return snapshot
+
+    @classmethod
+    def invalidate_session_snapshot(cls):
+        """Remove the udev snapshot of the current testing session."""
+        session_share = os.environ.get("PLAINBOX_SESSION_SHARE")
+        if not session_share:
+            return
+        try:
+            os.remove(os.path.join(session_share, cls.FILENAME))
+        except (IOError, OSError):
+            pass
+
+
 def parse_udevadm_output(output, lsblk=None, list_partitions=False, bits=None):
     """
     Parse output of `LANG=C udevadm info --export-db`
 
+    The output can also be a :class:`UdevadmSnapshot`, its block devices list
+    is then used unless `lsblk` is given.
+
     :returns: :class:`UdevadmParser` object that corresponds to the
     parsed input
     """
+    if lsblk is None and isinstance(output, UdevadmSnapshot):
+        lsblk = output.lsblk
     if lsblk is None:
         try:
             lsblk = check_output(
@@ -24,6 +24,7 @@ from collections import OrderedDict
 from subprocess import check_output, CalledProcessError
 
 from checkbox_support.parsers.udevadm import UdevadmParser
+from checkbox_support.parsers.udevadm import UdevadmSnapshot
 
 categories = (
     "ACCELEROMETER",
@@ -128,7 +129,7 @@ def main():
         "--command",
         action="store",
         type=str,
-        default="udevadm info --export-db",
+        default=" ".join(UdevadmSnapshot.UDEVADM_CMD),
         help="""Command to execute to get udevadm information.
                               Only change it if you know what you're doing.""",
     )
@@ -137,7 +138,7 @@ def main():
         "--lsblkcommand",
         action="store",
         type=str,
-        default="lsblk -i -n -P -o KNAME,TYPE,MOUNTPOINT",
+        default=" ".join(UdevadmSnapshot.LSBLK_CMD),
         help="""Command to execute to get lsblk information.
                               Only change it if you know what you're doing.""",
     )
@@ -171,15 +172,25 @@ def main():
     )
     parser.add_argument("-s", "--short", action="store_true")
     args = parser.parse_args()
+    use_snapshot = (
+        shlex.split(args.command) == UdevadmSnapshot.UDEVADM_CMD
+        and shlex.split(args.lsblkcommand) == UdevadmSnapshot.LSBLK_CMD
+    )
     try:
-        output = check_output(shlex.split(args.command))
-        lsblk = check_output(shlex.split(args.lsblkcommand))
+        if use_snapshot:
+            # Share the parsed udev database with the other jobs of the
+            # session instead of running udevadm again
+            output = UdevadmSnapshot.get_session_snapshot()
+            lsblk = output.lsblk
+        else:
+            output = check_output(shlex.split(args.command))
+            lsblk = check_output(shlex.split(args.lsblkcommand))
+            # Set the error policy to 'ignore' in order to let tests
+            # depending on this resource to properly match udev properties
+            output = output.decode("UTF-8", errors="ignore")
+            lsblk = lsblk.decode("UTF-8", errors="ignore")
     except CalledProcessError as exc:
         raise SystemExit(exc)
-    # Set the error policy to 'ignore' in order to let tests depending on this
-    # resource to properly match udev properties
-    output = output.decode("UTF-8", errors="ignore")
-    lsblk = lsblk.decode("UTF-8", errors="ignore")
     list_partitions = False
     if "PARTITION" in args.list or "PARTITION" in args.filter:
         list_partitions = True